@@ -2,9 +2,13 @@
 
 from .bot import DiscordBot
 from .bot_event_handler import DiscordBotEventHandler
+from .supervisor import Supervisor
+from .supervisor import WorkerBot
 
 
 __all__ = [
     'DiscordBot',
     'DiscordBotEventHandler',
+    'Supervisor',
+    'WorkerBot',
 ]
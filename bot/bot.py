@@ -1,16 +1,27 @@
 import asyncio
 import logging
+import math
 import sys
 
 import discord
 
+from . import moduels
 from .bot_event_handler import DiscordBotEventHandler
-from .moduels import PicsSendingModule
-from .moduels import PicsSuggestionModule
 from .utils import Config
+from .utils import FileSystemIO
+from .utils import LoopLagMonitor
+from .utils import MetricsRegistry
+from .utils import OutboundQueue
+from .utils import ReadAheadCache
+from .utils import StartupTimer
 from .utils import init_logger
 
 
+#  Parameters of the running resources, applied on the next restart
+_RESTART_PARAMETERS = (
+    'token', 'db', 'fs_workers', 'suggestion_workers', 'image_workers')
+
+
 class DiscordBot:
 
     def __init__(self, config_path, logger=None, formatter=None):
@@ -27,21 +38,37 @@ class DiscordBot:
                        else logger)
 
         self._client_runner_task = None
+        self._db_check_task = None
 
         sys.excepthook = self._handle_unhandled_exception
 
         self._init()
 
     def _init(self):
-        self.config = Config(self.config_path, self.logger, self.formatter)
+        #  Complete once connected and the launched modules are indexed
+        self.startup = StartupTimer(
+            required=('gateway',), on_complete=self._report_startup)
+        with self.startup.measure('config'):
+            self.config = self._load_config()
+            self.config.apply_logging()
 
         self.loop = asyncio.get_event_loop()
-        intents = discord.Intents.default()
-        self.client = discord.Client(intents=intents, loop=self.loop)
+        self.metrics = MetricsRegistry()
+        self.metrics.add_collector(self._collect_metrics)
+        self.loop_monitor = LoopLagMonitor(
+            self.loop, self.logger,
+            threshold=self.config.loop_lag_threshold,
+            sample_rate=self.config.loop_lag_sample_rate)
+        self.outbound = OutboundQueue(self.loop)
+        self.client = self._create_client()
+        self.fs_io = FileSystemIO(self.loop, self.config.fs_workers)
+        self.read_ahead = ReadAheadCache(
+            self.fs_io, self.config.read_ahead_budget)
 
         self.shutdown_allowed = False
         self.event_handler = DiscordBotEventHandler(self)
         self.modules = []
+        self._reload_lock = asyncio.Lock()
 
         msg = 'Activated modules:\n'
         if self.config.pics_categories:
@@ -52,6 +79,22 @@ class DiscordBot:
                     msg += f'      {module}\n'
             self.logger.info(self._log_prefix + msg.rstrip())
 
+    def _load_config(self):
+        return Config(self.config_path, self.logger, self.formatter)
+
+    def _create_client(self):
+        return discord.Client(
+            intents=self._create_intents(),
+            loop=self.loop,
+            http_trace=self.outbound.trace_config)
+
+    @staticmethod
+    def _create_intents():
+        intents = discord.Intents.default()
+        #  No module handles typing events
+        intents.typing = False
+        return intents
+
     def _handle_unhandled_exception(self, exc_type, exc_value, exc_traceback):
         if issubclass(exc_type, (SystemExit, KeyboardInterrupt)):
             sys.__excepthook__(exc_type, exc_value, exc_traceback)
@@ -64,14 +107,15 @@ class DiscordBot:
     def run(self):
         while True:
             if self.config.pics_categories:
-                module = PicsSendingModule(self)
-                self.modules.append(module)
-
-                module = PicsSuggestionModule(self)
-                self.modules.append(module)
+                self._create_modules()
 
+            self.loop_monitor.start()
             self._client_runner_task = self.loop.create_task(
                 self._client_runner())
+            if self.config.db is not None:
+                #  Checked concurrently with connecting to discord
+                self._db_check_task = self.loop.create_task(
+                    self._check_db())
 
             try:
                 self.loop.run_forever()
@@ -84,10 +128,38 @@ class DiscordBot:
                 else:
                     self._init()
 
+    def _create_modules(self):
+        enabled = set()
+        for category in (self.config.pics_categories or {}).values():
+            enabled.update(category['modules'])
+        #  The modules and their dependencies are imported
+        #  only when a category enables them
+        with self.startup.measure('imports'):
+            module_types = [
+                getattr(moduels, name) for name in moduels.__all__
+                if name in enabled and self.get_module(name) is None]
+
+        created = [module_type(self) for module_type in module_types]
+        self.modules.extend(created)
+        return created
+
+    async def _check_db(self):
+        try:
+            with self.startup.measure('db'):
+                await self.loop.run_in_executor(
+                    None, self.config.check_db_connection)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            #  Logged by the configuration
+            self.shutdown_allowed = True
+            self.stop('Shutting down.')
+
     async def _client_runner(self):
         try:
             while True:
                 try:
+                    self.startup.start('gateway')
                     await self.client.start(self.config.token)
                     break
                 except discord.LoginFailure as e:
@@ -111,6 +183,50 @@ class DiscordBot:
         except asyncio.CancelledError:
             pass
 
+    async def reload(self):
+        async with self._reload_lock:
+            try:
+                config = await self.loop.run_in_executor(
+                    None, self._load_config)
+            except Exception as e:
+                self.logger.error(
+                    self._log_prefix +
+                    f'Caught an exception of type `{type(e).__name__}` '
+                    f'while reloading the configuration: {e}. '
+                    'The current configuration is kept.')
+                return False
+
+            changed = [k for k in _RESTART_PARAMETERS
+                       if getattr(config, k) != getattr(self.config, k)]
+            for k in changed:
+                setattr(config, k, getattr(self.config, k))
+            if changed:
+                self.logger.warning(
+                    self._log_prefix +
+                    'The following parameters will be applied '
+                    'on the next restart: ' +
+                    ', '.join(f'`{k}`' for k in changed) + '.')
+
+            old_categories = self.config.pics_categories or {}
+            #  In the loop thread, once the whole configuration is valid
+            config.apply_logging(self.config)
+            self.config = config
+            self.read_ahead.budget = config.read_ahead_budget
+            self.loop_monitor.threshold = config.loop_lag_threshold
+            self.loop_monitor.sample_rate = config.loop_lag_sample_rate
+            #  Without awaiting, so no task sees the new configuration
+            #  before the modules apply it
+            for module in self.modules:
+                module.reload(old_categories)
+            created = self._create_modules()
+            if self.event_handler.isModulesStarted:
+                for module in created:
+                    module.run()
+
+            self.logger.info(
+                self._log_prefix + 'The configuration is reloaded.')
+            return True
+
     def stop(self, msg=None, timeout=None):
         if msg is not None:
             self.logger.info(self._log_prefix + msg)
@@ -121,9 +237,14 @@ class DiscordBot:
             module.stop(timeout)
         close_tasks = [module.close_task for module in self.modules]
         await asyncio.gather(*close_tasks)
+        self.outbound.close()
 
         await self.client.close()
         self._client_runner_task.cancel()
+        self.loop_monitor.stop()
+        if self._db_check_task is not None:
+            self._db_check_task.cancel()
+        self.fs_io.shutdown()
 
         tasks = [t for t in asyncio.all_tasks()
                  if t is not asyncio.current_task()]
@@ -131,8 +252,66 @@ class DiscordBot:
             await asyncio.gather(*tasks)
         self.loop.stop()
 
+    def _report_startup(self, startup):
+        msg = 'Startup timings:\n'
+        for phase_name, phase in startup.summary().items():
+            if phase_name == 'total':
+                msg += f'  total: {phase["seconds"]:.3f} s\n'
+            else:
+                msg += (f'  {phase_name}: {phase["seconds"]:.3f} s '
+                        f'(started at {phase["start"]:.3f} s)\n')
+        self.logger.info(self._log_prefix + msg.rstrip())
+
+    def _collect_metrics(self):
+        outbound = self.outbound
+        yield ('discord_rest_responses_total', 'counter',
+               'Responses to the REST requests to discord.',
+               [('', {}, outbound.responses)])
+        yield ('discord_rest_rate_limited_total', 'counter',
+               'Responses to the REST requests with the status 429.',
+               [('', {}, outbound.rate_limited)])
+        yield ('discord_outbound_queue_depth', 'gauge',
+               'Requests of the modules waiting for their rate limits.',
+               [('', {'priority': k}, v)
+                for k, v in outbound.depth.items()])
+        yield ('discord_outbound_wait_seconds', 'summary',
+               'Time spent by the requests of the modules in the queue.',
+               _summary_samples(outbound.wait_stats, 'priority'))
+        latency = self.client.latency
+        if not math.isnan(latency):
+            yield ('discord_gateway_latency_seconds', 'gauge',
+                   'Latency between a heartbeat and its acknowledgement.',
+                   [('', {}, latency)])
+        yield ('fs_io_seconds', 'summary',
+               'Duration of the blocking file system operations.',
+               _summary_samples(self.fs_io.stats, 'operation'))
+        yield ('read_ahead_used_bytes', 'gauge',
+               'Total size of the pictures read ahead into memory.',
+               [('', {}, self.read_ahead.used)])
+        yield ('event_loop_lag_seconds', 'histogram',
+               'Delay of the event loop in running a scheduled callback.',
+               [(suffix, dict(labels), value)
+                for suffix, labels, value in self.loop_monitor.lag.samples()])
+        yield ('event_loop_stalls_total', 'counter',
+               'Lags of the event loop not less than `loop_lag_threshold`.',
+               [('', {}, self.loop_monitor.stalls)])
+        yield ('event_loop_stalls_captured_total', 'counter',
+               'Stacks of the blocking code captured during the stalls.',
+               [('', {}, self.loop_monitor.captured)])
+
     def get_module(self, module_type):
         for module in self.modules:
-            if isinstance(module, module_type):
+            if isinstance(module_type, str):
+                if type(module).__name__ == module_type:
+                    return module
+            elif isinstance(module, module_type):
                 return module
         return None
+
+
+def _summary_samples(stats, label):
+    samples = []
+    for k, v in stats.items():
+        samples.append(('_sum', {label: k}, v.total))
+        samples.append(('_count', {label: k}, v.count))
+    return samples
@@ -1,17 +1,31 @@
 from asyncio import AbstractEventLoop
+from asyncio import Lock
 from asyncio import Task
 from logging import Formatter
 from logging import Logger
+from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Type
 from typing import TypeVar
+from typing import Union
 
 from discord import Client
+from discord import Intents
 
 from .bot_event_handler import DiscordBotEventHandler
 from .moduels import Module
 from .utils.config import Config
+from .utils.fs_io import FileSystemIO
+from .utils.loop_monitor import LoopLagMonitor
+from .utils.metrics import Collected
+from .utils.metrics import MetricsRegistry
+from .utils.outbound import OutboundQueue
+from .utils.read_ahead import ReadAheadCache
+from .utils.startup import StartupTimer
+from .utils.utils import LatencyStats
 
 
 T_Module = TypeVar('T_Module', bound=Module)
@@ -26,10 +40,21 @@ class DiscordBot:
         formatter: Formatter's object.
         config: Bot's configuration object.
         loop: The event loop used by the bot.
+        metrics: In-process metrics exposed on the ``/metrics`` endpoint
+            of the suggestion server.
+        loop_monitor: The monitor of the event loop lag.
+        outbound: The queue of the requests to discord made by modules.
         client: Bot's client object.
+        fs_io: Executor of blocking file system operations.
+        read_ahead: Buffers of the pictures read ahead of their sending.
         shutdown_allowed: A flag that allows the bot to shut down.
         event_handler: Bot's event handler object.
-        modules: Modules used by the bot.
+        modules: Modules used by the bot. A module and its dependencies
+            are imported only when a category enables it.
+        startup: Timings of the startup phases: ``config``, ``imports``,
+            ``db``, ``gateway``, ``send_indexing``
+            and ``suggestion_indexing``. They are logged
+            once the startup is complete.
 
     """
 
@@ -38,13 +63,21 @@ class DiscordBot:
     formatter: Formatter
     config: Config
     loop: AbstractEventLoop
+    metrics: MetricsRegistry
+    loop_monitor: LoopLagMonitor
+    outbound: OutboundQueue
     client: Client
+    fs_io: FileSystemIO
+    read_ahead: ReadAheadCache
 
     shutdown_allowed: bool = False
     event_handler: DiscordBotEventHandler
     modules: List[Type[Module]]
+    startup: StartupTimer
 
     _client_runner_task: Optional[Task]
+    _db_check_task: Optional[Task]
+    _reload_lock: Lock
 
     def __init__(self, config_path: str, logger: Optional[Logger], formatter: Optional[Formatter]):
         """
@@ -65,8 +98,33 @@ class DiscordBot:
         calling the ``stop`` method or executing the ``close`` coroutine.
         """
 
+    def _create_modules(self) -> List[Module]:
+        """Creates the modules enabled by the categories
+        that are not created yet."""
+
+    async def _check_db(self):
+        """Makes a test connection to the database,
+        the bot is shut down if it fails."""
+
     async def _client_runner(self): ...
 
+    async def reload(self) -> bool:
+        """Coroutine for applying the changes of the configuration file.
+
+        The configuration is parsed again, and the modules start,
+        stop or retune only the categories that are changed.
+        The connection to discord and the caches are kept.
+        Changes of ``token``, ``db``, ``fs_workers``,
+        ``suggestion_workers`` and ``image_workers`` are applied
+        on the next restart.
+
+        Returns:
+            ``True`` if the configuration is reloaded, ``False``
+            if it is invalid or can not be applied, and the current
+            one is kept.
+
+        """
+
     def stop(self, msg: Optional[str] = None, timeout: Optional[float] = None):
         """Method for shutting down the bot.
 
@@ -86,11 +144,12 @@ class DiscordBot:
 
         """
 
-    def get_module(self, module_type: Type[T_Module]) -> Optional[T_Module]:
+    def get_module(self, module_type: Union[Type[T_Module], str]) -> Optional[T_Module]:
         """Method for getting a module object by its type.
 
         Args:
-            module_type: Type of module you are looking for.
+            module_type: Type of module you are looking for or its name.
+                The name does not import the module if it is not used.
 
         Returns:
             Module of the corresponding type if found, otherwise ``None``.
@@ -99,4 +158,19 @@ class DiscordBot:
 
     def _init(self): ...
 
+    def _report_startup(self, startup: StartupTimer): ...
+
+    def _collect_metrics(self) -> Iterator[Collected]:
+        """Reads the metrics of the bot from its in-process counters."""
+
+    def _load_config(self) -> Config: ...
+
+    def _create_client(self) -> Client: ...
+
+    @staticmethod
+    def _create_intents() -> Intents: ...
+
     def _handle_unhandled_exception(self, exc_type, exc_value, exc_traceback): ...
+
+
+def _summary_samples(stats: Dict[str, LatencyStats], label: str) -> List[Tuple[str, Dict[str, str], float]]: ...
@@ -1,16 +1,20 @@
 """Contains command functionality for discord text channels."""
 
+from .history import history
 from .message_bot_channel import message_bot_channel
 from .ping import ping
 from .qsize import qsize
+from .reload import reload
 from .restart import restart
 from .shutdown import shutdown
 
 
 __all__ = [
+    'history',
     'message_bot_channel',
     'ping',
     'qsize',
+    'reload',
     'restart',
     'shutdown',
 ]
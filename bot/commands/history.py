@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import discord
+
+
+async def history(message, args_str, bot):
+    pics_categories = {k: v for k, v in bot.config.pics_categories.items()
+                       if 'PicsSendingModule' in v['modules']}
+    category_names = set()
+    args = args_str.split()
+    if args:
+        for category_name in args:
+            if category_name in pics_categories:
+                category_names.add(category_name)
+    else:
+        category_names.update(pics_categories.keys())
+    if not category_names:
+        return
+    category_names = sorted(category_names)
+    module = bot.get_module('PicsSendingModule')
+    histories = {} if module is None else module.histories
+    desc = ''
+    embed = discord.Embed()
+    for category_name in category_names:
+        send_history = histories.get(category_name)
+        if send_history is None or not send_history.loaded:
+            desc += f'No history for `{category_name}` pictures.\n'
+            continue
+        count, last = send_history.stats(category_name)
+        desc += f'Sent `{category_name}` pictures: {count}'
+        if last is not None:
+            last = datetime.fromtimestamp(last).isoformat(
+                sep=' ', timespec='seconds')
+            desc += f', the last one at {last}'
+        desc += '\n'
+    embed.description = desc.rstrip()
+    await message.channel.send(embed=embed)
@@ -0,0 +1,26 @@
+from discord import Message
+
+from bot.bot import DiscordBot
+
+
+async def history(message: Message, args_str: str, bot: DiscordBot):
+    """The ``history`` command.
+
+    Sends a message containing the number of images sent
+    for the corresponding categories and the time of the last send.
+
+    List the names of the required categories separated by a space
+    to send information about the corresponding categories,
+    otherwise send information about all of them.
+
+    Examples:
+        !history
+
+        !history cats dogs
+
+    Args:
+        message: Message to be used.
+        args_str: String of parameters sent with the command.
+        bot: Bot's object.
+
+    """
@@ -1,5 +1,7 @@
+from .history import history
 from .ping import ping
 from .qsize import qsize
+from .reload import reload
 from .restart import restart
 from .shutdown import shutdown
 
@@ -12,10 +14,14 @@ async def message_bot_channel(message, bot):
         command, *args_str = data.split(maxsplit=1)
         args_str = args_str[0] if args_str else ''
 
-        if command == 'ping':
+        if command == 'history':
+            await history(message, args_str, bot)
+        elif command == 'ping':
             await ping(message)
         elif command == 'qsize':
             await qsize(message, args_str, bot)
+        elif command == 'reload':
+            await reload(message, bot)
         elif command == 'restart':
             await restart(message, args_str, bot)
         elif command == 'shutdown':
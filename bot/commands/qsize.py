@@ -17,11 +17,17 @@ async def qsize(message, args_str, bot):
     if not category_names:
         return
     category_names = sorted(category_names)
+    module = bot.get_module('PicsSendingModule')
+    queues = {} if module is None else module.queues
     desc = ''
     embed = discord.Embed()
     for category_name in category_names:
-        path = pics_categories[category_name]['send_directory']
-        qsize = len(get_pics_path_list(path))
+        if category_name in queues:
+            qsize = len(queues[category_name])
+        else:
+            path = pics_categories[category_name]['send_directory']
+            qsize = len(await bot.fs_io.run(
+                'scan', get_pics_path_list, path))
         desc += f'Queue size for `{category_name}` pictures: {qsize}\n'
     embed.description = desc.rstrip()
     await message.channel.send(embed=embed)
@@ -0,0 +1,8 @@
+async def reload(message, bot):
+    if message.author.guild_permissions.administrator:
+        if await bot.reload():
+            await message.channel.send('The configuration is reloaded.')
+        else:
+            await message.channel.send(
+                'The configuration can not be reloaded, '
+                'the current one is kept, see the log.')
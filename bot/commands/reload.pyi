@@ -0,0 +1,25 @@
+from discord import Message
+
+from bot.bot import DiscordBot
+
+
+async def reload(message: Message, bot: DiscordBot):
+    """The ``reload`` command.
+
+    Applies the changes of the configuration file without a restart.
+    Only the changed categories are started, stopped or retuned,
+    the connection to discord is kept. Sends the result
+    to the same text channel.
+
+    Examples:
+        !reload
+
+    Note:
+        The user typing this command must have administrator rights
+        on the corresponding discord server.
+
+    Args:
+        message: Message to be used.
+        bot: Bot's object.
+
+    """
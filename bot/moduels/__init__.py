@@ -1,8 +1,16 @@
 """Contains functionality for bot modules."""
 
+import importlib
+
 from .module import Module
-from .pics_sending_module import PicsSendingModule
-from .pics_suggestion_module import PicsSuggestionModule
+
+
+#  Imported on the first access, so the dependencies of a module
+#  are loaded only when a category enables it
+_LAZY_MODULES = {
+    'PicsSendingModule': '.pics_sending_module',
+    'PicsSuggestionModule': '.pics_suggestion_module',
+}
 
 
 __all__ = [
@@ -10,3 +18,13 @@ __all__ = [
     'PicsSendingModule',
     'PicsSuggestionModule',
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(
+            f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -5,3 +5,6 @@ class Module:
 
     def stop(self, timeout=None):
         raise NotImplementedError
+
+    def reload(self, old_categories):
+        raise NotImplementedError
@@ -1,5 +1,6 @@
 from asyncio import Event
 from asyncio import Task
+from typing import Dict
 from typing import Optional
 
 from bot.bot import DiscordBot
@@ -30,3 +31,11 @@ class Module:
                 the module will be forcibly shut down.
 
         """
+
+    def reload(self, old_categories: Dict[str, Dict]):
+        """Applies the changes of ``bot.config.pics_categories``.
+
+        Args:
+            old_categories: The categories before the reload.
+
+        """
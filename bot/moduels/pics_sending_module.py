@@ -1,20 +1,37 @@
 import asyncio
+import functools
+import heapq
+import io
+import itertools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from datetime import timedelta
 from os import path
-from os import remove
-from os import rename
 
 import discord
-from watchdog.events import FileCreatedEvent
-from watchdog.events import FileSystemEventHandler
-from watchdog.observers import Observer
 
-from bot.utils.utils import get_pics_path_list
+from bot.utils.archive import archive_file
+from bot.utils.archive import compact_archive
+from bot.utils.fs_watcher import DirectoryWatcher
+from bot.utils.images import prepare_image
+from bot.utils.images import prune_prepared
+from bot.utils.images import sha256_file
+from bot.utils.outbound import OutboundQueue
+from bot.utils.pics_queue import PicsQueue
+from bot.utils.send_history import SendHistory
+from bot.utils.utils import diff_categories
 from bot.utils.utils import time_in_range
 from .module import Module
 
 
+_DRIFT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+_COMPACT_INTERVAL = 60 * 60
+_HISTORY_FILE_NAME = '.pics_sent'
+
+
 class PicsSendingModule(Module):
 
     def __init__(self, bot):
@@ -23,103 +40,660 @@ class PicsSendingModule(Module):
         self.bot = bot
         self.to_close = asyncio.Event()
         self.tasks = {}
-        self.monitoring_events = {}
+        self.queues = {}
         self.last_send_datetime = {}
+        self.histories = {}
+        self.state_store = None
+        if self.bot.config.db is not None:
+            #  Imported only with the database configured
+            from bot.utils.state_store import create_state_store
+            self.state_store = create_state_store(
+                self.bot.config.db, self.bot.loop)
+
+        self._heap = []
+        self._counter = itertools.count()
+        self._generations = {}
+        self._plans = {}
+        self._windows = {}
+        self._dirty = set()
+        self._sending = set()
+        self._wakeup = asyncio.Event()
+        self._prepared = {}
+        self._executor = None
+        self._read_ahead = {}
+        self._watcher = None
+        self._watches = {}
+        self._reconcile_times = {}
+        self._monitor_wakeup = asyncio.Event()
+        self._histories_by_path = {}
+        self._history_loads = {}
+        self._retired_histories = set()
+
+        self.send_seconds = self.bot.metrics.histogram(
+            'pics_send_seconds',
+            'Duration of uploading a picture to discord.')
+        self.schedule_drift = self.bot.metrics.histogram(
+            'pics_schedule_drift_seconds',
+            'Delay of a send after its planned time.',
+            _DRIFT_BUCKETS)
+        self.bot.metrics.add_collector(self._collect_metrics)
 
     def run(self):
+        self.bot.startup.start('send_indexing')
+        if self.state_store is not None:
+            task = self.bot.loop.create_task(self._start_state_store())
+            self.tasks[task] = None
+            if self.state_store.flush_interval:
+                task = self.bot.loop.create_task(self._flush_state())
+                self.tasks[task] = None
+
         for category_name in self.bot.config.pics_categories:
             modules = self.bot.config.pics_categories[category_name]['modules']
             if type(self).__name__ not in modules:
                 continue
+            self._add_category(category_name)
+        self._update_executor()
+
+        #  Started without categories too, they can be added by a reload
+        monitoring_task = self.bot.loop.create_task(self._start_monitoring())
+        self.tasks[monitoring_task] = None
+
+        idle_event = asyncio.Event()
+        idle_event.set()
+        task = self.bot.loop.create_task(self._start())
+        self.tasks[task] = idle_event
+
+        #  Started without packing categories too, they can be added
+        #  by a reload
+        task = self.bot.loop.create_task(self._compact_archives())
+        self.tasks[task] = None
+
+    def reload(self, old_categories):
+        if not self.tasks:
+            return  # The categories are read on the launch
+        categories = self.bot.config.pics_categories or {}
+        added, removed, changed = diff_categories(
+            old_categories, categories, type(self).__name__)
+        for category_name in list(changed):
+            if any(old_categories[category_name][k] !=
+                   categories[category_name][k]
+                   for k in ('send_directory', 'send_history')):
+                changed.discard(category_name)
+                removed.add(category_name)
+                added.add(category_name)
+
+        for category_name in removed:
+            self._remove_category(category_name)
+        for category_name in changed:
+            self._retune_category(
+                category_name, old_categories[category_name])
+        for category_name in added:
+            self._add_category(category_name)
+            task = self.bot.loop.create_task(
+                self._start_category(category_name))
+            self.tasks[task] = None
+            task.add_done_callback(self._forget_task)
+        self._update_executor()
+
+        if added or removed or changed:
+            self.bot.logger.info(
+                self._log_prefix +
+                f'Reloaded the categories: {len(added)} added, '
+                f'{len(removed)} removed, {len(changed)} changed.')
+
+    def _add_category(self, category_name):
+        directory = self.bot.config.pics_categories[category_name][
+            'send_directory']
+        self.queues[category_name] = PicsQueue(directory)
+        self.last_send_datetime[category_name] = None
+        #  Kept after the removal, so old heap entries stay outdated
+        self._generations.setdefault(category_name, 0)
+        self._prepared[category_name] = {}
+        if self.bot.config.pics_categories[category_name]['send_history']:
+            #  Categories sending from the same directory share the history
+            history_path = path.join(directory, _HISTORY_FILE_NAME)
+            send_history = self._histories_by_path.get(history_path)
+            if send_history is None:
+                send_history = self._histories_by_path[history_path] = (
+                    SendHistory(history_path))
+            self.histories[category_name] = send_history
+
+    async def _start_category(self, category_name):
+        try:
+            queue = self.queues[category_name]
+            await self._load_histories((category_name,))
+            if self.state_store is not None:
+                await self._load_last_send_datetime(category_name)
+            await self._reconcile_queue(category_name)
+            if self.queues.get(category_name) is not queue:
+                return  # Removed by another reload
+            if self._watcher is not None:
+                self._watch(category_name)
+            self._schedule_reconcile(category_name)
+            self._on_queue_changed(category_name)
+        except asyncio.CancelledError:
+            pass
+        except OSError as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while starting the category `{category_name}`: {e}')
+
+    def _remove_category(self, category_name):
+        if self._watcher is not None:
+            self._unwatch(category_name)
+        del self.queues[category_name]
+        del self.last_send_datetime[category_name]
+        self._generations[category_name] += 1
+        self._plans.pop(category_name, None)
+        self._windows.pop(category_name, None)
+        self._dirty.discard(category_name)
+        self._reconcile_times.pop(category_name, None)
+        for task in self._prepared.pop(category_name).values():
+            task.cancel()
+        self._drop_read_ahead(category_name)
+        send_history = self.histories.pop(category_name, None)
+        if (send_history is not None and
+                send_history not in self.histories.values()):
+            self._retire_history(send_history)
+
+    def _retire_history(self, send_history):
+        #  Closed on the shutdown, as its loading may be in progress
+        if self._histories_by_path.get(send_history.path) is send_history:
+            del self._histories_by_path[send_history.path]
+        self._history_loads.pop(send_history, None)
+        self._retired_histories.add(send_history)
+        self.histories = {
+            k: v for k, v in self.histories.items() if v is not send_history}
+
+    async def _load_histories(self, category_names):
+        for send_history in {self.histories[k] for k in category_names
+                             if k in self.histories}:
+            task = self._history_loads.get(send_history)
+            if task is None:
+                task = self._history_loads[send_history] = (
+                    self.bot.loop.create_task(self.bot.fs_io.run(
+                        'history', send_history.load)))
+            try:
+                #  Shielded, as the loading is shared by the categories
+                await asyncio.shield(task)
+            except OSError as e:
+                if send_history in self._retired_histories:
+                    continue
+                self.bot.logger.error(
+                    self._log_prefix +
+                    f'Caught an exception of type `{type(e).__name__}` '
+                    f'while loading the history "{send_history.path}", '
+                    f'the history is disabled: {e}')
+                self._retire_history(send_history)
 
-            monitoring_task = self.bot.loop.create_task(
-                self._start_monitoring(category_name))
-            self.tasks[monitoring_task] = None
-            self.monitoring_events[category_name] = asyncio.Event()
+    def _retune_category(self, category_name, old_category):
+        category = self.bot.config.pics_categories[category_name]
+        #  Planned again with the new schedule
+        self._plans.pop(category_name, None)
+        self._windows.pop(category_name, None)
+        if old_category['send_max_size'] != category['send_max_size']:
+            prepared = self._prepared[category_name]
+            for task in prepared.values():
+                task.cancel()
+            prepared.clear()
+            self._drop_read_ahead(category_name)
+        if (category_name in self._reconcile_times and
+                old_category['send_reconcile_interval'] !=
+                category['send_reconcile_interval']):
+            self._schedule_reconcile(category_name)
+        self._on_queue_changed(category_name)
+
+    def _update_executor(self):
+        categories = self.bot.config.pics_categories
+        if self._executor is None and any(
+                categories[k]['send_max_size'] is not None
+                for k in self.queues):
+            #  Spawned, as forking the threads of the bot, e.g. the log
+            #  listener, could leave their locks held in the children
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.bot.config.image_workers,
+                mp_context=multiprocessing.get_context('spawn'))
+
+    async def _compact_archives(self):
+        try:
+            while not self.to_close.is_set():
+                categories = self.bot.config.pics_categories
+                for category_name in list(self.queues):
+                    category = categories.get(category_name)
+                    if (category is None or
+                            category['send_archive_pack_after'] is None):
+                        continue
+                    archive_directory = category['send_archive_directory']
+                    try:
+                        packs = await self.bot.fs_io.run(
+                            'compact', compact_archive, archive_directory,
+                            category['send_archive_layout'],
+                            category['send_archive_pack_after'] * 86400)
+                    except OSError as e:
+                        self.bot.logger.error(
+                            self._log_prefix +
+                            'Caught an exception of type '
+                            f'`{type(e).__name__}` while packing '
+                            f'the archive "{archive_directory}": {e}')
+                        continue
+                    if packs:
+                        self.bot.logger.info(
+                            self._log_prefix +
+                            f'Packed {len(packs)} shards of the archive '
+                            f'"{archive_directory}".')
+                try:
+                    await asyncio.wait_for(
+                        self.to_close.wait(), _COMPACT_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            pass
 
-            self.last_send_datetime[category_name] = None
+    def _collect_metrics(self):
+        yield ('pics_queue_size', 'gauge',
+               'Pictures waiting to be sent.',
+               [('', {'category': k}, len(q)) for k, q in self.queues.items()])
+        if self.state_store is not None:
+            yield ('pics_state_pending_writes', 'gauge',
+                   'Changes of the state not written to the database yet.',
+                   [('', {}, self.state_store.pending)])
 
-            idle_event = asyncio.Event()
-            idle_event.set()
-            task = self.bot.loop.create_task(self._start(category_name))
-            self.tasks[task] = idle_event
+    def _forget_task(self, task):
+        self.tasks.pop(task, None)
 
-    async def _start(self, category_name):
+    async def _start(self):
         try:
             idle_event = self.tasks[asyncio.current_task()]
 
+            await self.bot.client.wait_until_ready()
+            idle_event.clear()
+            await self._load_histories(list(self.queues))
+            idle_event.set()
+            if self.state_store is not None:
+                idle_event.clear()
+                await asyncio.gather(*(
+                    self._load_last_send_datetime(category_name)
+                    for category_name in self.queues))
+                idle_event.set()
+            self._dirty.update(self.queues)
+
             while not (self.bot.client.is_closed() or self.to_close.is_set()):
-                await self.bot.client.wait_until_ready()
-                permit, cooldown = await self._time_check(category_name)
-                await asyncio.sleep(cooldown)
+                self._wakeup.clear()
+                self._replan_dirty()
+
+                if not self._heap:
+                    # Waiting for new pictures to be added
+                    await self._wakeup.wait()
+                    continue
+
+                deadline, _, category_name, generation = self._heap[0]
+                if (generation != self._generations[category_name] or
+                        category_name in self._sending):
+                    #  A category being sent is planned after the send
+                    heapq.heappop(self._heap)
+                    continue
+
+                cooldown = deadline - self.bot.loop.time()
+                if cooldown > 0:
+                    lead = self.bot.config.pics_categories[category_name][
+                        'send_read_ahead']
+                    if cooldown <= lead:
+                        if self._plans[category_name][1]:
+                            self._start_read_ahead(category_name)
+                    else:
+                        #  Waking up to read the picture ahead
+                        cooldown -= lead
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), cooldown)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                heapq.heappop(self._heap)
+                _, permit, target = self._plans.pop(category_name)
                 if permit:
-                    idle_event.clear()
-                    await self._send_pic(category_name)
-                    if self.bot.config.db is not None:
-                        dt = self.last_send_datetime[category_name]
-                        try:
-                            self._set_last_send_datetime_db(category_name, dt)
-                        except Exception as e:
-                            self.bot.logger.error(
-                                self._log_prefix +
-                                'Caught an exception of type '
-                                f'`{type(e).__name__}` '
-                                f'while setting a value in the database: {e}')
-                    idle_event.set()
+                    self.schedule_drift.labels(
+                        category=category_name).observe(
+                        (datetime.now() - target).total_seconds())
+                    self.last_send_datetime[category_name] = target
+                    #  The categories are sent concurrently,
+                    #  but a category is sent once at a time
+                    self._sending.add(category_name)
+                    send_idle_event = asyncio.Event()
+                    task = self.bot.loop.create_task(
+                        self._send_scheduled(
+                            category_name, target, send_idle_event))
+                    self.tasks[task] = send_idle_event
+                    task.add_done_callback(functools.partial(
+                        self._on_sent, category_name))
+                elif category_name in self.queues:
+                    self._plan(category_name)
+                    self._prepare_ahead(category_name)
+        except asyncio.CancelledError:
+            pass
+
+    async def _send_scheduled(self, category_name, target, idle_event):
+        try:
+            await self._send_pic(category_name)
+            if self.state_store is not None:
+                try:
+                    await self.state_store.set_last_send_datetime(
+                        category_name, target)
+                except Exception as e:
+                    self.bot.logger.error(
+                        self._log_prefix +
+                        f'Caught an exception of type `{type(e).__name__}` '
+                        f'while setting a value in the database: {e}')
         except asyncio.CancelledError:
             pass
+        finally:
+            idle_event.set()
+
+    def _on_sent(self, category_name, task):
+        self._forget_task(task)
+        self._sending.discard(category_name)
+        if category_name in self.queues:
+            self._plan(category_name)
+            self._prepare_ahead(category_name)
+            self._wakeup.set()
+
+    async def _load_last_send_datetime(self, category_name):
+        try:
+            dt = await self.state_store.get_last_send_datetime(category_name)
+        except Exception as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while getting a value from the database: {e}')
+            dt = None
+        self.last_send_datetime[category_name] = dt
+
+    def _on_queue_changed(self, category_name):
+        if category_name not in self.queues:
+            return  # Removed by a reload
+        self._dirty.add(category_name)
+        self._wakeup.set()
+
+    def _replan_dirty(self):
+        dirty = self._dirty
+        self._dirty = set()
+        for category_name in dirty:
+            if category_name in self._sending:
+                continue  # Planned after the send
+            plan = self._plans.get(category_name)
+            #  The plan depends on the queue only through its size
+            if plan is None or plan[0] != len(self.queues[category_name]):
+                self._plan(category_name)
+            self._prepare_ahead(category_name)
+            entry = self._read_ahead.get(category_name)
+            if (entry is not None and
+                    entry[0] != self.queues[category_name].first()):
+                self._drop_read_ahead(category_name)
+
+        # Dropping outdated entries
+        if len(self._heap) > 2 * len(self._plans) + 64:
+            self._heap = [
+                entry for entry in self._heap
+                if entry[3] == self._generations[entry[2]]]
+            heapq.heapify(self._heap)
+
+    def _plan(self, category_name):
+        self._generations[category_name] += 1
+        qsize = len(self.queues[category_name])
+        if qsize == 0:
+            self._plans.pop(category_name, None)
+            return
+
+        permit, target, cooldown = self._time_check(category_name, qsize)
+        self._plans[category_name] = (qsize, permit, target)
+        heapq.heappush(self._heap, (
+            self.bot.loop.time() + cooldown,
+            next(self._counter),
+            category_name,
+            self._generations[category_name]))
 
-    async def _start_monitoring(self, category_name):
-        observer = None
+    def _prepare_ahead(self, category_name):
+        category = self.bot.config.pics_categories[category_name]
+        max_size = category['send_max_size']
+        if max_size is None:
+            return
+        queue = self.queues[category_name]
+        prepared = self._prepared[category_name]
+        for pic_path in [p for p in prepared if p not in queue]:
+            prepared.pop(pic_path).cancel()
+        for pic_path in queue.head(category['send_prepare_ahead']):
+            if pic_path not in prepared:
+                prepared[pic_path] = self.bot.loop.create_task(
+                    self._prepare(pic_path, max_size))
+
+    async def _get_upload_path(self, category_name, pic_path):
+        if category_name not in self.queues:
+            return pic_path  # Removed by a reload
+        max_size = self.bot.config.pics_categories[category_name][
+            'send_max_size']
+        if max_size is None:
+            return pic_path
+        prepared = self._prepared[category_name]
+        task = prepared.get(pic_path)
+        if task is None:
+            task = prepared[pic_path] = self.bot.loop.create_task(
+                self._prepare(pic_path, max_size))
+        #  Shielded, as the preparation is shared with the read-ahead
+        #  Falls back to the original if it can not be prepared
+        return await asyncio.shield(task) or pic_path
+
+    def _start_read_ahead(self, category_name):
+        pic_path = self.queues[category_name].first()
+        entry = self._read_ahead.get(category_name)
+        if entry is not None:
+            if entry[0] == pic_path:
+                return
+            self._drop_read_ahead(category_name)
+        if pic_path is None or not self.bot.read_ahead.budget:
+            return
+        task = self.bot.loop.create_task(
+            self._read_pic_ahead(category_name, pic_path))
+        self._read_ahead[category_name] = (pic_path, task)
 
+    async def _read_pic_ahead(self, category_name, pic_path):
         try:
-            category = self.bot.config.pics_categories[category_name]
-            directory = category['send_directory']
+            upload_path = await self._get_upload_path(category_name, pic_path)
+            if not await self.bot.read_ahead.load(pic_path, upload_path):
+                self.bot.logger.debug(
+                    self._log_prefix +
+                    f'The picture on the path "{pic_path}" is not read '
+                    'ahead, the memory budget is exhausted.')
+            send_history = self.histories.get(category_name)
+            if send_history is not None and send_history.loaded:
+                #  Hashed ahead too, so the send does not read the disk
+                return await self.bot.fs_io.run('hash', sha256_file, pic_path)
+        except FileNotFoundError:
+            pass  # Discarded on the send
+        except Exception as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while reading the picture "{pic_path}" ahead: {e}')
+        return None
 
-            event_handler = _FileSystemEventHandler(
-                directory,
-                self.monitoring_events[category_name],
-                self.bot.loop)
+    def _drop_read_ahead(self, category_name):
+        entry = self._read_ahead.pop(category_name, None)
+        if entry is not None:
+            pic_path, task = entry
+            task.cancel()
+            self.bot.read_ahead.discard(pic_path)
 
-            observer = Observer()
-            observer.schedule(event_handler, directory)
-            observer.start()
+    async def _prepare(self, pic_path, max_size):
+        try:
+            return await self.bot.loop.run_in_executor(
+                self._executor, prepare_image, pic_path, max_size)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while preparing the picture "{pic_path}": {e}')
+            return None
 
-            await self.to_close.wait()
-            observer.stop()
-            observer.join()
+    async def _start_state_store(self):
+        try:
+            await self.state_store.start()
         except asyncio.CancelledError:
-            if observer is not None and observer.is_alive():
-                observer.stop()
-                observer.join()
+            pass
+        except Exception as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while connecting to the database: {e}')
+
+    async def _flush_state(self):
+        try:
+            while True:
+                await asyncio.sleep(self.state_store.flush_interval)
+                try:
+                    await self.state_store.flush()
+                except Exception as e:
+                    self.bot.logger.error(
+                        self._log_prefix +
+                        f'Caught an exception of type `{type(e).__name__}` '
+                        f'while writing the state to the database: {e}')
+        except asyncio.CancelledError:
+            pass  # Flushed by closing the state store
+
+    async def _start_monitoring(self):
+        try:
+            await asyncio.gather(*(
+                self._reconcile_queue(category_name)
+                for category_name in list(self.queues)))
+            self.bot.startup.finish('send_indexing')
+
+            #  A single watcher for all the categories
+            self._watcher = DirectoryWatcher(self.bot.loop)
+            for category_name in self.queues:
+                self._watch(category_name)
+            self._watcher.start()
+
+            #  Periodically catching up with missed events
+            for category_name in self.queues:
+                if category_name not in self._reconcile_times:
+                    self._schedule_reconcile(category_name)
+            while not self.to_close.is_set():
+                timeout = None
+                if self._reconcile_times:
+                    timeout = max(
+                        min(self._reconcile_times.values()) -
+                        self.bot.loop.time(), 0)
+                self._monitor_wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._monitor_wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                now = self.bot.loop.time()
+                for category_name, t in list(self._reconcile_times.items()):
+                    if t > now:
+                        continue
+                    await self._reconcile_queue(category_name)
+                    if category_name in self._reconcile_times:
+                        self._schedule_reconcile(category_name)
+            self._watcher.stop()
+        except asyncio.CancelledError:
+            if self._watcher is not None:
+                self._watcher.stop()
+
+    def _watch(self, category_name):
+        if category_name in self._watches:
+            #  Watched by both the launch and a reload started meanwhile
+            return
+        queue = self.queues[category_name]
+        callback = functools.partial(
+            self._on_files_changed, category_name, queue)
+        try:
+            self._watcher.subscribe(queue.directory, callback)
+        except OSError as e:
+            #  Caught up by the reconciliation
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while watching the directory "{queue.directory}": {e}')
+            return
+        self._watches[category_name] = (queue.directory, callback)
+
+    def _unwatch(self, category_name):
+        item = self._watches.pop(category_name, None)
+        if item is not None:
+            self._watcher.unsubscribe(*item)
+
+    def _on_files_changed(self, category_name, queue, added, removed):
+        if self.queues.get(category_name) is not queue:
+            return  # Removed by a reload
+        is_changed = False
+        for pic_path in removed:
+            is_changed |= queue.discard(pic_path)
+        for pic_path in added:
+            is_changed |= queue.add(pic_path)
+        if is_changed:
+            self._on_queue_changed(category_name)
+
+    def _schedule_reconcile(self, category_name):
+        interval = self.bot.config.pics_categories[category_name][
+            'send_reconcile_interval']
+        self._reconcile_times[category_name] = (
+            self.bot.loop.time() + interval)
+        self._monitor_wakeup.set()
+
+    async def _reconcile_queue(self, category_name):
+        queue = self.queues.get(category_name)
+        if queue is None:
+            return
+        try:
+            pics_path_list = await self.bot.fs_io.run('scan', queue.scan)
+        except OSError as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while scanning the directory "{queue.directory}": {e}')
+            return
+        if self.queues.get(category_name) is not queue:
+            return  # Removed by a reload
+        added, removed = queue.reconcile(pics_path_list)
+        if self.bot.config.pics_categories[category_name][
+                'send_max_size'] is not None:
+            names = {path.basename(p) for p in pics_path_list}
+            try:
+                await self.bot.fs_io.run(
+                    'remove', prune_prepared, queue.directory, names)
+            except OSError as e:
+                self.bot.logger.error(
+                    self._log_prefix +
+                    f'Caught an exception of type `{type(e).__name__}` '
+                    f'while removing outdated prepared pictures: {e}')
+        if self.bot.logger.isEnabledFor(logging.DEBUG):
+            self.bot.logger.debug(
+                self._log_prefix +
+                f'Reconciled the queue of the category `{category_name}`: '
+                f'{len(queue)} pictures, {len(added)} added, '
+                f'{len(removed)} removed.')
+        if added or removed:
+            self._on_queue_changed(category_name)
+
+    def _get_window(self, category_name, current_datetime):
+        #  Returns: in_time, start_datetime, end_datetime
+        window = self._windows.get(category_name)
+        if window is not None and current_datetime < window[0]:
+            return window[1:]
 
-    async def _time_check(self, category_name):
-        #  Returns: permit, cooldown
         category = self.bot.config.pics_categories[category_name]
-        directory = category['send_directory']
         start = category['send_start']
         end = category['send_end']
-        reserve_days = category['send_reserve_days']
-
-        qsize = len(get_pics_path_list(directory))
-        # Waiting for new pictures to be added
-        if qsize == 0:
-            await self.monitoring_events[category_name].wait()
-            qsize = len(get_pics_path_list(directory))
 
-        current_datetime = datetime.now()
         start_datetime = datetime.combine(current_datetime.date(), start)
         end_datetime = datetime.combine(current_datetime.date(), end)
 
         in_time = time_in_range(start, end, current_datetime.time())
 
-        # DEBUG
-        debug_msg = (
-            self._log_prefix +
-            '_time_check:'
-            f'\n  category_name: {category_name}'
-            f'\n  current_datetime: {current_datetime}')
-
         if in_time:
             # When it starts yesterday
             if current_datetime < start_datetime:
@@ -127,44 +701,40 @@ class PicsSendingModule(Module):
             # When it ends tomorrow
             if start_datetime >= end_datetime:
                 end_datetime += timedelta(days=1)
+            valid_until = end_datetime
         else:  # Wait for the next day
             # When it starts tomorrow
             if current_datetime > start_datetime:
                 start_datetime += timedelta(days=1)
+            valid_until = start_datetime
+
+        self._windows[category_name] = (
+            valid_until, in_time, start_datetime, end_datetime)
+        return in_time, start_datetime, end_datetime
+
+    def _time_check(self, category_name, qsize):
+        #  Returns: permit, target, cooldown
+        category = self.bot.config.pics_categories[category_name]
+        reserve_days = category['send_reserve_days']
+
+        current_datetime = datetime.now()
+        in_time, start_datetime, end_datetime = self._get_window(
+            category_name, current_datetime)
+
+        if not in_time:  # Wait for the next day
             cooldown = (start_datetime - current_datetime).total_seconds()
-            # DEBUG
-            debug_msg += (
-                f'\n  target: {start_datetime}'
-                f'\n  cooldown: {cooldown}'
-                '\n  Wait for the next day.')
-            self.bot.logger.debug(debug_msg)
-            return (False, cooldown)
-
-        if (self.last_send_datetime[category_name] is None and
-                self.bot.config.db is not None):
-            idle_event = self.tasks[asyncio.current_task()]
-            idle_event.clear()
-            try:
-                dt = self._get_last_send_datetime_db(category_name)
-            except Exception as e:
-                self.bot.logger.error(
-                    self._log_prefix +
-                    f'Caught an exception of type `{type(e).__name__}` '
-                    f'while getting a value from the database: {e}')
-                dt = None
-            idle_event.set()
-            self.last_send_datetime[category_name] = dt
+            self._log_time_check(
+                'Wait for the next day.',
+                category_name=category_name,
+                current_datetime=current_datetime,
+                target=start_datetime,
+                cooldown=cooldown)
+            return (False, start_datetime, cooldown)
 
         last_send_datetime = self.last_send_datetime[category_name]
         if last_send_datetime is None or last_send_datetime < start_datetime:
             last_send_datetime = start_datetime
 
-        # DEBUG
-        debug_msg += (
-            f'\n  start_datetime: {start_datetime}'
-            f'\n  end_datetime: {end_datetime}'
-            f'\n  last_send_datetime: {last_send_datetime}')
-
         seconds_per_day = (end_datetime - start_datetime).total_seconds()
         seconds_total = seconds_per_day * reserve_days
         seconds_left = (end_datetime - last_send_datetime).total_seconds()
@@ -174,145 +744,145 @@ class PicsSendingModule(Module):
         periods = max(seconds_left // period_global, 1)
         period = seconds_left / periods
 
-        # DEBUG
-        debug_msg += (
-            f'\n  qsize: {qsize}'
-            f'\n  seconds_per_day: {seconds_per_day}'
-            f'\n  seconds_total: {seconds_total}'
-            f'\n  seconds_left: {seconds_left}'
-            f'\n  period_global: {period_global}'
-            f'\n  periods: {periods}'
-            f'\n  period: {period}')
-
         # Send immediately if it is late
         if current_datetime > last_send_datetime + timedelta(seconds=period):
-            self.last_send_datetime[category_name] = current_datetime
-            # DEBUG
-            debug_msg += '\n  Send immediately if it is late.'
-            self.bot.logger.debug(debug_msg)
-            return (True, 0)
-
+            target = current_datetime
+            cooldown = 0
+            note = 'Send immediately if it is late.'
+            permit = True
         # Skipping the end point of the day
-        if current_datetime > end_datetime - timedelta(seconds=period):
+        elif current_datetime > end_datetime - timedelta(seconds=period):
             # Wait for the next day
             target = start_datetime + timedelta(days=1)
             cooldown = (target - current_datetime).total_seconds()
-            # DEBUG
-            debug_msg += (
-                f'\n  target: {target}'
-                f'\n  cooldown: {cooldown}'
-                '\n  Skipping the end point of the day.')
-            self.bot.logger.debug(debug_msg)
-            return (False, cooldown)
-
+            note = 'Skipping the end point of the day.'
+            permit = False
         # Skipping the start point of the day
-        if last_send_datetime == start_datetime:
+        elif last_send_datetime == start_datetime:
             target = start_datetime + timedelta(seconds=period)
-            self.last_send_datetime[category_name] = target
             cooldown = (target - current_datetime).total_seconds()
-            # DEBUG
-            debug_msg += (
-                f'\n  target: {target}'
-                f'\n  cooldown: {cooldown}'
-                '\n  Skipping the start point of the day.')
-            self.bot.logger.debug(debug_msg)
-            return (True, cooldown)
-
+            note = 'Skipping the start point of the day.'
+            permit = True
         # Send at the next point
-        target = last_send_datetime + timedelta(seconds=period)
-        self.last_send_datetime[category_name] = target
-        cooldown = (target - current_datetime).total_seconds()
+        else:
+            target = last_send_datetime + timedelta(seconds=period)
+            cooldown = (target - current_datetime).total_seconds()
+            note = 'Send at the next point.'
+            permit = True
+
+        self._log_time_check(
+            note,
+            category_name=category_name,
+            current_datetime=current_datetime,
+            start_datetime=start_datetime,
+            end_datetime=end_datetime,
+            last_send_datetime=last_send_datetime,
+            qsize=qsize,
+            seconds_per_day=seconds_per_day,
+            seconds_total=seconds_total,
+            seconds_left=seconds_left,
+            period_global=period_global,
+            periods=periods,
+            period=period,
+            target=target,
+            cooldown=cooldown)
+        return (permit, target, cooldown)
+
+    def _log_time_check(self, note, **values):
         # DEBUG
-        debug_msg += (
-            f'\n  target: {target}'
-            f'\n  cooldown: {cooldown}'
-            '\n  Send at the next point.')
-        self.bot.logger.debug(debug_msg)
-        return (True, cooldown)
-
-    def _get_last_send_datetime_db(self, category_name):
-        import psycopg2
-
-        conn = psycopg2.connect(**self.bot.config.db)
-        cur = conn.cursor()
-
-        # If the table does not exist
-        statement = '''
-            SELECT * FROM information_schema.tables
-            WHERE table_name = 'pics_sending_module';
-            '''
-        cur.execute(statement)
-        if not cur.rowcount:
-            cur.close()
-            conn.close()
-            return None
-
-        statement = '''
-            SELECT last_send_datetime FROM pics_sending_module
-            WHERE category_name = %s;
-            '''
-        cur.execute(statement, (category_name,))
-        data = cur.fetchone()
-        microseconds = None if data is None else data[0]
-
-        if microseconds is None:
-            cur.close()
-            conn.close()
-            return None
-
-        timestamp = microseconds / 1e6
-        dt = datetime.fromtimestamp(timestamp)
-
-        cur.close()
-        conn.close()
-        return dt
-
-    def _set_last_send_datetime_db(self, category_name, datetime):
-        import psycopg2
-
-        conn = psycopg2.connect(**self.bot.config.db)
-        cur = conn.cursor()
-
-        # Create a table if it does not exist
-        statement = '''
-            CREATE TABLE IF NOT EXISTS pics_sending_module (
-                category_name varchar(255) PRIMARY KEY,
-                last_send_datetime bigint);
-            '''
-        cur.execute(statement)
-
-        statement = '''
-            INSERT INTO pics_sending_module (category_name, last_send_datetime)
-            VALUES (%(name)s, %(ts)s)
-            ON CONFLICT (category_name) DO
-                UPDATE
-                SET last_send_datetime = %(ts)s;
-            '''
-        timestamp = (None if datetime is None
-                     else round(datetime.timestamp() * 1e6))
-        cur.execute(statement, {'name': category_name, 'ts': timestamp})
-
-        conn.commit()
-        cur.close()
-        conn.close()
+        #  The message is only built when it is going to be logged
+        if not self.bot.logger.isEnabledFor(logging.DEBUG):
+            return
+        msg = self._log_prefix + '_time_check:'
+        for k, v in values.items():
+            msg += f'\n  {k}: {v}'
+        msg += f'\n  {note}'
+        self.bot.logger.debug(msg)
 
     async def _send_pic(self, category_name):
         category = self.bot.config.pics_categories[category_name]
-        directory = category['send_directory']
         channel_id = category['send_channel_id']
-        archive_directory = category['send_archive_directory']
+        queue = self.queues[category_name]
+        send_history = self.histories.get(category_name)
 
         channel = self.bot.client.get_channel(channel_id)
-        pics_path_list = get_pics_path_list(directory)
-
-        if not pics_path_list:
+        pic_path = queue.first()
+        digest = None
+        buffered = None
+        entry = self._read_ahead.get(category_name)
+        if entry is not None and entry[0] == pic_path:
+            del self._read_ahead[category_name]
+            #  Waits for the reading in progress
+            await asyncio.wait((entry[1],))
+            if not entry[1].cancelled():
+                digest = entry[1].result()
+            buffered = self.bot.read_ahead.take(pic_path)
+        else:
+            self._drop_read_ahead(category_name)
+
+        while (pic_path is not None and send_history is not None and
+                send_history.loaded):
+            if digest is None:
+                #  Not hashed ahead
+                try:
+                    digest = await self.bot.fs_io.run(
+                        'hash', sha256_file, pic_path)
+                except FileNotFoundError:
+                    queue.discard(pic_path)
+                    pic_path = queue.first()
+                    continue
+                except OSError as e:
+                    #  Sent without the check
+                    self.bot.logger.error(
+                        self._log_prefix +
+                        f'Caught an exception of type `{type(e).__name__}` '
+                        f'while hashing the picture "{pic_path}": {e}')
+                    break
+            sent = send_history.find(category_name, digest)
+            if sent is None:
+                break
+            sent_datetime = datetime.fromtimestamp(sent[2])
+            self.bot.logger.warning(
+                self._log_prefix +
+                f'The picture on the path "{pic_path}" was already sent '
+                f'at {sent_datetime} (message id: {sent[1]}), skipped.')
+            await self._dispose_pic(category, queue, pic_path)
+            #  Discarded even if it is not disposed, so it is not hashed
+            #  again until the next reconciliation
+            queue.discard(pic_path)
+            digest = buffered = None
+            pic_path = queue.first()
+
+        if pic_path is None:
             return False
 
-        pic_path = self._select_pic(pics_path_list)
+        upload_path = await self._get_upload_path(category_name, pic_path)
+        prepared = self._prepared.get(category_name)
+        if prepared is not None:
+            prepared.pop(pic_path, None)
+        #  Keeps the name of the picture with the extension of the upload
+        filename = (path.splitext(path.basename(pic_path))[0] +
+                    path.splitext(upload_path)[1])
+
         try:
-            file = discord.File(pic_path, filename=path.basename(pic_path))
-            await channel.send(file=file)
-            file.close()
+            if buffered is not None and buffered[0] == upload_path:
+                file = discord.File(io.BytesIO(buffered[1]), filename)
+            else:
+                file = await self.bot.fs_io.open_file(upload_path, filename)
+            try:
+                start = self.bot.loop.time()
+                message = await self.bot.outbound.send(
+                    OutboundQueue.SCHEDULED, channel, file=file)
+                self.send_seconds.labels(category=category_name).observe(
+                    self.bot.loop.time() - start)
+            finally:
+                file.close()
+        except FileNotFoundError:
+            queue.discard(pic_path)
+            self.bot.logger.warning(
+                self._log_prefix +
+                f'The picture on the path "{pic_path}" no longer exists.')
+            return False
         except Exception as e:
             self.bot.logger.error(
                 self._log_prefix +
@@ -323,9 +893,32 @@ class PicsSendingModule(Module):
             self._log_prefix +
             f'Sent a picture on the path: "{pic_path}".')
 
+        if upload_path != pic_path:
+            try:
+                await self.bot.fs_io.remove(upload_path)
+            except OSError:
+                pass  # Pruned on the next reconciliation
+
+        if digest is not None and send_history.loaded:
+            send_history.add(
+                category_name, digest, channel_id, message.id, time.time())
+            try:
+                await self.bot.fs_io.run('history', send_history.flush)
+            except OSError as e:
+                self.bot.logger.error(
+                    self._log_prefix +
+                    f'Caught an exception of type `{type(e).__name__}` '
+                    f'while writing the history "{send_history.path}": {e}')
+
+        await self._dispose_pic(category, queue, pic_path)
+        return True
+
+    async def _dispose_pic(self, category, queue, pic_path):
+        archive_directory = category['send_archive_directory']
         if archive_directory is None:
             try:
-                remove(pic_path)
+                await self.bot.fs_io.remove(pic_path)
+                queue.discard(pic_path)
             except OSError as e:
                 self.bot.logger.error(
                     self._log_prefix +
@@ -333,8 +926,10 @@ class PicsSendingModule(Module):
                     f'while removing file from disk: {e}')
         else:
             try:
-                dst = path.join(archive_directory, path.basename(pic_path))
-                rename(pic_path, dst)
+                await self.bot.fs_io.run(
+                    'archive', archive_file, pic_path, archive_directory,
+                    category['send_archive_layout'])
+                queue.discard(pic_path)
             except OSError as e:
                 self.bot.logger.error(
                     self._log_prefix +
@@ -342,16 +937,6 @@ class PicsSendingModule(Module):
                     f'while moving file "{pic_path}" '
                     f'to the archive directory: {e}')
 
-        return True
-
-    @staticmethod
-    def _select_pic(pics):
-        #  Sort by file name
-        pics = sorted(
-            pics,
-            key=lambda x: path.splitext(path.basename(x))[0])
-        return pics[0]
-
     def stop(self, timeout=None):
         self.close_task = self.bot.loop.create_task(self._close(timeout))
 
@@ -363,6 +948,24 @@ class PicsSendingModule(Module):
             self.bot.logger.error(
                 self._log_prefix +
                 'The execution was forcibly terminated by timeout.')
+        if self.state_store is not None:
+            try:
+                await self.state_store.close()
+            except Exception as e:
+                self.bot.logger.error(
+                    self._log_prefix +
+                    f'Caught an exception of type `{type(e).__name__}` '
+                    f'while writing the state to the database: {e}')
+        for send_history in (set(self._histories_by_path.values()) |
+                             self._retired_histories):
+            send_history.close()
+        for prepared in self._prepared.values():
+            for task in prepared.values():
+                task.cancel()
+        for category_name in list(self._read_ahead):
+            self._drop_read_ahead(category_name)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
 
     async def _closer(self):
         try:
@@ -375,29 +978,7 @@ class PicsSendingModule(Module):
                     idle_event.set()
 
     async def _task_closer(self, task):
-        idle_event = self.tasks[task]
+        idle_event = self.tasks.get(task)
         if idle_event is not None:
             await idle_event.wait()
         task.cancel()
-
-
-class _FileSystemEventHandler(FileSystemEventHandler):
-
-    def __init__(self, directory, monitoring_event, loop):
-        self.directory = directory
-        self.monitoring_event = monitoring_event
-        self.loop = loop
-        self.prev_set = set()
-
-    def on_created(self, event):
-        if not isinstance(event, FileCreatedEvent):
-            return
-
-        curr_set = set(get_pics_path_list(self.directory))
-        if curr_set - self.prev_set:
-            self.loop.call_soon_threadsafe(self._event)
-        self.prev_set = curr_set
-
-    def _event(self):
-        self.monitoring_event.set()
-        self.monitoring_event.clear()
@@ -1,30 +1,92 @@
 from asyncio import Event
 from asyncio import Task
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
 from typing import Optional
-from typing import Sequence
+from typing import Set
 from typing import Tuple
 
 from bot.bot import DiscordBot
+from bot.utils.fs_watcher import DirectoryWatcher
+from bot.utils.metrics import Collected
+from bot.utils.metrics import MetricFamily
+from bot.utils.pics_queue import PicsQueue
+from bot.utils.send_history import SendHistory
+from bot.utils.state_store import StateStore
 from .module import Module
 
 
 class PicsSendingModule(Module):
     """A module for sending images to discord text channels.
 
+    All the categories are served by a single dispatcher task,
+    which keeps a min-heap of the planned sending deadlines.
+    The plan of a category is recalculated only after its sending,
+    the change of its queue size or the end of its time window.
+
+    If ``send_max_size`` is set for a category, the next pictures
+    of its queue are recompressed in a process pool in advance,
+    so the send only uploads the prepared file.
+
+    Shortly before the deadline of a category, the next picture
+    is read into memory within the budget of ``bot.read_ahead``,
+    so the send does not wait for the disk.
+
+    Sent pictures are archived into the date shards given by
+    ``send_archive_layout``, and the old shards are packed hourly
+    if ``send_archive_pack_after`` is set.
+
+    Before the send, the picture is looked up in the history
+    of the category by its SHA-256 digest, and the pictures
+    that were already sent are disposed of without sending.
+
     Attributes:
         tasks: All tasks related to the current module.
-        monitoring_events: Events of locating new files on disk
+        queues: In-memory indexes of the queued pictures
             for each category.
         last_send_datetime: Planned or happened time of the last sending
             for each category.
+        histories: Histories of the sent pictures by the category,
+            if ``send_history`` is set. Categories sending from
+            the same directory share the history.
+        state_store: Persistent storage of ``last_send_datetime``
+            if the database is configured.
+        send_seconds: Histograms of the upload duration by the category.
+        schedule_drift: Histograms of the delay of the sends
+            after their planned time by the category.
 
     """
 
     tasks: Dict[Task, Optional[Event]]
-    monitoring_events: Dict[str, Event]
+    queues: Dict[str, PicsQueue]
     last_send_datetime: Dict[str, Optional[datetime]]
+    histories: Dict[str, SendHistory]
+    state_store: Optional[StateStore]
+    send_seconds: MetricFamily
+    schedule_drift: MetricFamily
+
+    _heap: List[Tuple[float, int, str, int]]
+    _generations: Dict[str, int]
+    _plans: Dict[str, Tuple[int, bool, datetime]]
+    _windows: Dict[str, Tuple[datetime, bool, datetime, datetime]]
+    _dirty: Set[str]
+    _sending: Set[str]
+    _wakeup: Event
+    _prepared: Dict[str, Dict[str, Task]]
+    _executor: Optional[ProcessPoolExecutor]
+    _read_ahead: Dict[str, Tuple[str, Task]]
+    _watcher: Optional[DirectoryWatcher]
+    _watches: Dict[str, Tuple[str, Callable[[Set[str], Set[str]], None]]]
+    _reconcile_times: Dict[str, float]
+    _monitor_wakeup: Event
+    _histories_by_path: Dict[str, SendHistory]
+    _history_loads: Dict[SendHistory, Task]
+    _retired_histories: Set[SendHistory]
 
     def __init__(self, bot: DiscordBot):
         """
@@ -33,21 +95,118 @@ class PicsSendingModule(Module):
 
         """
 
-    async def _start(self, category_name: str): ...
+    def reload(self, old_categories: Dict[str, Dict]):
+        """Applies the changes of ``bot.config.pics_categories``.
+
+        Added categories are indexed and scheduled, removed ones
+        stop being watched and sent, the schedule of changed ones
+        is planned again. A category whose ``send_directory``
+        is changed is removed and added again.
+
+        Args:
+            old_categories: The categories before the reload.
+
+        """
+
+    def _add_category(self, category_name: str): ...
+
+    async def _start_category(self, category_name: str):
+        """Loads the state of the added category and indexes its queue."""
+
+    def _remove_category(self, category_name: str): ...
+
+    def _retire_history(self, send_history: SendHistory):
+        """Stops using the history, it is closed on the shutdown."""
+
+    async def _load_histories(self, category_names: Iterable[str]):
+        """Loads the histories of the categories.
+
+        The history is disabled if it can not be loaded.
+        """
+
+    def _retune_category(self, category_name: str, old_category: Dict): ...
+
+    def _update_executor(self):
+        """Creates the process pool once a category needs it."""
+
+    def _collect_metrics(self) -> Iterator[Collected]: ...
+
+    def _forget_task(self, task: Task): ...
+
+    async def _start(self): ...
+
+    async def _send_scheduled(self, category_name: str, target: datetime, idle_event: Event):
+        """Sends the next picture of the category and saves the time
+        of the send, the categories are sent concurrently."""
+
+    def _on_sent(self, category_name: str, task: Task):
+        """Plans the next send of the category."""
 
-    async def _start_monitoring(self, category_name: str): ...
+    async def _load_last_send_datetime(self, category_name: str): ...
 
-    @staticmethod
-    async def _time_check(category_name: str) -> Tuple[bool, float]: ...
+    def _on_queue_changed(self, category_name: str): ...
 
-    def _get_last_send_datetime_db(self, category_name: str) -> Optional[datetime]: ...
+    def _replan_dirty(self): ...
 
-    def _set_last_send_datetime_db(self, category_name: str, datetime: Optional[datetime]): ...
+    def _plan(self, category_name: str): ...
+
+    def _prepare_ahead(self, category_name: str):
+        """Starts preparing the next pictures of the queue.
+
+        Cancels the preparation of pictures that left the queue.
+        """
+
+    async def _get_upload_path(self, category_name: str, pic_path: str) -> str:
+        """Returns the path to the prepared picture or to the original."""
+
+    def _start_read_ahead(self, category_name: str):
+        """Starts reading the next picture of the category into memory."""
+
+    async def _read_pic_ahead(self, category_name: str, pic_path: str) -> Optional[bytes]:
+        """Reads the upload of the picture into the read-ahead cache.
+
+        Returns:
+            The SHA-256 digest of the picture if the category
+            keeps the history, so it is not hashed on the send.
+
+        """
+
+    def _drop_read_ahead(self, category_name: str):
+        """Cancels the reading ahead and frees its buffer."""
+
+    async def _prepare(self, pic_path: str, max_size: int) -> Optional[str]: ...
+
+    async def _start_state_store(self): ...
+
+    async def _flush_state(self):
+        """Writes the changes of the state every ``db/flush_interval``."""
+
+    async def _start_monitoring(self): ...
+
+    def _watch(self, category_name: str): ...
+
+    def _unwatch(self, category_name: str): ...
+
+    def _on_files_changed(self, category_name: str, queue: PicsQueue, added: Set[str], removed: Set[str]):
+        """Applies a batch of changes of the directory to the queue."""
+
+    def _schedule_reconcile(self, category_name: str): ...
+
+    async def _reconcile_queue(self, category_name: str): ...
+
+    def _get_window(self, category_name: str, current_datetime: datetime) -> Tuple[bool, datetime, datetime]: ...
+
+    def _time_check(self, category_name: str, qsize: int) -> Tuple[bool, datetime, float]: ...
+
+    def _log_time_check(self, note: str, **values): ...
 
     async def _send_pic(self, category_name: str) -> bool: ...
 
-    @staticmethod
-    def _select_pic(pics: Sequence[str]): ...
+    async def _dispose_pic(self, category: Dict, queue: PicsQueue, pic_path: str):
+        """Removes the picture or moves it to the archive."""
+
+    async def _compact_archives(self):
+        """Packs the archive shards older than ``send_archive_pack_after``."""
 
     async def _close(self, timeout: Optional[float] = None): ...
 
@@ -1,14 +1,43 @@
 import asyncio
+import hashlib
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime
 from datetime import timezone
+from uuid import uuid4
 
 import aiofiles
 import discord
 from aiohttp import ClientSession
+from aiohttp import ClientTimeout
+from aiohttp import TCPConnector
+from aiohttp import TraceConfig
 from aiohttp import web
 
 from .module import Module
+from ..utils import DedupIndex
+from ..utils import OutboundQueue
+from ..utils import diff_categories
+from ..utils import get_pics_path_list
+from ..utils.archive import get_archive_pics_path_list
+from ..utils.images import dhash
+from ..utils.images import hash_file
+
+
+_CHUNK_SIZE = 64 * 1024
+_CONNECTION_LIMIT = 32
+_CONNECTION_LIMIT_PER_HOST = 8
+_DNS_CACHE_TTL = 300
+_KEEPALIVE_TIMEOUT = 60
+_DOWNLOAD_TIMEOUT = ClientTimeout(total=300, connect=15, sock_read=60)
+_PENDING_CACHE_SIZE = 10000
+_MAX_BATCH_SIZE = 1000
+_INDEX_FILE_NAME = '.pics_index'
+_INDEX_FLUSH_BATCH = 256
+_STAGING_DIRECTORY = '.staging'
+_STAGING_TTL = 7 * 24 * 60 * 60
+_METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
 
 
 class PicsSuggestionModule(Module):
@@ -19,29 +48,273 @@ class PicsSuggestionModule(Module):
         self.bot = bot
         self.to_close = asyncio.Event()
 
+        self.categories = self._get_categories()
+        self.indexes, _ = self._create_indexes(self.categories, {})
+        self.suggestion_info = {}
+        self._update_suggestion_info()
+        self.indexes_loaded = asyncio.Event()
+
+        self.server = web.Server(
+            self._request_handler,
+            loop=self.bot.loop,
+            keepalive_timeout=_KEEPALIVE_TIMEOUT)
+        self.server_runner = web.ServerRunner(self.server)
+        self.site = None
+        self.session = None
+        self.connection_stats = {'new': 0, 'reused': 0}
+        self.pending = OrderedDict()
+        self._deciding = set()
+        self._indexing_task = None
+        self._reload_tasks = set()
+        self._retired_indexes = set()
+        self._intake_queue = asyncio.Queue()
+        self._intake_workers = []
+
+        self.download_seconds = self.bot.metrics.histogram(
+            'pics_download_seconds',
+            'Duration of downloading a suggested picture.')
+        self.download_bytes = self.bot.metrics.counter(
+            'pics_download_bytes_total',
+            'Bytes of the suggested pictures downloaded.')
+        self.bot.metrics.add_collector(self._collect_metrics)
+
+        self._update_subscriptions()
+
+    def _get_categories(self):
+        categories_data = self.bot.config.pics_categories or {}
+        return {k for k in categories_data
+                if type(self).__name__ in categories_data[k]['modules']}
+
+    def _get_index_path(self, category_name):
+        category = self.bot.config.pics_categories[category_name]
+        if not category['suggestion_dedup']:
+            return None
+        return os.path.join(category['suggestion_directory'], _INDEX_FILE_NAME)
+
+    def _create_indexes(self, categories, indexes_by_path):
+        #  Returns: indexes by category, created indexes
+        categories_data = self.bot.config.pics_categories
+        indexes = {}
+        created = set()
+        for k in categories:
+            index_path = self._get_index_path(k)
+            if index_path is None:
+                continue
+            #  Categories saving to the same directory share the index
+            index = indexes_by_path.get(index_path)
+            if index is None:
+                index = indexes_by_path[index_path] = DedupIndex(index_path)
+                created.add(index)
+            indexes[k] = index
+        for index in set(indexes.values()):
+            #  The strictest distance of the categories sharing the index
+            index.max_distance = min(
+                categories_data[k]['suggestion_dedup_distance']
+                for k, v in indexes.items() if v is index)
+        return indexes, created
+
+    def _update_suggestion_info(self):
         categories_data = self.bot.config.pics_categories
-        self.categories = {
-            k for k in categories_data
-            if type(self).__name__ in categories_data[k]['modules']}
         self.suggestion_info = {
             categories_data[k]['suggestion_channel_id']:
                 (categories_data[k]['suggestion_directory'],
                  categories_data[k]['suggestion_positive'],
-                 categories_data[k]['suggestion_negative'])
+                 categories_data[k]['suggestion_negative'],
+                 categories_data[k]['suggestion_max_size'],
+                 self.indexes.get(k))
             for k in self.categories}
 
-        self.server = web.Server(self._request_handler, loop=self.bot.loop)
-        self.server_runner = web.ServerRunner(self.server)
-        self.site = None
+    def _update_subscriptions(self):
+        event_handler = self.bot.event_handler
+        for event in ('raw_reaction_add', 'raw_reaction_remove'):
+            if self.suggestion_info:
+                event_handler.subscribe(event, self.reaction_handler)
+            else:
+                event_handler.unsubscribe(event, self.reaction_handler)
+
+    def reload(self, old_categories):
+        added, removed, changed = diff_categories(
+            old_categories, self.bot.config.pics_categories or {},
+            type(self).__name__)
+        if not (added or removed or changed):
+            return
+
+        self.categories = self._get_categories()
+        current = {index.path: index for index in self.indexes.values()}
+        indexes, created = self._create_indexes(
+            self.categories, dict(current))
+        #  Closed with the module, they may be in use
+        self._retired_indexes.update(
+            set(current.values()) - set(indexes.values()))
+
+        if self._indexing_task is None:
+            self.indexes = indexes  # Loaded on the launch
+        else:
+            #  The created indexes are used once they are loaded
+            self.indexes = {
+                k: v for k, v in indexes.items() if v not in created}
+            if created:
+                task = self.bot.loop.create_task(self._start_indexing({
+                    k: v for k, v in indexes.items() if v in created}))
+                self._reload_tasks.add(task)
+                task.add_done_callback(self._reload_tasks.discard)
+        self._update_suggestion_info()
+        self._update_subscriptions()
+
+        self.bot.logger.info(
+            self._log_prefix +
+            f'Reloaded the categories: {len(added)} added, '
+            f'{len(removed)} removed, {len(changed)} changed.')
 
     def run(self):
+        self.bot.startup.start('suggestion_indexing')
         self.bot.loop.create_task(self._start())
 
     async def _start(self):
+        trace_config = TraceConfig()
+        trace_config.on_connection_create_end.append(
+            self._on_connection_create)
+        trace_config.on_connection_reuseconn.append(
+            self._on_connection_reuse)
+        self.session = ClientSession(
+            connector=TCPConnector(
+                limit=_CONNECTION_LIMIT,
+                limit_per_host=_CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=_DNS_CACHE_TTL,
+                keepalive_timeout=_KEEPALIVE_TIMEOUT),
+            timeout=_DOWNLOAD_TIMEOUT,
+            trace_configs=[trace_config])
+
+        self._indexing_task = self.bot.loop.create_task(
+            self._start_indexing())
+        self._intake_workers = [
+            self.bot.loop.create_task(self._intake_worker())
+            for _ in range(self.bot.config.suggestion_workers)]
+
         await self.server_runner.setup()
         self.site = web.TCPSite(self.server_runner, '0.0.0.0', 21520)
         await self.site.start()
 
+    def _collect_metrics(self):
+        yield ('pics_download_connections_total', 'counter',
+               'Connections of the download session by their origin.',
+               [('', {'origin': k}, v)
+                for k, v in self.connection_stats.items()])
+        yield ('pics_suggestion_intake_size', 'gauge',
+               'Suggested links waiting for an intake worker.',
+               [('', {}, self._intake_queue.qsize())])
+        yield ('pics_suggestion_pending_size', 'gauge',
+               'Pending suggestions cached in memory.',
+               [('', {}, len(self.pending))])
+
+    async def _on_connection_create(self, session, context, params):
+        self.connection_stats['new'] += 1
+
+    async def _on_connection_reuse(self, session, context, params):
+        self.connection_stats['reused'] += 1
+
+    async def _start_indexing(self, category_indexes=None):
+        is_launch = category_indexes is None
+        if is_launch:
+            category_indexes = self.indexes
+        categories_data = self.bot.config.pics_categories
+        fs_io = self.bot.fs_io
+        indexes = {}
+        archive_directories = set()
+        for k, index in category_indexes.items():
+            directories = indexes.setdefault(index, set())
+            directories.add(categories_data[k]['suggestion_directory'])
+            for key in ('send_directory', 'send_archive_directory'):
+                if categories_data[k].get(key) is not None:
+                    directories.add(categories_data[k][key])
+            if categories_data[k].get('send_archive_directory') is not None:
+                archive_directories.add(
+                    categories_data[k]['send_archive_directory'])
+
+        for index in list(indexes):
+            try:
+                await fs_io.run('index', index.load)
+            except OSError as e:
+                self.bot.logger.error(
+                    self._log_prefix +
+                    f'Caught an exception of type `{type(e).__name__}` '
+                    f'while loading the index "{index.path}": {e}. '
+                    'Duplicates will not be detected.')
+                if is_launch:
+                    self._disable_index(index)
+                del indexes[index]
+        if is_launch:
+            self.indexes_loaded.set()
+        else:
+            for k, index in category_indexes.items():
+                #  Skipping the categories changed by another reload
+                if (index in indexes and k in self.categories and
+                        k not in self.indexes and
+                        self._get_index_path(k) == index.path):
+                    self.indexes[k] = index
+            self._update_suggestion_info()
+
+        #  Pictures that got into the directories bypassing the module
+        for index, directories in indexes.items():
+            count = 0
+            for directory in directories:
+                await self._remove_stale_staged_files(directory)
+                #  The archive is sharded into sub-directories,
+                #  the packed pictures are already indexed
+                paths = await fs_io.run(
+                    'scan',
+                    get_archive_pics_path_list
+                    if directory in archive_directories
+                    else get_pics_path_list,
+                    directory)
+                stats = await fs_io.run('scan', _stat_files, paths)
+                for pic_path, stat in stats:
+                    if self.to_close.is_set():
+                        return
+                    if index.is_indexed(pic_path, stat):
+                        continue
+                    try:
+                        digest, phash = await fs_io.run(
+                            'hash', hash_file, pic_path)
+                    except OSError:
+                        continue  # Sent or removed in the meantime
+                    index.add(digest, phash, pic_path, stat)
+                    count += 1
+                    if count % _INDEX_FLUSH_BATCH == 0:
+                        await fs_io.run('index', index.flush)
+            await fs_io.run('index', index.flush)
+            self.bot.logger.info(
+                self._log_prefix +
+                f'Indexed {count} new pictures, the index "{index.path}" '
+                f'contains {len(index)} unique pictures.')
+        if is_launch:
+            self.bot.startup.finish('suggestion_indexing')
+
+    def _disable_index(self, index):
+        self.indexes = {
+            k: v for k, v in self.indexes.items() if v is not index}
+        self._update_suggestion_info()
+
+    async def _remove_stale_staged_files(self, directory):
+        staging_directory = os.path.join(directory, _STAGING_DIRECTORY)
+
+        def remove_stale():
+            if not os.path.isdir(staging_directory):
+                return
+            expiration = time.time() - _STAGING_TTL
+            with os.scandir(staging_directory) as it:
+                for entry in it:
+                    if entry.stat().st_mtime < expiration:
+                        os.remove(entry.path)
+
+        try:
+            await self.bot.fs_io.run('remove', remove_stale)
+        except OSError as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while removing stale staged files: {e}')
+
     def stop(self, timeout=None):
         self.close_task = self.bot.loop.create_task(self._close(timeout))
 
@@ -53,6 +326,17 @@ class PicsSuggestionModule(Module):
             self.bot.logger.warning(
                 self._log_prefix +
                 'The execution was forcibly terminated by timeout.')
+        if self._indexing_task is not None:
+            self._indexing_task.cancel()
+        for task in self._reload_tasks:
+            task.cancel()
+        for task in self._intake_workers:
+            task.cancel()
+        while not self._intake_queue.empty():
+            *_, future = self._intake_queue.get_nowait()
+            future.cancel()
+        for index in set(self.indexes.values()) | self._retired_indexes:
+            index.close()
 
     async def _closer(self, timeout):
         try:
@@ -60,8 +344,15 @@ class PicsSuggestionModule(Module):
             await self.site.stop()
         except asyncio.CancelledError:  # on timeout
             await self.site.stop()
+        finally:
+            if self.session is not None:
+                await self.session.close()
 
     async def _request_handler(self, request):
+        if request.method == 'GET' and request.path == '/metrics':
+            return web.Response(
+                text=self.bot.metrics.render(),
+                headers={'Content-Type': _METRICS_CONTENT_TYPE})
         try:
             if self.to_close.is_set():
                 msg = 'Suggestion service unavailable.'
@@ -72,11 +363,15 @@ class PicsSuggestionModule(Module):
 
             category = json.get('category', None)
             link = json.get('link', None)
+            links = json.get('links', None)
 
             if (category is None or
-                link is None or
                 category not in self.categories or
-                    not isinstance(link, str)):
+                (links is None) == (link is None) or
+                not (link is None or isinstance(link, str)) or
+                not (links is None or
+                     isinstance(links, list) and
+                     0 < len(links) <= _MAX_BATCH_SIZE)):
                 msg = 'POST request has invalid data.'
                 self.bot.logger.warning(self._log_prefix + msg)
                 return web.Response(status=400, text=msg)
@@ -97,33 +392,108 @@ class PicsSuggestionModule(Module):
                 self.bot.logger.warning(self._log_prefix + msg)
                 return web.Response(status=500, text=msg)
 
-            category_data = self.bot.config.pics_categories[category]
-            channel = self.bot.client.get_channel(
-                category_data['suggestion_channel_id'])
-            positive = category_data['suggestion_positive']
-            negative = category_data['suggestion_negative']
+            if link is not None:
+                status, msg = await self._submit(category, link)
+                return web.Response(status=status, text=msg)
 
-            try:
-                message = await channel.send(link)
-                await message.add_reaction(positive)
-                await message.add_reaction(negative)
-            except (discord.HTTPException, discord.InvalidArgument) as e:
-                msg_log = ('Caught an exception of type '
-                           f'`discord.{type(e).__name__}` '
-                           f'while sending the suggestion: {e}')
-                self.bot.logger.error(self._log_prefix + msg_log)
-                msg_response = ('An internal error occurred '
-                                'while sending the suggestion.')
-                return web.Response(status=500, text=msg_response)
-
-            return web.Response(text='OK')
+            results = await asyncio.gather(
+                *(self._submit(category, link) for link in links))
+            return web.json_response({'results': [
+                {'link': link, 'status': status, 'message': msg}
+                for link, (status, msg) in zip(links, results)]})
 
         except asyncio.CancelledError:
             msg = ('The bot is not ready to process '
                    'the request at this time.')
             return web.Response(status=500, text=msg)
 
+    def _submit(self, category, link):
+        future = self.bot.loop.create_future()
+        if not isinstance(link, str):
+            future.set_result((400, 'The link is not a string.'))
+        else:
+            self._intake_queue.put_nowait((category, link, future))
+        return future
+
+    async def _intake_worker(self):
+        while True:
+            category, link, future = await self._intake_queue.get()
+            if future.done():
+                continue  # The request was cancelled
+            try:
+                result = await self._suggest(category, link)
+            except Exception as e:
+                self.bot.logger.error(
+                    self._log_prefix +
+                    f'Caught an exception of type `{type(e).__name__}` '
+                    f'while processing the suggestion: {e}')
+                result = (500, 'An internal error occurred '
+                               'while processing the suggestion.')
+            if not future.done():
+                future.set_result(result)
+
+    async def _suggest(self, category, link):
+        if category not in self.categories:
+            return 400, 'The category is no longer available.'
+        category_data = self.bot.config.pics_categories[category]
+        channel = self.bot.client.get_channel(
+            category_data['suggestion_channel_id'])
+        positive = category_data['suggestion_positive']
+        negative = category_data['suggestion_negative']
+        directory = category_data['suggestion_directory']
+
+        #  Rejects duplicates before the discord round trip
+        index = self.indexes.get(category)
+        if index is not None:
+            await self.indexes_loaded.wait()
+            hashes = await self._stage_file(
+                link, directory, category_data['suggestion_max_size'])
+            if hashes is None:
+                return 400, 'The picture can not be downloaded.'
+            duplicate = index.find(*hashes)
+            if duplicate is not None:
+                await self._remove_file(self._staged_path(link, directory))
+                self.bot.logger.info(
+                    self._log_prefix +
+                    f'Rejected a suggestion by URL: "{link}" '
+                    f'as a duplicate of "{duplicate}".')
+                return 409, 'The picture is a duplicate of a saved one.'
+
+        try:
+            outbound = self.bot.outbound
+            message = await outbound.send(
+                OutboundQueue.SUGGESTION, channel, link)
+            suggestion = self._cache_suggestion(message.id, link)
+            await outbound.add_reaction(
+                OutboundQueue.SUGGESTION, message, positive)
+            suggestion.positive += 1
+            await outbound.add_reaction(
+                OutboundQueue.SUGGESTION, message, negative)
+            suggestion.negative += 1
+        except (discord.HTTPException, discord.InvalidArgument) as e:
+            msg_log = ('Caught an exception of type '
+                       f'`discord.{type(e).__name__}` '
+                       f'while sending the suggestion: {e}')
+            self.bot.logger.error(self._log_prefix + msg_log)
+            if index is not None:
+                await self._remove_file(self._staged_path(link, directory))
+            return 500, ('An internal error occurred '
+                         'while sending the suggestion.')
+
+        return 200, 'OK'
+
     async def reaction_handler(self, payload):
+        try:
+            (
+                directory,
+                positive,
+                negative,
+                max_size,
+                index,
+            ) = self.suggestion_info[payload.channel_id]
+        except KeyError:
+            return  # Respond only to actions in suggestion channels
+
         if self.to_close.is_set():
             self.bot.logger.warning(
                 self._log_prefix +
@@ -134,92 +504,282 @@ class PicsSuggestionModule(Module):
         if payload.user_id == self.bot.client.user.id:
             return  # Do not respond to bot actions
 
-        channel = self.bot.client.get_channel(payload.channel_id)
-        message = await channel.fetch_message(payload.message_id)
+        emoji = str(payload.emoji)
+        if emoji not in (positive, negative):
+            return
+
+        is_added = payload.event_type == 'REACTION_ADD'
+        suggestion = self.pending.get(payload.message_id)
+        if suggestion is None:
+            if not is_added or payload.message_id in self._deciding:
+                return  # Removing a reaction never makes a decision
+            # Counts of the fetched message already include this reaction
+            suggestion = await self._fetch_suggestion(
+                payload, positive, negative)
+            if suggestion is None:
+                return
+        else:
+            delta = 1 if is_added else -1
+            if emoji == positive:
+                suggestion.positive += delta
+            else:
+                suggestion.negative += delta
+            self.pending.move_to_end(payload.message_id)
+
+        if not is_added or payload.message_id in self._deciding:
+            return
+
+        if suggestion.positive == suggestion.negative:
+            return
 
+        # Prevent repeated processing until the message is deleted,
+        # the entry is kept, so the message is not fetched again
+        self._deciding.add(payload.message_id)
         try:
-            (
-                directory,
-                positive,
-                negative,
-            ) = self.suggestion_info[message.channel.id]
-        except KeyError:
-            return  # Respond only to actions in suggestion channels
+            if suggestion.positive > suggestion.negative:
+                to_delete = await self._save_file(
+                    suggestion.content, directory, max_size, index)
+            else:
+                self.bot.logger.info(
+                    self._log_prefix +
+                    f'Rejected a picture by URL: "{suggestion.content}".')
+                if index is not None:
+                    await self._remove_file(
+                        self._staged_path(suggestion.content, directory))
+                to_delete = True
+
+            if to_delete:
+                self.pending.pop(payload.message_id, None)
+                channel = self.bot.client.get_channel(payload.channel_id)
+                try:
+                    await self.bot.outbound.delete_message(
+                        OutboundQueue.CLEANUP,
+                        channel.get_partial_message(payload.message_id))
+                except discord.HTTPException:
+                    self.bot.logger.error(
+                        self._log_prefix +
+                        'Can not delete the message after approval.')
+        finally:
+            self._deciding.discard(payload.message_id)
 
-        positive_count = 0
-        negative_count = 0
+    async def _fetch_suggestion(self, payload, positive, negative):
+        channel = self.bot.client.get_channel(payload.channel_id)
+        try:
+            message = await channel.fetch_message(payload.message_id)
+        except discord.HTTPException as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `discord.{type(e).__name__}` '
+                f'while fetching the suggestion: {e}')
+            return None
+
+        suggestion = self._cache_suggestion(message.id, message.content)
         for reaction in message.reactions:
             if reaction.emoji == positive:
-                positive_count = reaction.count
+                suggestion.positive = reaction.count
             elif reaction.emoji == negative:
-                negative_count = reaction.count
+                suggestion.negative = reaction.count
+        return suggestion
+
+    def _cache_suggestion(self, message_id, content):
+        suggestion = _PendingSuggestion(content)
+        self.pending[message_id] = suggestion
+        if len(self.pending) > _PENDING_CACHE_SIZE:
+            self.pending.popitem(last=False)
+        return suggestion
+
+    async def _stage_file(self, url, directory, max_size):
+        staging_directory = os.path.join(directory, _STAGING_DIRECTORY)
+        tmp_path = None
+
+        try:
+            await self.bot.fs_io.run(
+                'mkdir', os.makedirs, staging_directory, 0o777, True)
+            downloaded = await self._download(
+                url, staging_directory, max_size)
+            if downloaded is None:
+                return None
+            tmp_path, digest = downloaded
+            phash = await self.bot.fs_io.run('hash', dhash, tmp_path)
+            await self.bot.fs_io.replace(
+                tmp_path, self._staged_path(url, directory))
+            tmp_path = None
+        except Exception as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while staging the picture: {e}')
+            return None
+        finally:
+            if tmp_path is not None:
+                await self._remove_file(tmp_path)
+
+        return digest, phash
+
+    @staticmethod
+    def _staged_path(url, directory):
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(directory, _STAGING_DIRECTORY, name)
 
-        if positive_count > negative_count:
-            is_saved = await self._save_file(message.content, directory)
-            to_delete = is_saved
-        elif negative_count > positive_count:
+    async def _save_file(self, url, directory, max_size, index=None):
+        fs_io = self.bot.fs_io
+        tmp_path = None
+
+        try:
+            hashes = None
+            if index is not None:
+                #  Staged at intake unless suggested before dedup was enabled
+                try:
+                    staged_path = self._staged_path(url, directory)
+                    hashes = await fs_io.run('hash', hash_file, staged_path)
+                    tmp_path = staged_path
+                except FileNotFoundError:
+                    pass
+            if tmp_path is None:
+                downloaded = await self._download(url, directory, max_size)
+                if downloaded is None:
+                    return False
+                tmp_path, digest = downloaded
+                if index is not None:
+                    hashes = digest, await fs_io.run('hash', dhash, tmp_path)
+
+            if hashes is not None:
+                #  Another copy may have been approved since the intake
+                duplicate = index.find(*hashes)
+                if duplicate is not None:
+                    self.bot.logger.info(
+                        self._log_prefix +
+                        f'Rejected a picture by URL: "{url}" as a duplicate '
+                        f'of "{duplicate}".')
+                    return True
+
+            if hashes is not None:
+                #  Linked or renamed, so the size and the time are kept
+                stat = await fs_io.run('scan', os.stat, tmp_path)
+            now = datetime.now(timezone.utc).timestamp() * 1000
+            file_name = str(round(now)) + _url_extension(url)
+            path = await fs_io.move(
+                tmp_path, os.path.join(directory, file_name))
+            tmp_path = None
+            if hashes is not None:
+                index.add(*hashes, path, stat)
+                await fs_io.run('index', index.flush)
             self.bot.logger.info(
                 self._log_prefix +
-                f'Rejected a picture by URL: "{message.content}".')
-            to_delete = True
+                f'Saved a picture by URL: "{url}" '
+                f'on the path: "{path}".')
+        except Exception as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while saving the picture: {e}')
+            return False
+        finally:
+            if tmp_path is not None:
+                await self._remove_file(tmp_path)
 
-        if to_delete:
-            try:
-                await message.delete()
-            except discord.HTTPException:
-                self.bot.logger.error(
-                    self._log_prefix +
-                    'Can not delete the message after approval.')
+        return True
 
-    async def _save_file(self, url, directory):
+    async def _download(self, url, directory, max_size):
         file = None
-        path = None
+        tmp_path = None
+        start = self.bot.loop.time()
+        download_bytes = self.download_bytes.labels()
 
         try:
-            async with ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        self.bot.logger.error(
-                            self._log_prefix +
-                            'An error occurred while saving the picture: '
-                            'The client received a response with the status '
-                            f'`{response.status}` and with the message: '
-                            f'"{await response.text()}".')
-                        return False
-                    now = datetime.now(timezone.utc).timestamp() * 1000
-                    ext = os.path.splitext(url)[1].split('?')[0]
-                    if ext.lower() not in ('.png', '.jpg', '.jpeg'):
+            async with self.session.get(url) as response:
+                if response.status != 200:
+                    self.bot.logger.error(
+                        self._log_prefix +
+                        'An error occurred while downloading the picture: '
+                        'The client received a response with the status '
+                        f'`{response.status}` and with the message: '
+                        f'"{await response.text()}".')
+                    return None
+                ext = _url_extension(url)
+                if ext.lower() not in ('.png', '.jpg', '.jpeg'):
+                    self.bot.logger.error(
+                        self._log_prefix +
+                        'An error occurred while downloading the picture: '
+                        'The URL should point to a file with one of the '
+                        'following extensions: (".png", ".jpg", ".jpeg"), '
+                        f'but got "{ext}".')
+                    return None
+                if (response.content_length is not None and
+                        response.content_length > max_size):
+                    self.bot.logger.error(
+                        self._log_prefix +
+                        'An error occurred while downloading the picture: '
+                        f'The file size of {response.content_length} '
+                        f'bytes exceeds the limit of {max_size} bytes.')
+                    return None
+                #  Not a picture until it is complete
+                tmp_path = os.path.join(directory, f'.{uuid4().hex}.part')
+                file = await aiofiles.open(tmp_path, mode='wb')
+                digest = hashlib.sha256()
+                size = 0
+                async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_size:
                         self.bot.logger.error(
                             self._log_prefix +
-                            'An error occurred while saving the picture: '
-                            'The URL should point to a file with one of the '
-                            'following extensions: (".png", ".jpg", ".jpeg"), '
-                            f'but got "{ext}".')
-                        return False
-                    file_name = str(round(now)) + ext
-                    path = os.path.join(directory, file_name)
-                    file = await aiofiles.open(path, mode='wb')
-                    await file.write(await response.read())
-                    await file.close()
-                    file = None
-                    self.bot.logger.info(
-                        self._log_prefix +
-                        f'Saved a picture by URL: "{url}" '
-                        f'on the path: "{path}".')
+                            'An error occurred while downloading the picture: '
+                            'The file size exceeds the limit '
+                            f'of {max_size} bytes.')
+                        return None
+                    download_bytes.inc(len(chunk))
+                    digest.update(chunk)
+                    await file.write(chunk)
+                await file.close()
+                file = None
+                self.download_seconds.labels().observe(
+                    self.bot.loop.time() - start)
+                result = tmp_path, digest.digest()
+                tmp_path = None
+                return result
         except Exception as e:
             self.bot.logger.error(
                 self._log_prefix +
                 f'Caught an exception of type `{type(e).__name__}` '
-                f'while saving the picture: {e}')
+                f'while downloading the picture: {e}')
+            return None
+        finally:
             if file is not None:
                 await file.close()
-                try:
-                    os.remove(path)
-                except OSError as e:
-                    self.bot.logger.error(
-                        self._log_prefix +
-                        f'Caught an exception of type `{type(e).__name__}` '
-                        f'while removing file from disk: {e}')
-            return False
+            if tmp_path is not None:
+                await self._remove_file(tmp_path)
 
-        return True
+    async def _remove_file(self, path):
+        try:
+            await self.bot.fs_io.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.bot.logger.error(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while removing file from disk: {e}')
+
+
+class _PendingSuggestion:
+
+    __slots__ = ('content', 'positive', 'negative')
+
+    def __init__(self, content):
+        self.content = content
+        self.positive = 0
+        self.negative = 0
+
+
+def _stat_files(paths):
+    stats = []
+    for path in paths:
+        try:
+            stats.append((path, os.stat(path)))
+        except OSError:
+            pass  # Sent or removed in the meantime
+    return stats
+
+
+def _url_extension(url):
+    return os.path.splitext(url)[1].split('?')[0]
@@ -1,8 +1,19 @@
+from asyncio import Event
+from asyncio import Future
+from asyncio import Queue
+from asyncio import Task
+from os import stat_result
 from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import OrderedDict
 from typing import Optional
 from typing import Set
 from typing import Tuple
 
+from aiohttp import ClientSession
+from aiohttp import TraceConnectionCreateEndParams
+from aiohttp import TraceConnectionReuseconnParams
 from aiohttp import web
 from aiohttp.web import Server
 from aiohttp.web import ServerRunner
@@ -10,6 +21,9 @@ from aiohttp.web import TCPSite
 from discord import RawReactionActionEvent
 
 from bot.bot import DiscordBot
+from bot.utils import DedupIndex
+from bot.utils.metrics import Collected
+from bot.utils.metrics import MetricFamily
 from .module import Module
 
 
@@ -19,17 +33,45 @@ class PicsSuggestionModule(Module):
     Attributes:
         categories: List of active categories for this module.
         suggestion_info: Contains the required information by channel id.
+        indexes: Indexes of the saved pictures by category,
+            if the duplicates are rejected.
+        indexes_loaded: The event that is set when the indexes
+            are loaded from the disk.
         server: The ``Server`` object.
         server_runner: The ``ServerRunner`` object.
         site: ``TCPSite`` object for receiving POST requests.
+        session: The HTTP client session shared by all downloads.
+            It is created on start and closed on shutdown.
+        connection_stats: Numbers of the ``new`` and ``reused``
+            connections of the ``session``.
+        pending: Reaction tallies of the pending suggestions
+            by message id, the least recently used first. It is filled
+            when a suggestion is posted or fetched after a cache miss.
+        download_seconds: The histogram of the durations
+            of the successful downloads.
+        download_bytes: The counter of the downloaded bytes.
 
     """
 
     categories: Set[str]
-    suggestion_info: Dict[int, Tuple[str, str, str]]
+    indexes: Dict[str, DedupIndex]
+    suggestion_info: Dict[int, Tuple[str, str, str, int, Optional[DedupIndex]]]
+    indexes_loaded: Event
     server: Server
     server_runner: ServerRunner
     site: TCPSite
+    session: Optional[ClientSession]
+    connection_stats: Dict[str, int]
+    pending: OrderedDict[int, _PendingSuggestion]
+    download_seconds: MetricFamily
+    download_bytes: MetricFamily
+
+    _deciding: Set[int]
+    _indexing_task: Optional[Task]
+    _reload_tasks: Set[Task]
+    _retired_indexes: Set[DedupIndex]
+    _intake_queue: Queue[Tuple[str, str, Future]]
+    _intake_workers: List[Task]
 
     def __init__(self, bot: DiscordBot):
         """
@@ -38,14 +80,161 @@ class PicsSuggestionModule(Module):
 
         """
 
+    def _get_categories(self) -> Set[str]: ...
+
+    def _get_index_path(self, category_name: str) -> Optional[str]:
+        """Returns the path to the index of the category if it is used."""
+
+    def _create_indexes(self, categories: Set[str], indexes_by_path: Dict[str, DedupIndex]) -> Tuple[Dict[str, DedupIndex], Set[DedupIndex]]:
+        """Returns the indexes of the categories.
+
+        The indexes missing from ``indexes_by_path`` are created
+        and added to it, they are returned separately and have
+        to be loaded before use.
+        """
+
+    def _update_suggestion_info(self): ...
+
+    def _update_subscriptions(self):
+        """Receives reactions only while there are suggestion channels."""
+
+    def reload(self, old_categories: Dict[str, Dict]):
+        """Applies the changes of ``bot.config.pics_categories``.
+
+        The channels, emoji and limits of the categories are replaced
+        at once. Indexes of new directories are loaded in the background,
+        duplicates are not rejected for their categories until then.
+
+        Args:
+            old_categories: The categories before the reload.
+
+        """
+
     async def _start(self): ...
 
+    async def _start_indexing(self, category_indexes: Optional[Dict[str, DedupIndex]] = None):
+        """Loads the indexes and adds the pictures missing from them.
+
+        The pictures could get to the directories bypassing the module.
+        By default loads all the indexes on the launch, otherwise
+        loads the given indexes created by a reload and starts
+        using them.
+        """
+
+    def _disable_index(self, index: DedupIndex): ...
+
+    async def _remove_stale_staged_files(self, directory: str): ...
+
+    def _collect_metrics(self) -> Iterator[Collected]: ...
+
+    async def _on_connection_create(self, session: ClientSession, context, params: TraceConnectionCreateEndParams): ...
+
+    async def _on_connection_reuse(self, session: ClientSession, context, params: TraceConnectionReuseconnParams): ...
+
     async def _close(self, timeout: Optional[float]): ...
 
     async def _closer(self, timeout: Optional[float]): ...
 
-    async def _request_handler(self, request: web.Request): ...
+    async def _request_handler(self, request: web.Request) -> web.Response:
+        """Handles the POST request with a single link or a batch of links.
+
+        The links are processed by the pool of ``_intake_worker``
+        tasks shared by all requests, and the batch is answered
+        with the results of all its links.
+
+        The GET request to ``/metrics`` is answered with the metrics
+        of the bot in the Prometheus text format.
+        """
+
+    def _submit(self, category: str, link: str) -> Future:
+        """Queues the link for processing.
+
+        Returns:
+            The future of the status and the message of the result.
+
+        """
+
+    async def _intake_worker(self): ...
+
+    async def _suggest(self, category: str, link: str) -> Tuple[int, str]:
+        """Sends the suggestion to the suggestion channel.
+
+        Returns:
+            The status and the message of the result.
+
+        """
+
+    async def reaction_handler(self, payload: RawReactionActionEvent):
+        """Handles adding and removing reactions to the suggestions.
+
+        The suggestion is approved or rejected as soon as
+        the corresponding reaction gets the majority.
+        Subscribed to the "raw_reaction_add" and "raw_reaction_remove"
+        events if any category has the suggestion channel.
+
+        Args:
+            payload: The payload of the reaction event.
+
+        """
+
+    async def _fetch_suggestion(self, payload: RawReactionActionEvent, positive: str, negative: str) -> Optional[_PendingSuggestion]: ...
+
+    def _cache_suggestion(self, message_id: int, content: str) -> _PendingSuggestion: ...
+
+    async def _stage_file(self, url: str, directory: str, max_size: int) -> Optional[Tuple[bytes, Optional[int]]]:
+        """Downloads the suggested picture to the staging directory.
+
+        The staged file is used after approval
+        instead of downloading the picture again.
+
+        Returns:
+            The SHA-256 digest and the difference hash of the picture,
+            or ``None`` if the picture can not be downloaded.
+
+        """
+
+    @staticmethod
+    def _staged_path(url: str, directory: str) -> str: ...
+
+    async def _save_file(self, url: str, directory: str, max_size: int, index: Optional[DedupIndex] = None) -> bool:
+        """Saves the approved picture to the directory.
+
+        Returns:
+            ``True`` if the suggestion is resolved and its message
+            should be deleted, including the case of a duplicate.
+
+        """
+
+    async def _download(self, url: str, directory: str, max_size: int) -> Optional[Tuple[str, bytes]]:
+        """Downloads the picture to a temporary file in the directory.
+
+        Returns:
+            The path to the temporary file and the SHA-256 digest
+            of the picture, or ``None`` on failure.
+
+        """
+
+    async def _remove_file(self, path: str): ...
+
+
+class _PendingSuggestion:
+    """Reaction tally of a pending suggestion.
+
+    Attributes:
+        content: The content of the suggestion message.
+        positive: The number of positive reactions.
+        negative: The number of negative reactions.
+
+    """
+
+    content: str
+    positive: int
+    negative: int
+
+    def __init__(self, content: str): ...
+
+
+def _stat_files(paths: List[str]) -> List[Tuple[str, stat_result]]: ...
 
-    async def reaction_handler(self, payload: RawReactionActionEvent): ...
 
-    async def _save_file(self, url: str, directory: str): ...
+def _url_extension(url: str) -> str: ...
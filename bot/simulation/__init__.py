@@ -0,0 +1,20 @@
+"""Contains an offline harness for simulating the bot under load."""
+
+from .fake_client import FakeClient
+from .scenarios import LoopLagProbe
+from .scenarios import Scenario
+from .scenarios import SendingScenario
+from .scenarios import SuggestionScenario
+from .scenarios import run_scenario
+from .simulated_bot import SimulatedDiscordBot
+
+
+__all__ = [
+    'FakeClient',
+    'LoopLagProbe',
+    'Scenario',
+    'SendingScenario',
+    'SuggestionScenario',
+    'run_scenario',
+    'SimulatedDiscordBot',
+]
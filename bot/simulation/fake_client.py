@@ -0,0 +1,272 @@
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+
+import discord
+from multidict import CIMultiDict
+from yarl import URL
+
+
+_ROUTES = {
+    'send': ('POST', '/channels/{}/messages'),
+    'add_reaction': ('PUT', '/channels/{}/messages/{}/reactions/emoji/@me'),
+    'fetch_message': ('GET', '/channels/{}/messages/{}'),
+    'delete': ('DELETE', '/channels/{}/messages/{}'),
+}
+
+
+class FakeClient:
+
+    def __init__(self, latency=0.05, jitter=0.0, rate_limit_probability=0.0,
+                 rate_limit_retry_after=1.0, seed=None, bucket_limit=None,
+                 bucket_reset_after=1.0, http_trace=None):
+        if not 0 <= rate_limit_probability < 1:
+            raise ValueError(
+                'Parameter `rate_limit_probability` must be '
+                'in the range [0, 1).')
+
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_probability = rate_limit_probability
+        self.rate_limit_retry_after = rate_limit_retry_after
+        self.bucket_limit = bucket_limit
+        self.bucket_reset_after = bucket_reset_after
+        self.http_trace = http_trace
+
+        self.user = FakeUser(0, 'FakeBot')
+        self.guilds = [FakeGuild(1, 'FakeGuild')]
+        self.channels = {}
+        self.history = []
+        self.stats = Counter()
+        self.listeners = []
+
+        self._ready = asyncio.Event()
+        self._closed = asyncio.Event()
+        self._ids = itertools.count(1)
+        self._random = random.Random(seed)
+        self._windows = {}
+
+    def event(self, coro):
+        setattr(self, coro.__name__, coro)
+        return coro
+
+    def dispatch(self, event, *args):
+        coro = getattr(self, 'on_' + event, None)
+        if coro is not None:
+            asyncio.ensure_future(coro(*args))
+
+    async def start(self, token):
+        self._ready.set()
+        self.dispatch('connect')
+        self.dispatch('ready')
+        await self._closed.wait()
+
+    async def close(self):
+        self._closed.set()
+
+    def is_closed(self):
+        return self._closed.is_set()
+
+    async def wait_until_ready(self):
+        await self._ready.wait()
+
+    def get_channel(self, id):
+        channel = self.channels.get(id)
+        if channel is None:
+            channel = self.channels[id] = FakeChannel(self, id)
+        return channel
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def react(self, message, emoji, user_id):
+        message._add_reaction(emoji)
+        self.dispatch(
+            'raw_reaction_add',
+            FakeReactionPayload(message, emoji, user_id, 'REACTION_ADD'))
+
+    async def _request(self, action, channel_id, message_id=None, size=0):
+        self.stats[action] += 1
+        #  Retrying the same way as discord.py does on 429 responses
+        while True:
+            await asyncio.sleep(
+                self.latency + self.jitter * self._random.random())
+            retry_after, headers = self._take_bucket(action, channel_id)
+            if (retry_after is None and
+                    self._random.random() < self.rate_limit_probability):
+                retry_after = self.rate_limit_retry_after
+                headers['Retry-After'] = str(retry_after)
+            status = 200 if retry_after is None else 429
+            await self._trace(action, channel_id, message_id, status, headers)
+            if retry_after is None:
+                break
+            self.stats['rate_limited'] += 1
+            await asyncio.sleep(retry_after)
+        self.history.append(
+            (time.monotonic(), action, channel_id, message_id, size))
+
+    def _take_bucket(self, action, channel_id):
+        headers = CIMultiDict()
+        if self.bucket_limit is None:
+            return None, headers
+        now = time.monotonic()
+        reset_at, used = self._windows.get((action, channel_id), (0.0, 0))
+        if now >= reset_at:
+            reset_at, used = now + self.bucket_reset_after, 0
+        retry_after = None if used < self.bucket_limit else reset_at - now
+        if retry_after is None:
+            used += 1
+        self._windows[(action, channel_id)] = (reset_at, used)
+        headers['X-RateLimit-Bucket'] = action
+        headers['X-RateLimit-Limit'] = str(self.bucket_limit)
+        headers['X-RateLimit-Remaining'] = str(self.bucket_limit - used)
+        headers['X-RateLimit-Reset-After'] = f'{reset_at - now:.3f}'
+        if retry_after is not None:
+            headers['Retry-After'] = f'{retry_after:.3f}'
+        return retry_after, headers
+
+    async def _trace(self, action, channel_id, message_id, status, headers):
+        if self.http_trace is None:
+            return
+        method, path = _ROUTES[action]
+        params = _FakeTraceParams(
+            method,
+            URL('https://discord.com/api/v10' +
+                path.format(channel_id, message_id)),
+            _FakeResponse(
+                status, 'OK' if status == 200 else 'Too Many Requests',
+                headers))
+        for callback in self.http_trace.on_request_end:
+            await callback(None, None, params)
+
+    def _notify(self, action, message):
+        for listener in self.listeners:
+            listener(action, message)
+
+    def _next_id(self):
+        return next(self._ids)
+
+
+class FakeUser:
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+    def __str__(self):
+        return self.name
+
+
+class FakeGuild:
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+class FakeChannel:
+
+    def __init__(self, client, id):
+        self.client = client
+        self.id = id
+        self.messages = {}
+
+    async def send(self, content=None, *, file=None, embed=None):
+        size = 0
+        filename = None
+        if file is not None:
+            size = len(file.fp.read())
+            filename = file.filename
+        message = FakeMessage(
+            self, self.client._next_id(), content, filename, embed)
+        await self.client._request('send', self.id, message.id, size)
+        self.messages[message.id] = message
+        self.client._notify('send', message)
+        return message
+
+    async def fetch_message(self, id):
+        await self.client._request('fetch_message', self.id, id)
+        try:
+            return self.messages[id]
+        except KeyError:
+            raise discord.NotFound(
+                _FakeResponse(404, 'Not Found'), 'Unknown Message')
+
+    def get_partial_message(self, id):
+        return FakePartialMessage(self, id)
+
+
+class FakePartialMessage:
+
+    def __init__(self, channel, id):
+        self.channel = channel
+        self.id = id
+
+    async def delete(self):
+        client = self.channel.client
+        await client._request('delete', self.channel.id, self.id)
+        message = self.channel.messages.pop(self.id, None)
+        if message is None:
+            raise discord.NotFound(
+                _FakeResponse(404, 'Not Found'), 'Unknown Message')
+        client._notify('delete', message)
+
+
+class FakeMessage(FakePartialMessage):
+
+    def __init__(self, channel, id, content, filename=None, embed=None):
+        super().__init__(channel, id)
+        self.content = content
+        self.filename = filename
+        self.embed = embed
+        self.reactions = []
+
+    async def add_reaction(self, emoji):
+        client = self.channel.client
+        await client._request('add_reaction', self.channel.id, self.id)
+        self._add_reaction(emoji)
+        client.dispatch(
+            'raw_reaction_add',
+            FakeReactionPayload(self, emoji, client.user.id, 'REACTION_ADD'))
+
+    def _add_reaction(self, emoji):
+        for reaction in self.reactions:
+            if reaction.emoji == emoji:
+                reaction.count += 1
+                return
+        self.reactions.append(FakeReaction(emoji))
+
+
+class FakeReaction:
+
+    def __init__(self, emoji, count=1):
+        self.emoji = emoji
+        self.count = count
+
+
+class FakeReactionPayload:
+
+    def __init__(self, message, emoji, user_id, event_type):
+        self.channel_id = message.channel.id
+        self.message_id = message.id
+        self.user_id = user_id
+        self.emoji = emoji
+        self.event_type = event_type
+
+
+class _FakeResponse:
+
+    def __init__(self, status, reason, headers=None):
+        self.status = status
+        self.reason = reason
+        self.headers = CIMultiDict() if headers is None else headers
+
+
+class _FakeTraceParams:
+
+    def __init__(self, method, url, response):
+        self.method = method
+        self.url = url
+        self.response = response
@@ -0,0 +1,254 @@
+from typing import Callable
+from typing import Coroutine
+from typing import Counter
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from aiohttp import TraceConfig
+from discord import Embed
+from discord import File
+from multidict import CIMultiDict
+from yarl import URL
+
+
+class FakeClient:
+    """A local stand-in for ``discord.Client``.
+
+    Implements the part of the client interface used by the bot.
+    Every request (sending, reacting, fetching and deleting messages)
+    is recorded and delayed by the configured latency, and may
+    randomly receive a 429 response, after which the request
+    is retried like discord.py does. With ``bucket_limit`` set,
+    every action in every channel has its own rate limit bucket,
+    and the "X-RateLimit-*" headers are passed to ``http_trace``.
+
+    Attributes:
+        latency: Latency of every request in seconds.
+        jitter: Maximum random addition to the latency in seconds.
+        rate_limit_probability: Probability of a request
+            to receive a 429 response.
+        rate_limit_retry_after: Waiting time after a 429 response
+            in seconds.
+        bucket_limit: The number of requests in a rate limit window
+            of a bucket, or ``None`` for no limits and headers.
+        bucket_reset_after: The duration of a rate limit window
+            in seconds.
+        http_trace: The trace configuration that receives
+            the emulated responses.
+        user: The user of the bot.
+        guilds: Guilds the bot is connected to.
+        channels: Channels by id, created on the first access.
+        history: Records of the completed requests of the format
+            (time, action, channel id, message id, uploaded bytes).
+        stats: Numbers of the requests by action, and the number
+            of 429 responses by the "rate_limited" key.
+        listeners: Callbacks called with the action name
+            and the message after the message is sent or deleted.
+
+    """
+
+    latency: float
+    jitter: float
+    rate_limit_probability: float
+    rate_limit_retry_after: float
+    bucket_limit: Optional[int]
+    bucket_reset_after: float
+    http_trace: Optional[TraceConfig]
+    user: FakeUser
+    guilds: List[FakeGuild]
+    channels: Dict[int, FakeChannel]
+    history: List[Tuple[float, str, int, Optional[int], int]]
+    stats: Counter[str]
+    listeners: List[Callable[[str, FakeMessage], None]]
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, rate_limit_probability: float = 0.0, rate_limit_retry_after: float = 1.0, seed: Optional[int] = None, bucket_limit: Optional[int] = None, bucket_reset_after: float = 1.0, http_trace: Optional[TraceConfig] = None):
+        """
+        Args:
+            latency: Latency of every request in seconds.
+            jitter: Maximum random addition to the latency in seconds.
+            rate_limit_probability: Probability of a request
+                to receive a 429 response.
+            rate_limit_retry_after: Waiting time after a 429 response
+                in seconds.
+            seed: Seed of the random generator.
+            bucket_limit: The number of requests in a rate limit window
+                of a bucket, or ``None`` for no limits and headers.
+            bucket_reset_after: The duration of a rate limit window
+                in seconds.
+            http_trace: The trace configuration that receives
+                the emulated responses.
+
+        Raises:
+            ValueError: ``rate_limit_probability`` is not
+                in the range [0, 1).
+
+        """
+
+    def event(self, coro: Callable[..., Coroutine]) -> Callable[..., Coroutine]:
+        """Registers an event handler the way ``discord.Client`` does."""
+
+    def dispatch(self, event: str, *args):
+        """Schedules the handler of the event if it is registered.
+
+        Args:
+            event: The name of the event without the "on_" prefix.
+            *args: Arguments for the handler.
+
+        """
+
+    async def start(self, token: str):
+        """Dispatches the "ready" event and waits until closed."""
+
+    async def close(self): ...
+
+    def is_closed(self) -> bool: ...
+
+    async def wait_until_ready(self): ...
+
+    def get_channel(self, id: int) -> FakeChannel: ...
+
+    def add_listener(self, listener: Callable[[str, FakeMessage], None]):
+        """Adds a callback to the ``listeners``."""
+
+    def react(self, message: FakeMessage, emoji: str, user_id: int):
+        """Adds a reaction of another user to the message.
+
+        Dispatches the "raw_reaction_add" event.
+
+        Args:
+            message: The message to react to.
+            emoji: The emoji of the reaction.
+            user_id: The id of the reacting user.
+
+        """
+
+    async def _request(self, action: str, channel_id: int, message_id: Optional[int] = None, size: int = 0): ...
+
+    def _take_bucket(self, action: str, channel_id: int) -> Tuple[Optional[float], CIMultiDict]: ...
+
+    async def _trace(self, action: str, channel_id: int, message_id: Optional[int], status: int, headers: CIMultiDict): ...
+
+    def _notify(self, action: str, message: FakeMessage): ...
+
+    def _next_id(self) -> int: ...
+
+
+class FakeUser:
+
+    id: int
+    name: str
+
+    def __init__(self, id: int, name: str): ...
+
+
+class FakeGuild:
+
+    id: int
+    name: str
+
+    def __init__(self, id: int, name: str): ...
+
+
+class FakeChannel:
+    """A local stand-in for ``discord.TextChannel``.
+
+    Attributes:
+        client: The client of the channel.
+        id: The id of the channel.
+        messages: Messages of the channel that are not deleted.
+
+    """
+
+    client: FakeClient
+    id: int
+    messages: Dict[int, FakeMessage]
+
+    def __init__(self, client: FakeClient, id: int): ...
+
+    async def send(self, content: Optional[str] = None, *, file: Optional[File] = None, embed: Optional[Embed] = None) -> FakeMessage:
+        """Sends the message, reading the attached file entirely."""
+
+    async def fetch_message(self, id: int) -> FakeMessage:
+        """Returns the message.
+
+        Raises:
+            discord.NotFound: The message does not exist.
+
+        """
+
+    def get_partial_message(self, id: int) -> FakePartialMessage: ...
+
+
+class FakePartialMessage:
+
+    channel: FakeChannel
+    id: int
+
+    def __init__(self, channel: FakeChannel, id: int): ...
+
+    async def delete(self):
+        """Deletes the message.
+
+        Raises:
+            discord.NotFound: The message does not exist.
+
+        """
+
+
+class FakeMessage(FakePartialMessage):
+
+    content: Optional[str]
+    filename: Optional[str]
+    embed: Optional[Embed]
+    reactions: List[FakeReaction]
+
+    def __init__(self, channel: FakeChannel, id: int, content: Optional[str], filename: Optional[str] = None, embed: Optional[Embed] = None): ...
+
+    async def add_reaction(self, emoji: str):
+        """Adds a reaction of the bot.
+
+        Dispatches the "raw_reaction_add" event.
+        """
+
+    def _add_reaction(self, emoji: str): ...
+
+
+class FakeReaction:
+
+    emoji: str
+    count: int
+
+    def __init__(self, emoji: str, count: int = 1): ...
+
+
+class FakeReactionPayload:
+    """A local stand-in for ``discord.RawReactionActionEvent``."""
+
+    channel_id: int
+    message_id: int
+    user_id: int
+    emoji: str
+    event_type: str
+
+    def __init__(self, message: FakeMessage, emoji: str, user_id: int, event_type: str): ...
+
+
+class _FakeResponse:
+
+    status: int
+    reason: str
+
+    headers: CIMultiDict
+
+    def __init__(self, status: int, reason: str, headers: Optional[CIMultiDict] = None): ...
+
+
+class _FakeTraceParams:
+
+    method: str
+    url: URL
+    response: _FakeResponse
+
+    def __init__(self, method: str, url: URL, response: _FakeResponse): ...
@@ -0,0 +1,361 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from datetime import timedelta
+
+from aiohttp import ClientSession
+from aiohttp import web
+
+from bot.utils import init_logger
+from .simulated_bot import SimulatedDiscordBot
+
+
+try:
+    import resource
+except ModuleNotFoundError:
+    resource = None
+
+
+class LoopLagProbe:
+
+    def __init__(self, loop, interval=0.05):
+        self.loop = loop
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    def start(self):
+        self._task = self.loop.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        try:
+            while True:
+                t = self.loop.time()
+                await asyncio.sleep(self.interval)
+                lag = self.loop.time() - t - self.interval
+                self.samples.append(max(lag, 0))
+        except asyncio.CancelledError:
+            pass
+
+    def summary(self):
+        return _summarize(self.samples)
+
+
+class Scenario:
+
+    name = None
+
+    def prepare(self, directory):
+        raise NotImplementedError
+
+    async def drive(self, bot):
+        raise NotImplementedError
+
+
+class SendingScenario(Scenario):
+
+    name = 'sending'
+
+    def __init__(self, categories=10, files=100, file_size=65536,
+                 duration=10.0):
+        self.categories = categories
+        self.files = files
+        self.file_size = file_size
+        self.duration = duration
+
+        self.window_seconds = None
+        self._directories = []
+
+    def prepare(self, directory):
+        #  A window of whole minutes from the current one, covering
+        #  the run, so the files are spread over it instead of a day
+        now = datetime.now()
+        start = now.replace(second=0, microsecond=0)
+        end = start + timedelta(minutes=math.ceil(self.duration / 60) + 1)
+        self.window_seconds = (end - start).total_seconds()
+
+        pics_categories = {}
+        for i in range(self.categories):
+            send_directory = os.path.join(directory, f'send_{i}')
+            archive_directory = os.path.join(directory, f'archive_{i}')
+            os.mkdir(send_directory)
+            os.mkdir(archive_directory)
+            for j in range(self.files):
+                _write_random_file(
+                    os.path.join(send_directory, f'{j:08}.png'),
+                    self.file_size)
+            self._directories.append(send_directory)
+            pics_categories[f'category_{i}'] = {
+                'send_directory': send_directory,
+                'send_channel_id': 1000 + i,
+                'send_start': start.strftime('%H:%M'),
+                'send_end': end.strftime('%H:%M'),
+                'send_reserve_days': 1,
+                'send_archive_directory': archive_directory,
+            }
+        return pics_categories
+
+    async def drive(self, bot):
+        await bot.client.wait_until_ready()
+        start = time.perf_counter()
+        #  Sent by the dispatcher on its schedule
+        await asyncio.sleep(self.duration)
+        seconds = time.perf_counter() - start
+        sent = bot.client.stats['send']
+
+        last_sends = {}
+        intervals = []
+        for t, action, channel_id, _, _ in bot.client.history:
+            if action != 'send':
+                continue
+            if channel_id in last_sends:
+                intervals.append(t - last_sends[channel_id])
+            last_sends[channel_id] = t
+
+        return {
+            'sent': sent,
+            'send_seconds': seconds,
+            'sends_per_second': sent / seconds if seconds else None,
+            'planned_interval': self.window_seconds / (self.files + 1),
+            'send_interval': _summarize(intervals),
+            'queue_size_left': sum(
+                len([n for n in os.listdir(d) if not n.startswith('.')])
+                for d in self._directories),
+        }
+
+
+class SuggestionScenario(Scenario):
+
+    name = 'suggestions'
+
+    def __init__(self, categories=1, rate=10.0, duration=10.0,
+                 file_size=65536, moderation_delay=0.5, port=21520,
+                 batch_size=1):
+        self.categories = categories
+        self.rate = rate
+        self.duration = duration
+        self.file_size = file_size
+        self.moderation_delay = moderation_delay
+        self.port = port
+        self.batch_size = batch_size
+
+        self._posted = {}
+        self._completed = []
+
+    def prepare(self, directory):
+        pics_categories = {}
+        for i in range(self.categories):
+            suggestion_directory = os.path.join(directory, f'suggestion_{i}')
+            os.mkdir(suggestion_directory)
+            pics_categories[f'category_{i}'] = {
+                'suggestion_directory': suggestion_directory,
+                'suggestion_channel_id': 2000 + i,
+            }
+        return pics_categories
+
+    async def drive(self, bot):
+        body = os.urandom(self.file_size)
+
+        async def image_handler(request):
+            #  Unique content, so the pictures are not duplicates
+            name = request.match_info['name'].encode()
+            return web.Response(
+                body=name + body[len(name):], content_type='image/png')
+
+        app = web.Application()
+        app.router.add_get('/{name}', image_handler)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        image_port = runner.addresses[0][1]
+
+        categories = bot.config.pics_categories
+        positive = {
+            categories[k]['suggestion_channel_id']:
+                categories[k]['suggestion_positive']
+            for k in categories}
+        user_ids = iter(range(10 ** 6, 10 ** 7))
+
+        def listener(action, message):
+            if message.channel.id not in positive:
+                return
+            if action == 'send':
+                bot.loop.call_later(
+                    self.moderation_delay,
+                    bot.client.react,
+                    message, positive[message.channel.id], next(user_ids))
+            elif action == 'delete' and message.content in self._posted:
+                self._completed.append(
+                    time.perf_counter() - self._posted[message.content])
+
+        bot.client.add_listener(listener)
+        await bot.client.wait_until_ready()
+        #  Waiting for the suggestion server
+        await asyncio.sleep(0.5)
+
+        statuses = []
+        latencies = []
+        url = f'http://127.0.0.1:{self.port}'
+        async with ClientSession() as session:
+            async def post(batch):
+                category = f'category_{batch % self.categories}'
+                first = batch * self.batch_size
+                links = [
+                    f'http://127.0.0.1:{image_port}/{i}.png'
+                    for i in range(first, first + self.batch_size)]
+                if len(links) == 1:
+                    data = {'category': category, 'link': links[0]}
+                else:
+                    data = {'category': category, 'links': links}
+                t = time.perf_counter()
+                for link in links:
+                    self._posted[link] = t
+                try:
+                    async with session.post(url, json=data) as response:
+                        if len(links) > 1 and response.status == 200:
+                            results = (await response.json())['results']
+                            statuses.extend(r['status'] for r in results)
+                        else:
+                            statuses.extend([response.status] * len(links))
+                except Exception:
+                    statuses.extend([None] * len(links))
+                latencies.append(time.perf_counter() - t)
+
+            tasks = []
+            start = time.perf_counter()
+            batches = int(self.rate * self.duration) // self.batch_size
+            for batch in range(batches):
+                delay = (start + batch * self.batch_size / self.rate -
+                         time.perf_counter())
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(bot.loop.create_task(post(batch)))
+            await asyncio.gather(*tasks)
+
+        accepted = statuses.count(200)
+        deadline = time.perf_counter() + self.moderation_delay + 30
+        while (len(self._completed) < accepted and
+               time.perf_counter() < deadline):
+            await asyncio.sleep(0.05)
+        seconds = time.perf_counter() - start
+        await runner.cleanup()
+
+        return {
+            'posted': len(statuses),
+            'accepted': accepted,
+            'post_latency': _summarize(latencies),
+            'completed': len(self._completed),
+            'completed_per_second': len(self._completed) / seconds,
+            'end_to_end_latency': _summarize(self._completed),
+        }
+
+
+def run_scenario(scenario, client_options=None, directory=None,
+                 logging_level='WARNING'):
+    with tempfile.TemporaryDirectory(dir=directory) as directory:
+        config_path = os.path.join(directory, 'config.json')
+        config = {
+            'token': 'SIMULATION',
+            'bot_channel_id': 1,
+            'pics_categories': scenario.prepare(directory),
+            'logging_level': logging_level,
+            'logging_file': os.path.join(directory, 'simulation.log'),
+        }
+        with open(config_path, 'w') as f:
+            json.dump(config, f)
+
+        formatter = logging.Formatter(
+            '[%(datetime)s][%(threadName)s][%(name)s]'
+            '[%(levelname)s]: %(message)s')
+        logger = init_logger(os.path.join(directory, 'simulation'), formatter)
+        logger.setLevel(logging_level)
+
+        bot = SimulatedDiscordBot(
+            config_path, logger, formatter, client_options)
+        probe = LoopLagProbe(bot.loop)
+        results = {}
+
+        async def driver():
+            probe.start()
+            try:
+                results.update(await scenario.drive(bot))
+            except Exception as e:
+                logger.exception(
+                    f'Scenario `{scenario.name}` failed: {e}')
+                results['error'] = f'{type(e).__name__}: {e}'
+            finally:
+                probe.stop()
+                bot.shutdown_allowed = True
+                bot.stop('Simulation is over.')
+
+        bot.loop.create_task(driver())
+        start = time.perf_counter()
+        bot.run()
+
+        return {
+            'scenario': scenario.name,
+            'seconds': time.perf_counter() - start,
+            'results': results,
+            'requests': dict(bot.client.stats),
+            'events': {
+                event: {
+                    'count': stats.count,
+                    'errors': stats.errors,
+                    'mean': stats.mean,
+                    'max': stats.max,
+                }
+                for event, stats in bot.event_handler.stats.items()},
+            'outbound': {
+                name: {
+                    'depth': bot.outbound.depth[name],
+                    'count': stats.count,
+                    'mean_wait': stats.mean,
+                    'max_wait': stats.max,
+                }
+                for name, stats in bot.outbound.wait_stats.items()},
+            'read_ahead': {
+                'hits': bot.read_ahead.hits,
+                'misses': bot.read_ahead.misses,
+                'rejected': bot.read_ahead.rejected,
+            },
+            'startup': {
+                name: phase['seconds']
+                for name, phase in bot.startup.summary().items()},
+            'loop_lag': probe.summary(),
+            'max_rss_kib': _max_rss_kib(),
+        }
+
+
+def _write_random_file(path, size):
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+
+
+def _summarize(samples):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return {
+        'count': len(samples),
+        'mean': statistics.fmean(samples),
+        'p50': samples[len(samples) // 2],
+        'p99': samples[min(int(len(samples) * 0.99), len(samples) - 1)],
+        'max': samples[-1],
+    }
+
+
+def _max_rss_kib():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -0,0 +1,158 @@
+from asyncio import AbstractEventLoop
+from asyncio import Task
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from .simulated_bot import SimulatedDiscordBot
+
+
+class LoopLagProbe:
+    """Measures the lag of the event loop.
+
+    Sleeps for ``interval`` in a loop and records how much longer
+    than requested every sleep took.
+
+    Attributes:
+        loop: The event loop to be measured.
+        interval: The interval between measurements in seconds.
+        samples: The measured lags in seconds.
+
+    """
+
+    loop: AbstractEventLoop
+    interval: float
+    samples: List[float]
+
+    _task: Optional[Task]
+
+    def __init__(self, loop: AbstractEventLoop, interval: float = 0.05): ...
+
+    def start(self): ...
+
+    def stop(self): ...
+
+    async def _run(self): ...
+
+    def summary(self) -> Optional[Dict[str, float]]:
+        """Returns the count, mean, p50, p99 and max of the samples."""
+
+
+class Scenario:
+    """Base class for simulation scenarios.
+
+    Attributes:
+        name: The name of the scenario.
+
+    """
+
+    name: str
+
+    def prepare(self, directory: str) -> Dict:
+        """Creates files of the scenario in the directory.
+
+        Returns:
+            The value of the ``pics_categories`` configuration parameter.
+
+        """
+
+    async def drive(self, bot: SimulatedDiscordBot) -> Dict:
+        """Runs the scenario against the running bot.
+
+        Returns:
+            Results of the scenario.
+
+        """
+
+
+class SendingScenario(Scenario):
+    """N categories with M queued files each.
+
+    The pictures are sent by the dispatcher of the module on its
+    schedule. The send window of the categories is only a few minutes
+    long, covering the run, so the files are spread over it instead
+    of a day, and the interval between the sends of a category is
+    about the window divided by the number of its files.
+
+    Measures the sends over the whole run and the intervals
+    between the sends of every category.
+
+    Attributes:
+        categories: The number of categories.
+        files: The number of files in every category.
+        file_size: The size of every file in bytes.
+        duration: The duration of the run in seconds.
+        window_seconds: The length of the send window in seconds.
+
+    """
+
+    categories: int
+    files: int
+    file_size: int
+    duration: float
+    window_seconds: Optional[float]
+
+    _directories: List[str]
+
+    def __init__(self, categories: int = 10, files: int = 100, file_size: int = 65536, duration: float = 10.0): ...
+
+
+class SuggestionScenario(Scenario):
+    """K suggestions per second.
+
+    Suggestions are submitted to the suggestion server, pictures
+    are served by a local HTTP server, and every suggestion
+    is approved by a fake moderator after ``moderation_delay``.
+
+    Attributes:
+        categories: The number of categories.
+        rate: The number of suggestions per second.
+        duration: The duration of submitting in seconds.
+        file_size: The size of every picture in bytes.
+        moderation_delay: The time before a suggestion is approved
+            in seconds.
+        port: The port of the suggestion server.
+        batch_size: The number of links submitted by a single request.
+
+    """
+
+    categories: int
+    rate: float
+    duration: float
+    file_size: int
+    moderation_delay: float
+    port: int
+    batch_size: int
+
+    def __init__(self, categories: int = 1, rate: float = 10.0, duration: float = 10.0, file_size: int = 65536, moderation_delay: float = 0.5, port: int = 21520, batch_size: int = 1): ...
+
+
+def run_scenario(scenario: Scenario, client_options: Optional[Dict] = None, directory: Optional[str] = None, logging_level: str = 'WARNING') -> Dict:
+    """Runs the scenario on a bot with a fake discord client.
+
+    Works fully offline. The configuration and the files
+    of the scenario are created in a temporary directory.
+
+    Args:
+        scenario: The scenario to be run.
+        client_options: Keyword arguments for ``FakeClient``.
+        directory: The directory to create the temporary one in.
+        logging_level: Logging level of the bot.
+
+    Returns:
+        The report containing results of the scenario, numbers
+        of requests, dispatch counts and handler latency of events,
+        waiting in the outbound queue,
+        the lag of the event loop and the peak memory.
+
+    """
+
+
+def _write_random_file(path: str, size: int): ...
+
+
+def _summarize(samples: Sequence[float]) -> Optional[Dict[str, float]]: ...
+
+
+def _max_rss_kib() -> Optional[int]: ...
@@ -0,0 +1,14 @@
+from bot.bot import DiscordBot
+from .fake_client import FakeClient
+
+
+class SimulatedDiscordBot(DiscordBot):
+
+    def __init__(self, config_path, logger=None, formatter=None,
+                 client_options=None):
+        self.client_options = client_options or {}
+        super().__init__(config_path, logger, formatter)
+
+    def _create_client(self):
+        return FakeClient(
+            http_trace=self.outbound.trace_config, **self.client_options)
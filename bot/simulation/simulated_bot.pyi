@@ -0,0 +1,31 @@
+from logging import Formatter
+from logging import Logger
+from typing import Dict
+from typing import Optional
+
+from bot.bot import DiscordBot
+from .fake_client import FakeClient
+
+
+class SimulatedDiscordBot(DiscordBot):
+    """Discord bot that uses ``FakeClient`` instead of ``discord.Client``.
+
+    Attributes:
+        client_options: Keyword arguments for ``FakeClient``.
+
+    """
+
+    client_options: Dict
+    client: FakeClient
+
+    def __init__(self, config_path: str, logger: Optional[Logger] = None, formatter: Optional[Formatter] = None, client_options: Optional[Dict] = None):
+        """
+        Args:
+            config_path: The path to the json configuration file.
+            logger: Logger's object.
+            formatter: Formatter's object.
+            client_options: Keyword arguments for ``FakeClient``.
+
+        """
+
+    def _create_client(self) -> FakeClient: ...
@@ -0,0 +1,364 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing.connection import wait
+
+import discord
+
+from .bot import DiscordBot
+from .utils import Config
+from .utils import init_logger
+
+
+_HEALTH_INTERVAL = 10
+_HEALTH_TIMEOUT = 60
+_STOP_TIMEOUT = 30
+_MODULE_CHANNELS = {
+    'PicsSendingModule': 'send_channel_id',
+    'PicsSuggestionModule': 'suggestion_channel_id',
+}
+
+
+class Supervisor:
+
+    def __init__(self, config_path, workers, logger=None, formatter=None):
+        self._log_prefix = f'{type(self).__name__}: '
+
+        self.config_path = config_path
+        self.workers = workers
+        self.formatter = (
+            logging.Formatter(
+                '[%(datetime)s][%(processName)s][%(name)s]'
+                '[%(levelname)s]: %(message)s')
+            if formatter is None
+            else formatter)
+        self.logger = (init_logger(__file__, self.formatter) if logger is None
+                       else logger)
+        self.config = Config(self.config_path, self.logger, self.formatter)
+        self.config.apply_logging()
+        self.specs = []
+        self.processes = {}
+        self.connections = {}
+        self.health = {}
+
+        self._context = multiprocessing.get_context('spawn')
+        self._last_seen = {}
+        self._restart_at = {}
+
+    def run(self):
+        try:
+            guilds = asyncio.run(self._resolve_guilds())
+        except discord.LoginFailure as e:
+            self.logger.critical(
+                self._log_prefix +
+                'Caught an exception of type `discord.LoginFailure` '
+                f'while authorizing the bot\'s client: {e}')
+            return
+        except Exception as e:
+            self.logger.critical(
+                self._log_prefix +
+                f'Caught an exception of type `{type(e).__name__}` '
+                f'while getting the channels of the bot: {e}')
+            return
+        self.specs = self._plan(guilds)
+
+        msg = 'Workers:\n'
+        for spec in self.specs:
+            msg += (f'  worker-{spec["id"]}: shards {spec["shard_ids"]} '
+                    f'of {spec["shard_count"]}\n')
+            for category_name, modules in spec['modules'].items():
+                msg += f'    {category_name}: {", ".join(modules)}\n'
+        self.logger.info(self._log_prefix + msg.rstrip())
+
+        try:
+            for spec in self.specs:
+                self._spawn(spec)
+            self._monitor()
+        except (SystemExit, KeyboardInterrupt):
+            self.logger.info(self._log_prefix + 'Shutting down.')
+        finally:
+            self._stop_workers()
+
+    async def _resolve_guilds(self):
+        channel_ids = {self.config.bot_channel_id}
+        for category in (self.config.pics_categories or {}).values():
+            for module in category['modules']:
+                channel_ids.add(category[_MODULE_CHANNELS[module]])
+
+        guilds = {}
+        async with discord.Client(intents=discord.Intents.none()) as client:
+            await client.login(self.config.token)
+            for channel_id in sorted(channel_ids):
+                try:
+                    data = await client.http.get_channel(channel_id)
+                except discord.HTTPException as e:
+                    self.logger.warning(
+                        self._log_prefix +
+                        f'Caught an exception of type `{type(e).__name__}` '
+                        f'while getting the channel {channel_id}, '
+                        f'it is assigned to the shard 0: {e}')
+                    continue
+                if data.get('guild_id') is not None:
+                    guilds[channel_id] = int(data['guild_id'])
+        return guilds
+
+    def _plan(self, guilds):
+        shard_count = self.workers
+
+        def get_shard(channel_id):
+            #  Direct messages are received by the shard 0
+            guild_id = guilds.get(channel_id)
+            return 0 if guild_id is None else (guild_id >> 22) % shard_count
+
+        modules_by_shard = {}
+        suggestion_shards = set()
+        for category_name, category in (
+                self.config.pics_categories or {}).items():
+            for module in category['modules']:
+                shard_id = get_shard(category[_MODULE_CHANNELS[module]])
+                modules_by_shard.setdefault(shard_id, {}).setdefault(
+                    category_name, []).append(module)
+                if module == 'PicsSuggestionModule':
+                    suggestion_shards.add(shard_id)
+
+        #  The suggestion API listens on a single port,
+        #  so all the suggestions are served by one worker
+        groups = []
+        if suggestion_shards:
+            groups.append(sorted(suggestion_shards))
+        for shard_id in sorted(modules_by_shard):
+            if shard_id not in suggestion_shards:
+                groups.append([shard_id])
+        bot_shard = get_shard(self.config.bot_channel_id)
+        if not any(bot_shard in group for group in groups):
+            groups.append([bot_shard])
+        #  The other shards are only kept connected
+        used = {shard_id for group in groups for shard_id in group}
+        for i, shard_id in enumerate(
+                s for s in range(shard_count) if s not in used):
+            groups[i % len(groups)].append(shard_id)
+
+        specs = []
+        for worker_id, shard_ids in enumerate(groups):
+            modules = {}
+            for shard_id in shard_ids:
+                for category_name, names in modules_by_shard.get(
+                        shard_id, {}).items():
+                    modules.setdefault(category_name, []).extend(names)
+            specs.append({
+                'id': worker_id,
+                'shard_ids': sorted(shard_ids),
+                'shard_count': shard_count,
+                'modules': modules,
+            })
+        return specs
+
+    def _spawn(self, spec):
+        worker_id = spec['id']
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_run_worker,
+            args=(self.config_path, spec, child_conn),
+            name=f'worker-{worker_id}')
+        process.start()
+        child_conn.close()
+        self.processes[worker_id] = process
+        self.connections[worker_id] = parent_conn
+        self._last_seen[worker_id] = time.monotonic()
+        self.health[worker_id] = None
+        self.logger.info(
+            self._log_prefix +
+            f'Started the worker-{worker_id} (pid: {process.pid}).')
+
+    def _monitor(self):
+        while True:
+            timeout = _HEALTH_INTERVAL
+            if self._restart_at:
+                timeout = min(timeout, max(
+                    min(self._restart_at.values()) - time.monotonic(), 0))
+            ready = wait(
+                list(self.connections.values()) +
+                [p.sentinel for p in self.processes.values()],
+                timeout)
+
+            for worker_id, conn in list(self.connections.items()):
+                if conn in ready:
+                    self._receive(worker_id, conn)
+
+            now = time.monotonic()
+            for worker_id, process in list(self.processes.items()):
+                if process.sentinel in ready or not process.is_alive():
+                    process.join()
+                    if process.exitcode == 0:
+                        #  The worker was shut down by a command
+                        self.logger.info(
+                            self._log_prefix +
+                            f'The worker-{worker_id} has shut down.')
+                        return
+                    self._forget(worker_id)
+                    timeout = self.config.reconnect_timeout
+                    self.logger.error(
+                        self._log_prefix +
+                        f'The worker-{worker_id} exited with the code '
+                        f'{process.exitcode}, restarting after '
+                        f'{timeout} seconds.')
+                    self._restart_at[worker_id] = now + timeout
+                elif now - self._last_seen[worker_id] > _HEALTH_TIMEOUT:
+                    self.logger.error(
+                        self._log_prefix +
+                        f'The worker-{worker_id} has not reported '
+                        f'for {_HEALTH_TIMEOUT} seconds, terminating it.')
+                    process.terminate()
+                    #  Restarted once its exit is noticed
+                    self._last_seen[worker_id] = now
+
+            for worker_id, t in list(self._restart_at.items()):
+                if t <= now:
+                    del self._restart_at[worker_id]
+                    self._spawn(self.specs[worker_id])
+
+    def _receive(self, worker_id, conn):
+        try:
+            while conn.poll():
+                report = conn.recv()
+                self._last_seen[worker_id] = time.monotonic()
+                previous = self.health[worker_id]
+                self.health[worker_id] = report
+                if previous is None or previous['ready'] != report['ready']:
+                    self.logger.info(
+                        self._log_prefix +
+                        f'The worker-{worker_id} is '
+                        f'{"ready" if report["ready"] else "not ready"}.')
+        except (EOFError, OSError):
+            #  The exit is handled by the process sentinel
+            self.connections.pop(worker_id).close()
+
+    def _forget(self, worker_id):
+        del self.processes[worker_id]
+        conn = self.connections.pop(worker_id, None)
+        if conn is not None:
+            conn.close()
+        self.health[worker_id] = None
+
+    def _stop_workers(self):
+        for conn in self.connections.values():
+            try:
+                conn.send('stop')
+            except OSError:
+                pass
+        deadline = time.monotonic() + _STOP_TIMEOUT
+        for worker_id, process in self.processes.items():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                self.logger.error(
+                    self._log_prefix +
+                    f'The worker-{worker_id} did not stop in time, '
+                    'terminating it.')
+                process.terminate()
+                process.join()
+        for conn in self.connections.values():
+            conn.close()
+        self.processes.clear()
+        self.connections.clear()
+
+
+class WorkerBot(DiscordBot):
+
+    def __init__(self, config_path, spec, conn, logger=None, formatter=None):
+        self.spec = spec
+        self.conn = conn
+        self._health_task = None
+        self._assignment = None
+        super().__init__(config_path, logger, formatter)
+
+        threading.Thread(
+            target=self._listen, name='SupervisorListener',
+            daemon=True).start()
+
+    def _init(self):
+        super()._init()
+        self._health_task = self.loop.create_task(self._report_health())
+
+    def _load_config(self):
+        config = Config(
+            self.config_path, self.logger, self.formatter,
+            worker_id=self.spec['id'])
+        #  The categories are assigned to the workers on the launch,
+        #  the new ones would not be started by any worker
+        assignment = _get_assignment(config.pics_categories)
+        if self._assignment is None:
+            self._assignment = assignment
+        elif assignment != self._assignment:
+            raise ValueError(
+                'The categories, their modules or channels are changed, '
+                'they are assigned to the workers on the launch, '
+                'so the bot should be restarted to apply them')
+        config.pics_categories = {
+            category_name: dict(
+                config.pics_categories[category_name], modules=modules)
+            for category_name, modules in self.spec['modules'].items()
+            #  Removed from the configuration file on reload
+            if category_name in (config.pics_categories or {})}
+        return config
+
+    def _create_client(self):
+        return discord.AutoShardedClient(
+            intents=self._create_intents(),
+            loop=self.loop,
+            http_trace=self.outbound.trace_config,
+            shard_ids=self.spec['shard_ids'],
+            shard_count=self.spec['shard_count'])
+
+    async def _report_health(self):
+        try:
+            while True:
+                module = self.get_module('PicsSendingModule')
+                latency = self.client.latency
+                self.conn.send({
+                    'pid': os.getpid(),
+                    'ready': self.client.is_ready(),
+                    'latency': None if math.isnan(latency) else latency,
+                    'guilds': len(self.client.guilds),
+                    'queues': {} if module is None else {
+                        k: len(q) for k, q in module.queues.items()},
+                })
+                await asyncio.sleep(_HEALTH_INTERVAL)
+        except asyncio.CancelledError:
+            pass
+        except OSError:
+            pass  # The supervisor is gone
+
+    def _listen(self):
+        try:
+            while True:
+                if self.conn.recv() == 'stop':
+                    self.loop.call_soon_threadsafe(self._stop_by_supervisor)
+        except (EOFError, OSError):
+            pass
+
+    def _stop_by_supervisor(self):
+        self.shutdown_allowed = True
+        self.stop('Stopped by the supervisor.')
+
+    async def close(self, timeout=None):
+        if self._health_task is not None:
+            self._health_task.cancel()
+        await super().close(timeout)
+
+
+def _get_assignment(pics_categories):
+    #  What the workers are planned from
+    return {
+        category_name: {
+            module: category[_MODULE_CHANNELS[module]]
+            for module in category['modules']}
+        for category_name, category in (pics_categories or {}).items()}
+
+
+def _run_worker(config_path, spec, conn):
+    bot = WorkerBot(config_path, spec, conn)
+    bot.run()
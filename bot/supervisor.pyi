@@ -0,0 +1,144 @@
+from asyncio import Task
+from logging import Formatter
+from logging import Logger
+from multiprocessing.context import SpawnContext
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from discord import AutoShardedClient
+
+from .bot import DiscordBot
+from .utils.config import Config
+
+
+class Supervisor:
+    """Runs the bot in several worker processes.
+
+    The gateway is split into ``workers`` shards. Every module
+    of a category is served by the worker owning the shard
+    of the guild of its channel, so the worker receives the events
+    of the channel. All the suggestions are served by one worker,
+    since the suggestion API listens on a single port. A worker is
+    spawned for every shard with configured channels, the other shards
+    are connected by these workers too.
+
+    Workers report their health every 10 seconds. A worker that exits
+    with an error or does not report for 60 seconds is restarted after
+    ``reconnect_timeout`` seconds. When a worker is shut down by
+    a command, the supervisor stops all the workers and exits.
+
+    Attributes:
+        config_path: The path to the json configuration file.
+        workers: The number of the gateway shards.
+        formatter: Formatter's object.
+        logger: Logger's object.
+        config: Bot's configuration object.
+        specs: Parameters of the workers by their numbers.
+        processes: The running worker processes by their numbers.
+        connections: Pipes to the running workers by their numbers.
+        health: The last reports of the workers by their numbers.
+
+    """
+
+    config_path: str
+    workers: int
+    formatter: Formatter
+    logger: Logger
+    config: Config
+    specs: List[Dict]
+    processes: Dict[int, BaseProcess]
+    connections: Dict[int, Connection]
+    health: Dict[int, Optional[Dict]]
+
+    _context: SpawnContext
+    _last_seen: Dict[int, float]
+    _restart_at: Dict[int, float]
+
+    def __init__(self, config_path: str, workers: int, logger: Optional[Logger] = None, formatter: Optional[Formatter] = None):
+        """
+        Args:
+            config_path: The path to the json configuration file.
+            workers: The number of the gateway shards.
+            logger: Logger's object. By default creates a logger
+                with the name of the variable ``__file__``.
+            formatter: Formatter's object.
+
+        """
+
+    def run(self):
+        """Spawns the workers and supervises them until interrupted."""
+
+    async def _resolve_guilds(self) -> Dict[int, int]:
+        """Returns the guild ids of the configured channels."""
+
+    def _plan(self, guilds: Dict[int, int]) -> List[Dict]:
+        """Distributes the shards and the modules among the workers."""
+
+    def _spawn(self, spec: Dict): ...
+
+    def _monitor(self): ...
+
+    def _receive(self, worker_id: int, conn: Connection): ...
+
+    def _forget(self, worker_id: int): ...
+
+    def _stop_workers(self):
+        """Asks the workers to stop and terminates the ones left."""
+
+
+class WorkerBot(DiscordBot):
+    """The bot run in a worker process of the supervisor.
+
+    The bot serves only the modules and the gateway shards
+    of its worker, reports its health through the pipe
+    and stops when the supervisor asks it to.
+
+    Attributes:
+        spec: Parameters of the worker.
+        conn: The pipe to the supervisor.
+
+    """
+
+    spec: Dict
+    conn: Connection
+    client: AutoShardedClient
+
+    _health_task: Optional[Task]
+    _assignment: Optional[Dict[str, Dict[str, int]]]
+
+    def __init__(self, config_path: str, spec: Dict, conn: Connection, logger: Optional[Logger] = None, formatter: Optional[Formatter] = None):
+        """
+        Args:
+            config_path: The path to the json configuration file.
+            spec: Parameters of the worker.
+            conn: The pipe to the supervisor.
+            logger: Logger's object.
+            formatter: Formatter's object.
+
+        """
+
+    def _load_config(self) -> Config:
+        """Loads the configuration of the categories of the worker.
+
+        Raises:
+            ValueError: If the categories, their modules or channels
+                differ from the ones the worker was launched with,
+                since the categories are assigned on the launch.
+
+        """
+
+    async def _report_health(self): ...
+
+    def _listen(self): ...
+
+    def _stop_by_supervisor(self): ...
+
+
+def _get_assignment(pics_categories: Optional[Dict[str, Dict]]) -> Dict[str, Dict[str, int]]:
+    """Returns the channel ids of the modules by the category."""
+
+
+def _run_worker(config_path: str, spec: Dict, conn: Connection): ...
@@ -1,14 +1,71 @@
 """Contains bot utilities."""
 
+import importlib
+
 from .config import Config
+from .dedup_index import DedupIndex
+from .fs_io import FileSystemIO
+from .logger import JsonFormatter
 from .logger import init_logger
+from .logger import set_file_handler
+from .loop_monitor import LoopLagMonitor
+from .metrics import MetricsRegistry
+from .outbound import OutboundQueue
+from .pics_queue import PicsQueue
+from .read_ahead import ReadAheadCache
+from .send_history import SendHistory
+from .startup import StartupTimer
+from .utils import LatencyStats
+from .utils import diff_categories
 from .utils import get_pics_path_list
+from .utils import is_pic_path
 from .utils import time_in_range
 
 
+#  Imported on the first access, so `psycopg2` is loaded
+#  only when the database is configured, and `watchdog`
+#  only with the sending categories
+_LAZY_UTILS = {
+    'DirectoryWatcher': '.fs_watcher',
+    'StateStore': '.state_store',
+    'create_state_store': '.state_store',
+    'PostgresStateStore': '.postgres_state_store',
+    'SqliteStateStore': '.sqlite_state_store',
+}
+
+
 __all__ = [
     'Config',
+    'DedupIndex',
+    'FileSystemIO',
+    'DirectoryWatcher',
+    'JsonFormatter',
     'init_logger',
+    'set_file_handler',
+    'LoopLagMonitor',
+    'MetricsRegistry',
+    'OutboundQueue',
+    'PicsQueue',
+    'ReadAheadCache',
+    'SendHistory',
+    'StartupTimer',
+    'StateStore',
+    'create_state_store',
+    'PostgresStateStore',
+    'SqliteStateStore',
+    'LatencyStats',
+    'diff_categories',
     'get_pics_path_list',
+    'is_pic_path',
     'time_in_range',
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_UTILS.get(name)
+    if module_name is None:
+        raise AttributeError(
+            f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import tarfile
+import time
+from datetime import datetime
+
+from .utils import is_pic_path
+from .utils import move_no_clobber
+
+
+PACK_EXTENSION = '.tar'
+PACK_INDEX_EXTENSION = '.tar.json'
+_CHUNK_SIZE = 1024 * 1024
+
+
+def archive_file(src, archive_directory, layout, date=None):
+    shard = get_shard(layout, date)
+    directory = os.path.join(archive_directory, shard)
+    if shard:
+        os.makedirs(directory, exist_ok=True)
+    return move_no_clobber(src, os.path.join(directory, os.path.basename(src)))
+
+
+def get_shard(layout, date=None):
+    if not layout:
+        return ''
+    date = datetime.now() if date is None else date
+    return os.path.join(*date.strftime(layout).split('/'))
+
+
+def get_archive_pics_path_list(directory):
+    if not os.path.exists(directory):
+        return list()
+    pics_path_list = []
+    for root, dirs, files in os.walk(directory):
+        #  Skipping the hidden directories, e.g. of the partial packs
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        pics_path_list.extend(
+            os.path.join(root, name) for name in files if is_pic_path(name))
+    return pics_path_list
+
+
+def compact_archive(archive_directory, layout, max_age):
+    #  Returns: the paths of the created packs
+    now = time.time()
+    current_shard = get_shard(layout)
+    packs = []
+    for shard in _list_shards(archive_directory, len(layout.split('/'))):
+        shard_directory = os.path.join(archive_directory, shard)
+        if shard == current_shard:
+            continue
+        #  Changed when a picture is archived into the shard
+        if now - os.stat(shard_directory).st_mtime < max_age:
+            continue
+        pack_path = pack_shard(shard_directory)
+        if pack_path is not None:
+            packs.append(pack_path)
+    return packs
+
+
+def pack_shard(shard_directory):
+    #  Returns: the path to the pack, or None if the shard is empty
+    names = sorted(
+        entry.name for entry in os.scandir(shard_directory)
+        if entry.is_file() and not entry.name.startswith('.'))
+    if not names:
+        _remove_empty_directory(shard_directory)
+        return None
+
+    #  Files that got into the shard after it was packed
+    #  go to another pack
+    root = shard_directory.rstrip(os.sep)
+    pack_path = root + PACK_EXTENSION
+    i = 0
+    while os.path.exists(pack_path):
+        i += 1
+        pack_path = f'{root}-{i}{PACK_EXTENSION}'
+    index_path = pack_path[:-len(PACK_EXTENSION)] + PACK_INDEX_EXTENSION
+    tmp_path = os.path.join(
+        os.path.dirname(pack_path), f'.{os.path.basename(pack_path)}.part')
+
+    index = {}
+    try:
+        with tarfile.open(tmp_path, 'w', format=tarfile.PAX_FORMAT) as tar:
+            for name in names:
+                file_path = os.path.join(shard_directory, name)
+                info = tar.gettarinfo(file_path, arcname=name)
+                digest = _hash_file(file_path)
+                with open(file_path, 'rb') as f:
+                    tar.addfile(info, f)
+                #  The data is padded to the end of its last block
+                padded_size = -(-info.size // tarfile.BLOCKSIZE) * (
+                    tarfile.BLOCKSIZE)
+                index[name] = {
+                    'offset': tar.offset - padded_size,
+                    'size': info.size,
+                    'sha256': digest,
+                }
+            os.fsync(tar.fileobj.fileno())
+        with open(index_path, 'w') as f:
+            json.dump({'files': index}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, pack_path)
+    except BaseException:
+        for p in (tmp_path, index_path):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        raise
+
+    for name in names:
+        os.remove(os.path.join(shard_directory, name))
+    _remove_empty_directory(shard_directory)
+    return pack_path
+
+
+def _list_shards(archive_directory, depth, prefix=''):
+    directory = os.path.join(archive_directory, prefix)
+    with os.scandir(directory) as it:
+        entries = [entry.name for entry in it
+                   if entry.is_dir() and not entry.name.startswith('.')]
+    for name in sorted(entries):
+        shard = os.path.join(prefix, name)
+        if depth == 1:
+            yield shard
+        else:
+            yield from _list_shards(archive_directory, depth - 1, shard)
+
+
+def _remove_empty_directory(directory):
+    try:
+        os.rmdir(directory)
+    except OSError:
+        pass  # Not empty, e.g. a picture was archived meanwhile
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+
+PACK_EXTENSION: str
+PACK_INDEX_EXTENSION: str
+
+
+def archive_file(src: str, archive_directory: str, layout: str, date: Optional[datetime] = None) -> str:
+    """Moves the sent picture into the shard of the archive.
+
+    The shard is created if missing, and an existing file
+    of the same name is never overwritten.
+
+    Args:
+        src: The path to the picture.
+        archive_directory: The root directory of the archive.
+        layout: The ``strftime`` format of the shard path,
+            e.g. "%Y/%m/%d". An empty string means the flat archive.
+        date: The date of the shard, the current one by default.
+
+    Returns:
+        The final path of the file.
+
+    """
+
+
+def get_shard(layout: str, date: Optional[datetime] = None) -> str:
+    """Returns the path of the shard relative to the archive root."""
+
+
+def get_archive_pics_path_list(directory: str) -> List[str]:
+    """Returns the list of pictures in the archive and its shards.
+
+    The packed pictures are not included.
+    """
+
+
+def compact_archive(archive_directory: str, layout: str, max_age: float) -> List[str]:
+    """Packs the old shards of the archive.
+
+    The shard of the current date and the shards changed
+    less than ``max_age`` seconds ago are skipped.
+
+    Returns:
+        The paths of the created packs.
+
+    """
+
+
+def pack_shard(shard_directory: str) -> Optional[str]:
+    """Packs the pictures of the shard into a single tar file.
+
+    The pack is written next to the shard together with its index,
+    which holds the offset, the size and the SHA-256 digest
+    of every picture. The pack appears only when it is complete,
+    and then the pictures and the empty shard are removed.
+
+    Returns:
+        The path to the pack, or ``None`` if the shard is empty.
+
+    """
+
+
+def _list_shards(archive_directory: str, depth: int, prefix: str = '') -> Iterator[str]: ...
+
+
+def _remove_empty_directory(directory: str): ...
+
+
+def _hash_file(path: str) -> str: ...
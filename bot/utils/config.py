@@ -1,33 +1,64 @@
 import datetime
 import json
 import logging
+from importlib.util import find_spec
 from os import path
 
 
-try:
-    import psycopg2
-except ModuleNotFoundError:
-    psycopg2 = None
-
+from .logger import set_file_handler
 from .utils import codepoint_to_str
 
 
+_LOGGING_FILE_PARAMETERS = (
+    'logging_file', 'logging_max_bytes', 'logging_when',
+    'logging_backup_count', 'logging_json')
+
+
 class Config:
 
-    def __init__(self, config_path, logger, formatter):
+    def __init__(self, config_path, logger, formatter, worker_id=None):
         self._log_prefix = f'{type(self).__name__}: '
         self._config_path = config_path
+        self._worker_id = worker_id
         self._logger = logger
         self._formatter = formatter
 
+        self.logging_file = None
+        self.logging_max_bytes = None
+        self.logging_when = None
+        self.logging_backup_count = None
+        self.logging_json = None
+        self.logging_level = None
         self.token = None
         self.command_prefix = None
         self.bot_channel_id = None
         self.db = None
+        self.fs_workers = None
+        self.suggestion_workers = None
+        self.image_workers = None
+        self.read_ahead_budget = None
+        self.loop_lag_threshold = None
+        self.loop_lag_sample_rate = None
         self.pics_categories = None
 
         self._parse_config()
 
+    def apply_logging(self, previous=None):
+        #  Applied once the whole configuration is valid,
+        #  the file handler is replaced only if it is changed
+        if previous is None or any(
+                getattr(self, k) != getattr(previous, k)
+                for k in _LOGGING_FILE_PARAMETERS):
+            set_file_handler(
+                self._logger,
+                self.logging_file,
+                self._formatter,
+                max_bytes=self.logging_max_bytes,
+                when=self.logging_when,
+                backup_count=self.logging_backup_count,
+                json_lines=self.logging_json)
+        self._logger.setLevel(self.logging_level)
+
     def _parse_config(self):
         logger = self._logger
         if not isinstance(self._config_path, str):
@@ -63,13 +94,70 @@ class Config:
             logging_file = 'launch.py.log'
         else:
             logging_file = path.normcase(logging_file)
-        for handler in self._logger.handlers:
-            if isinstance(handler, logging.FileHandler):
-                self._logger.removeHandler(handler)
-                break
-        file_handler = logging.FileHandler(logging_file)
-        file_handler.setFormatter(self._formatter)
-        self._logger.addHandler(file_handler)
+        if self._worker_id is not None:
+            #  Rotating a file shared by processes is not safe
+            root, ext = path.splitext(logging_file)
+            logging_file = f'{root}.worker-{self._worker_id}{ext}'
+
+        #  LOGGING_MAX_BYTES
+        logging_max_bytes = config.get('logging_max_bytes')
+        if not (logging_max_bytes is None
+                or isinstance(logging_max_bytes, int)):
+            msg = 'Parameter `logging_max_bytes` is not an integer type.'
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (logging_max_bytes is None or logging_max_bytes >= 0):
+            msg = 'Parameter `logging_max_bytes` must be non-negative.'
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if logging_max_bytes is None:
+            logging_max_bytes = 10485760
+
+        #  LOGGING_WHEN
+        logging_when = config.get('logging_when')
+        if not (logging_when is None
+                or isinstance(logging_when, str)):
+            msg = 'Parameter `logging_when` is not a string type.'
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (logging_when is None
+                or logging_when.upper() in (
+                    'S', 'M', 'H', 'D', 'MIDNIGHT',
+                    'W0', 'W1', 'W2', 'W3', 'W4', 'W5', 'W6')):
+            msg = ('Parameter `logging_when` can only be one of the '
+                   'following values: ["S", "M", "H", "D", "MIDNIGHT", '
+                   '"W0", "W1", "W2", "W3", "W4", "W5", "W6"].')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+
+        #  LOGGING_BACKUP_COUNT
+        logging_backup_count = config.get('logging_backup_count')
+        if not (logging_backup_count is None
+                or isinstance(logging_backup_count, int)):
+            msg = 'Parameter `logging_backup_count` is not an integer type.'
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (logging_backup_count is None or logging_backup_count >= 0):
+            msg = 'Parameter `logging_backup_count` must be non-negative.'
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if logging_backup_count is None:
+            logging_backup_count = 5
+
+        #  LOGGING_JSON
+        logging_json = config.get('logging_json')
+        if not (logging_json is None or isinstance(logging_json, bool)):
+            msg = 'Parameter `logging_json` is not a boolean type.'
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if logging_json is None:
+            logging_json = False
+
+        self.logging_file = logging_file
+        self.logging_max_bytes = logging_max_bytes
+        self.logging_when = logging_when
+        self.logging_backup_count = logging_backup_count
+        self.logging_json = logging_json
 
         #  LOGGING_LEVEL
         logging_level = config.get('logging_level')
@@ -94,7 +182,7 @@ class Config:
                 self._log_prefix +
                 'Parameter `logging_level` is set to "INFO" by default.')
             logging_level = logging.INFO
-        logger.setLevel(logging_level)
+        self.logging_level = logging_level
 
         #  TOKEN
         token = config.get('token')
@@ -136,11 +224,6 @@ class Config:
 
         #  DB
         db = config.get('db')
-        if db is not None and psycopg2 is None:
-            msg = ('For the database to work, '
-                   'the module `psycopg2` is required.')
-            logger.critical(self._log_prefix + msg)
-            raise ModuleNotFoundError(msg)
         if not (db is None or isinstance(db, dict)):
             msg = 'Parameter `db` is not a dict type.'
             logger.critical(self._log_prefix + msg)
@@ -168,6 +251,118 @@ class Config:
             reconnect_timeout = 60
         self.reconnect_timeout = reconnect_timeout
 
+        #  FS_WORKERS
+        fs_workers = config.get('fs_workers')
+        if not (fs_workers is None or isinstance(fs_workers, int)):
+            msg = 'Parameter `fs_workers` is not an integer type.'
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (fs_workers is None or fs_workers > 0):
+            msg = 'Parameter `fs_workers` must be greater than 0.'
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if fs_workers is None:
+            logger.info(
+                self._log_prefix +
+                'Parameter `fs_workers` is set to "4" by default.')
+            fs_workers = 4
+        self.fs_workers = fs_workers
+
+        #  SUGGESTION_WORKERS
+        suggestion_workers = config.get('suggestion_workers')
+        if not (suggestion_workers is None or
+                isinstance(suggestion_workers, int)):
+            msg = 'Parameter `suggestion_workers` is not an integer type.'
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (suggestion_workers is None or suggestion_workers > 0):
+            msg = 'Parameter `suggestion_workers` must be greater than 0.'
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if suggestion_workers is None:
+            logger.info(
+                self._log_prefix +
+                'Parameter `suggestion_workers` is set to "8" by default.')
+            suggestion_workers = 8
+        self.suggestion_workers = suggestion_workers
+
+        #  IMAGE_WORKERS
+        image_workers = config.get('image_workers')
+        if not (image_workers is None or
+                isinstance(image_workers, int)):
+            msg = 'Parameter `image_workers` is not an integer type.'
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (image_workers is None or image_workers > 0):
+            msg = 'Parameter `image_workers` must be greater than 0.'
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if image_workers is None:
+            logger.info(
+                self._log_prefix +
+                'Parameter `image_workers` is set to "2" by default.')
+            image_workers = 2
+        self.image_workers = image_workers
+
+        #  READ_AHEAD_BUDGET
+        read_ahead_budget = config.get('read_ahead_budget')
+        if not (read_ahead_budget is None or
+                isinstance(read_ahead_budget, int)):
+            msg = 'Parameter `read_ahead_budget` is not an integer type.'
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (read_ahead_budget is None or read_ahead_budget >= 0):
+            msg = 'Parameter `read_ahead_budget` must be non-negative.'
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if read_ahead_budget is None:
+            logger.info(
+                self._log_prefix +
+                'Parameter `read_ahead_budget` is set to "67108864" '
+                'by default.')
+            read_ahead_budget = 64 * 1024 * 1024
+        self.read_ahead_budget = read_ahead_budget
+
+        #  LOOP_LAG_THRESHOLD
+        loop_lag_threshold = config.get('loop_lag_threshold')
+        if not (loop_lag_threshold is None
+                or isinstance(loop_lag_threshold, (float, int))):
+            msg = ('Parameter `loop_lag_threshold` '
+                   'is not an integer or float type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (loop_lag_threshold is None or loop_lag_threshold >= 0):
+            msg = 'Parameter `loop_lag_threshold` must be non-negative.'
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if loop_lag_threshold is None:
+            logger.info(
+                self._log_prefix +
+                'Parameter `loop_lag_threshold` is set to "0.25" by default.')
+            loop_lag_threshold = 0.25
+        self.loop_lag_threshold = loop_lag_threshold
+
+        #  LOOP_LAG_SAMPLE_RATE
+        loop_lag_sample_rate = config.get('loop_lag_sample_rate')
+        if not (loop_lag_sample_rate is None
+                or isinstance(loop_lag_sample_rate, (float, int))):
+            msg = ('Parameter `loop_lag_sample_rate` '
+                   'is not an integer or float type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (loop_lag_sample_rate is None or
+                0 <= loop_lag_sample_rate <= 1):
+            msg = ('Parameter `loop_lag_sample_rate` '
+                   'must be in the range [0, 1].')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if loop_lag_sample_rate is None:
+            logger.info(
+                self._log_prefix +
+                'Parameter `loop_lag_sample_rate` is set to "1" by default.')
+            loop_lag_sample_rate = 1
+        self.loop_lag_sample_rate = loop_lag_sample_rate
+
         #  PICS_CATEGORIES
         pics_categories = config.get('pics_categories')
         if not (pics_categories is None
@@ -183,6 +378,48 @@ class Config:
 
     def _check_db(self, db):
         logger = self._logger
+        # backend
+        backend = db.get('backend')
+        if not (backend is None or isinstance(backend, str)):
+            msg = 'Value of `db/backend` is not a string type.'
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (backend is None or backend in ('postgresql', 'sqlite')):
+            msg = ('Value of `db/backend` can only be one of the '
+                   'following values: ["postgresql", "sqlite"].')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if backend is None:
+            logger.info(
+                self._log_prefix +
+                'Value of `db/backend` is set to "postgresql" by default.')
+            backend = 'postgresql'
+        # flush_interval
+        flush_interval = db.get('flush_interval')
+        if not (flush_interval is None or
+                isinstance(flush_interval, (float, int))):
+            msg = ('Value of `db/flush_interval` '
+                   'is not an integer or float type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (flush_interval is None or flush_interval >= 0):
+            msg = 'Value of `db/flush_interval` must be non-negative.'
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if flush_interval is None:
+            logger.info(
+                self._log_prefix +
+                'Value of `db/flush_interval` is set to "5" by default.')
+            flush_interval = 5
+        if backend == 'sqlite':
+            db = self._check_sqlite_db(db)
+            db['flush_interval'] = flush_interval
+            return db
+        if find_spec('psycopg2') is None:
+            msg = ('For the database to work, '
+                   'the module `psycopg2` is required.')
+            logger.critical(self._log_prefix + msg)
+            raise ModuleNotFoundError(msg)
         # dbname
         dbname = db.get('dbname')
         if dbname is None:
@@ -220,18 +457,65 @@ class Config:
         # clearing the extra keys
         db = {k: db[k] for k in db.keys()
               if k in ('dbname', 'host', 'port', 'user', 'password')}
-        # test connection
+        db['backend'] = backend
+        db['flush_interval'] = flush_interval
+        return db
+
+    def _check_sqlite_db(self, db):
+        logger = self._logger
+        # path
+        db_path = db.get('path')
+        if db_path is None:
+            msg = 'Value of `db/path` is not specified.'
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if not isinstance(db_path, str):
+            msg = 'Value of `db/path` is not a string type.'
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not path.isdir(path.dirname(db_path) or '.'):
+            msg = ('Value of `db/path` points to a file '
+                   'in a non-existent folder.')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        # clearing the extra keys
+        return {'backend': 'sqlite', 'path': path.normcase(db_path)}
+
+    def check_db_connection(self):
+        if self.db['backend'] == 'sqlite':
+            self._check_sqlite_connection()
+            return
+
+        #  Imported only with the database configured
+        import psycopg2
+
         try:
-            conn = psycopg2.connect(**db)
+            conn = psycopg2.connect(
+                **{k: v for k, v in self.db.items()
+                   if k not in ('backend', 'flush_interval')})
             conn.close()
         except psycopg2.DatabaseError as e:
             msg = (
                 f'Caught an exception of type `psycopg2.{type(e).__name__}` '
                 f'during the test connection to the database: {e}')
-            logger.critical(self._log_prefix + msg)
+            self._logger.critical(self._log_prefix + msg)
             raise psycopg2.DatabaseError(msg)
 
-        return db
+    def _check_sqlite_connection(self):
+        import sqlite3
+
+        try:
+            conn = sqlite3.connect(self.db['path'])
+            try:
+                conn.execute('PRAGMA journal_mode=WAL;')
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            msg = (
+                f'Caught an exception of type `sqlite3.{type(e).__name__}` '
+                f'during the test connection to the database: {e}')
+            self._logger.critical(self._log_prefix + msg)
+            raise sqlite3.Error(msg)
 
     def _check_pics_category(self, category, category_name):
         logger = self._logger
@@ -256,7 +540,14 @@ class Config:
                 'send_start',
                 'send_end',
                 'send_reserve_days'}
-        optional_keys = {'send_archive_directory', }
+        optional_keys = {'send_archive_directory',
+                         'send_archive_layout',
+                         'send_archive_pack_after',
+                         'send_reconcile_interval',
+                         'send_max_size',
+                         'send_prepare_ahead',
+                         'send_read_ahead',
+                         'send_history'}
         if category.keys() & (keys | optional_keys):
             if not category.keys() >= keys:
                 msg = ('For the sending module to work, it is necessary '
@@ -282,7 +573,7 @@ class Config:
                 'should point to an existing folder.')
             logger.critical(self._log_prefix + msg)
             raise ValueError(msg)
-        category['send_directory'] = path.normcase(directory)
+        category['send_directory'] = path.normcase(path.normpath(directory))
         #  send_channel_id
         channel_id = category['send_channel_id']
         if not isinstance(channel_id, int):
@@ -348,7 +639,142 @@ class Config:
                        'to an existing folder.')
                 logger.critical(self._log_prefix + msg)
                 raise ValueError(msg)
-            category['send_archive_directory'] = path.normcase(directory)
+            category['send_archive_directory'] = path.normcase(
+                path.normpath(directory))
+        #  send_archive_layout
+        layout = category.get('send_archive_layout')
+        if not (layout is None or isinstance(layout, str)):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_archive_layout` is not a string type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (layout is None or layout == '' or (
+                not path.isabs(layout) and
+                all(part not in ('', '.', '..')
+                    for part in layout.split('/')))):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_archive_layout` must be a relative path '
+                   'without empty, "." and ".." components.')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if layout is None:
+            logger.info(
+                self._log_prefix +
+                f'Value of `pics_categories/{category_name}/'
+                'send_archive_layout` is set to "%Y/%m/%d" by default.')
+            layout = '%Y/%m/%d'
+        category['send_archive_layout'] = layout
+        #  send_archive_pack_after
+        pack_after = category.get('send_archive_pack_after')
+        if not (pack_after is None or isinstance(pack_after, (float, int))):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_archive_pack_after` is not an integer or float type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (pack_after is None or pack_after > 0):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_archive_pack_after` must be greater than 0.')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if pack_after is not None and not (
+                category['send_archive_directory'] and layout):
+            msg = (f'For the value of `pics_categories/{category_name}/'
+                   'send_archive_pack_after` to work, it is necessary '
+                   'that `send_archive_directory` is set and '
+                   '`send_archive_layout` is not empty.')
+            logger.critical(self._log_prefix + msg)
+            raise AssertionError(msg)
+        category['send_archive_pack_after'] = pack_after
+        #  send_reconcile_interval
+        interval = category.get('send_reconcile_interval')
+        if not (interval is None or isinstance(interval, (float, int))):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_reconcile_interval` is not an integer or float type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (interval is None or interval > 0):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_reconcile_interval` must be greater than 0.')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if interval is None:
+            logger.info(
+                self._log_prefix +
+                f'Value of `pics_categories/{category_name}/'
+                'send_reconcile_interval` is set to "600" by default.')
+            interval = 600
+        category['send_reconcile_interval'] = interval
+        #  send_max_size
+        max_size = category.get('send_max_size')
+        if max_size is not None and find_spec('PIL') is None:
+            msg = ('For the preparation of images to work, '
+                   'the module `PIL` is required.')
+            logger.critical(self._log_prefix + msg)
+            raise ModuleNotFoundError(msg)
+        if not (max_size is None or isinstance(max_size, int)):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_max_size` is not an integer type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (max_size is None or max_size > 0):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_max_size` must be greater than 0.')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        category['send_max_size'] = max_size
+        #  send_prepare_ahead
+        prepare_ahead = category.get('send_prepare_ahead')
+        if not (prepare_ahead is None or isinstance(prepare_ahead, int)):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_prepare_ahead` is not an integer type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (prepare_ahead is None or prepare_ahead > 0):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_prepare_ahead` must be greater than 0.')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if prepare_ahead is None:
+            prepare_ahead = 3
+            if max_size is not None:
+                logger.info(
+                    self._log_prefix +
+                    f'Value of `pics_categories/{category_name}/'
+                    'send_prepare_ahead` is set to "3" by default.')
+        category['send_prepare_ahead'] = prepare_ahead
+        #  send_read_ahead
+        read_ahead = category.get('send_read_ahead')
+        if not (read_ahead is None or isinstance(read_ahead, (float, int))):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_read_ahead` is not an integer or float type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (read_ahead is None or read_ahead >= 0):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_read_ahead` must be non-negative.')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if read_ahead is None:
+            logger.info(
+                self._log_prefix +
+                f'Value of `pics_categories/{category_name}/'
+                'send_read_ahead` is set to "30" by default.')
+            read_ahead = 30
+        category['send_read_ahead'] = read_ahead
+        #  send_history
+        history = category.get('send_history')
+        if not (history is None or isinstance(history, bool)):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'send_history` is not a boolean type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if history is None:
+            logger.info(
+                self._log_prefix +
+                f'Value of `pics_categories/{category_name}/'
+                'send_history` is set to "true" by default.')
+            history = True
+        category['send_history'] = history
 
         return True
 
@@ -357,7 +783,10 @@ class Config:
         keys = {'suggestion_directory',
                 'suggestion_channel_id'}
         optional_keys = {'suggestion_positive',
-                         'suggestion_negative'}
+                         'suggestion_negative',
+                         'suggestion_max_size',
+                         'suggestion_dedup',
+                         'suggestion_dedup_distance'}
         if category.keys() & (keys | optional_keys):
             if not category.keys() >= keys:
                 msg = (
@@ -381,7 +810,8 @@ class Config:
                    'suggestion_directory` should point to an existing folder.')
             logger.critical(self._log_prefix + msg)
             raise ValueError(msg)
-        category['suggestion_directory'] = path.normcase(directory)
+        category['suggestion_directory'] = path.normcase(
+            path.normpath(directory))
         #  suggestion_channel_id
         channel_id = category['suggestion_channel_id']
         if not isinstance(channel_id, int):
@@ -395,6 +825,58 @@ class Config:
         #  suggestion_negative
         self._check_emoji(
             category, category_name, 'suggestion_negative', 'U+274E')
+        #  suggestion_max_size
+        max_size = category.get('suggestion_max_size')
+        if not (max_size is None or isinstance(max_size, int)):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'suggestion_max_size` is not an integer type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (max_size is None or max_size > 0):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'suggestion_max_size` must be greater than 0.')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if max_size is None:
+            logger.info(
+                self._log_prefix +
+                f'Value of `pics_categories/{category_name}/'
+                'suggestion_max_size` is set to "26214400" by default.')
+            max_size = 26214400
+        category['suggestion_max_size'] = max_size
+        #  suggestion_dedup
+        dedup = category.get('suggestion_dedup')
+        if not (dedup is None or isinstance(dedup, bool)):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'suggestion_dedup` is not a boolean type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if dedup is None:
+            logger.info(
+                self._log_prefix +
+                f'Value of `pics_categories/{category_name}/'
+                'suggestion_dedup` is set to "true" by default.')
+            dedup = True
+        category['suggestion_dedup'] = dedup
+        #  suggestion_dedup_distance
+        distance = category.get('suggestion_dedup_distance')
+        if not (distance is None or isinstance(distance, int)):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'suggestion_dedup_distance` is not an integer type.')
+            logger.critical(self._log_prefix + msg)
+            raise TypeError(msg)
+        if not (distance is None or 0 <= distance <= 3):
+            msg = (f'Value of `pics_categories/{category_name}/'
+                   'suggestion_dedup_distance` must be in the range [0, 3].')
+            logger.critical(self._log_prefix + msg)
+            raise ValueError(msg)
+        if distance is None:
+            logger.info(
+                self._log_prefix +
+                f'Value of `pics_categories/{category_name}/'
+                'suggestion_dedup_distance` is set to "3" by default.')
+            distance = 3
+        category['suggestion_dedup_distance'] = distance
 
         return True
 
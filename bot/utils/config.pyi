@@ -9,6 +9,13 @@ class Config:
     """Class to parse the configuration for the bot.
 
     Attributes:
+        logging_file: The path to the log file.
+        logging_max_bytes: The size of the log file in bytes
+            to rotate it at.
+        logging_when: The interval type of the rotation by time.
+        logging_backup_count: The number of rotated log files to keep.
+        logging_json: Whether the log file is written as JSON lines.
+        logging_level: The level of the logger.
         token: Bot's token.
         command_prefix: The string from which the message should begin
             for the bot to react in a special discord text channel.
@@ -17,6 +24,18 @@ class Config:
         db: Database configuration parameters.
         reconnect_timeout: The amount of time in seconds between attempts
             to reconnect at the start of the bot.
+        fs_workers: The maximum number of threads
+            for blocking file system operations.
+        suggestion_workers: The maximum number of suggestions
+            processed concurrently.
+        image_workers: The maximum number of processes
+            for preparing images.
+        read_ahead_budget: The maximum total size in bytes
+            of the pictures read into memory ahead of their sending.
+        loop_lag_threshold: The event loop lag in seconds after which
+            the stack of the blocking code is logged, ``0`` disables it.
+        loop_lag_sample_rate: The share of the stalls of the event loop
+            whose stack is captured.
         pics_categories: The parameters responsible
             for configuring image categories.
 
@@ -26,25 +45,65 @@ class Config:
             from the configuration file.
         ModuleNotFoundError: The configuration tries to use a module
             that is not found.
-        psycopg2.DatabaseError: Error caused by a test connection attempt
-            to the database.
         AssertionError: Error caused by checking configuration parameters.
 
     """
 
+    logging_file: str
+    logging_max_bytes: int
+    logging_when: Optional[str]
+    logging_backup_count: int
+    logging_json: bool
+    logging_level: int
     token: str
     command_prefix: str
     bot_channel_id: int
     db: Optional[Dict]
     reconnect_timeout: float
+    fs_workers: int
+    suggestion_workers: int
+    image_workers: int
+    read_ahead_budget: int
+    loop_lag_threshold: float
+    loop_lag_sample_rate: float
     pics_categories: Optional[Dict]
 
-    def __init__(self, config_path: str, logger: Logger, formatter: Formatter):
+    def __init__(self, config_path: str, logger: Logger, formatter: Formatter, worker_id: Optional[int] = None):
         """
         Args:
             config_path: The path to the json configuration file.
             logger: Logger's object.
             formatter: Formatter's object.
+            worker_id: The number of the worker process if the bot
+                is run by the supervisor. Every worker logs
+                into its own file with the suffix ".worker-<id>".
+
+        """
+
+    def apply_logging(self, previous: Optional[Config] = None):
+        """Applies the logging parameters to the logger.
+
+        The parsing has no effect on the logger, so a rejected
+        configuration does not change the logging.
+
+        Args:
+            previous: The configuration being replaced,
+                the log file handler is replaced only if
+                its parameters differ from the previous ones.
+
+        """
+
+    def check_db_connection(self):
+        """Makes a test connection to the database.
+
+        Blocks, so it is run in an executor concurrently
+        with connecting to discord.
+
+        Raises:
+            psycopg2.DatabaseError: Error caused by a test connection
+                attempt to the database.
+            sqlite3.Error: Error caused by a test connection
+                attempt to the SQLite database.
 
         """
 
@@ -52,6 +111,10 @@ class Config:
 
     def _check_db(self, db: Dict) -> Dict: ...
 
+    def _check_sqlite_db(self, db: Dict) -> Dict: ...
+
+    def _check_sqlite_connection(self): ...
+
     def _check_pics_category(self, category: Dict, category_name: str) -> Set[str]: ...
 
     def _check_pics_sending_module(self, category: Dict, category_name: str) -> bool: ...
@@ -0,0 +1,113 @@
+import os
+import struct
+
+
+_RECORD = struct.Struct('<32sQ?QqH')
+_CHUNKS = 4
+_CHUNK_BITS = 64 // _CHUNKS
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+
+
+class DedupIndex:
+
+    max_supported_distance = _CHUNKS - 1
+
+    def __init__(self, path, max_distance=3):
+        if not 0 <= max_distance <= self.max_supported_distance:
+            raise ValueError(
+                'The maximum distance must be in the range '
+                f'[0, {self.max_supported_distance}].')
+
+        self.path = path
+        self.max_distance = max_distance
+        #  Indexed files by path: (size, modification time)
+        self.files = {}
+
+        self._exact = {}
+        #  Multi-index of the perceptual hashes: hashes within
+        #  the distance of 3 share at least one of the 4 chunks exactly
+        self._tables = tuple({} for _ in range(_CHUNKS))
+        self._file = None
+
+    def __len__(self):
+        return len(self._exact)
+
+    def load(self):
+        valid_size = 0
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+        offset = 0
+        while offset + _RECORD.size <= len(data):
+            (digest, phash, has_phash, size, mtime_ns,
+             path_size) = _RECORD.unpack_from(data, offset)
+            end = offset + _RECORD.size + path_size
+            if end > len(data):
+                break
+            path = data[offset + _RECORD.size:end].decode(
+                'utf-8', 'replace')
+            self.files[path] = (size, mtime_ns)
+            if digest not in self._exact:
+                self._add(digest, phash if has_phash else None, path)
+            offset = valid_size = end
+
+        self._file = open(self.path, 'ab')
+        if valid_size != self._file.tell():
+            #  Drop the record torn by a crash
+            self._file.truncate(valid_size)
+            self._file.seek(valid_size)
+
+    def find(self, digest, phash=None):
+        path = self._exact.get(digest)
+        if path is not None or phash is None:
+            return path
+        max_distance = self.max_distance
+        for i, table in enumerate(self._tables):
+            candidates = table.get((phash >> (i * _CHUNK_BITS)) & _CHUNK_MASK)
+            if candidates is None:
+                continue
+            for other, path in candidates:
+                if bin(phash ^ other).count('1') <= max_distance:
+                    return path
+        return None
+
+    def is_indexed(self, path, stat):
+        #  Another picture saved under the same name is hashed again
+        return self.files.get(path) == (stat.st_size, stat.st_mtime_ns)
+
+    def add(self, digest, phash, path, stat):
+        if digest not in self._exact:
+            self._add(digest, phash, path)
+        #  Also keeps paths of copies, so they are not hashed again
+        self.files[path] = (stat.st_size, stat.st_mtime_ns)
+        encoded = path.encode('utf-8')
+        self._file.write(_RECORD.pack(
+            digest, phash or 0, phash is not None, stat.st_size,
+            stat.st_mtime_ns, len(encoded)))
+        self._file.write(encoded)
+
+    def _add(self, digest, phash, path):
+        self._exact[digest] = path
+        if phash is None:
+            return
+        entry = (phash, path)
+        for i, table in enumerate(self._tables):
+            key = (phash >> (i * _CHUNK_BITS)) & _CHUNK_MASK
+            candidates = table.get(key)
+            if candidates is None:
+                table[key] = [entry]
+            else:
+                candidates.append(entry)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,100 @@
+from os import stat_result
+from typing import Dict
+from typing import IO
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+
+class DedupIndex:
+    """Persistent index of picture hashes for finding duplicates.
+
+    Keeps the SHA-256 digests for exact matches and the 64-bit
+    difference hashes for perceptual matches. The perceptual hashes
+    are split into 4 chunks of 16 bits, and every chunk is indexed
+    in its own table: hashes that differ in at most 3 bits
+    share at least one chunk, so a lookup only compares
+    the hash with the few entries of 4 buckets.
+
+    The index is stored in an append-only file
+    of records (digest, hash, size, modification time, file path).
+
+    Attributes:
+        max_supported_distance: The maximum distance the multi-index
+            guarantees to find all matches within.
+        path: The path to the index file.
+        max_distance: The maximum number of differing bits
+            of the perceptual hashes of duplicates.
+        files: The size and the modification time in nanoseconds
+            of the indexed files by their paths.
+
+    """
+
+    max_supported_distance: int
+    path: str
+    max_distance: int
+    files: Dict[str, Tuple[int, int]]
+
+    _exact: Dict[bytes, str]
+    _tables: Tuple[Dict[int, List[Tuple[int, str]]], ...]
+    _file: Optional[IO[bytes]]
+
+    def __init__(self, path: str, max_distance: int = 3):
+        """
+        Args:
+            path: The path to the index file.
+            max_distance: The maximum number of differing bits
+                of the perceptual hashes of duplicates.
+
+        Raises:
+            ValueError: ``max_distance`` is not in the range [0, 3].
+
+        """
+
+    def __len__(self) -> int: ...
+
+    def load(self):
+        """Loads the index file and opens it for appending.
+
+        A record torn by a crash at the end of the file is dropped.
+        Blocks, so it should be executed outside the event loop.
+        """
+
+    def find(self, digest: bytes, phash: Optional[int] = None) -> Optional[str]:
+        """Finds a duplicate of the picture.
+
+        Args:
+            digest: The SHA-256 digest of the picture.
+            phash: The difference hash of the picture, if known.
+
+        Returns:
+            The path to the indexed duplicate if found, otherwise ``None``.
+
+        """
+
+    def is_indexed(self, path: str, stat: stat_result) -> bool:
+        """Checks whether the file is indexed.
+
+        The file is matched by its path, size and modification time,
+        so a picture replaced by another one is hashed again.
+        """
+
+    def add(self, digest: bytes, phash: Optional[int], path: str, stat: stat_result):
+        """Adds the picture to the index.
+
+        The record is buffered until ``flush`` is called.
+
+        Args:
+            digest: The SHA-256 digest of the picture.
+            phash: The difference hash of the picture, if known.
+            path: The path to the picture.
+            stat: The status of the picture's file.
+
+        """
+
+    def _add(self, digest: bytes, phash: Optional[int], path: str): ...
+
+    def flush(self):
+        """Writes the buffered records to the disk."""
+
+    def close(self): ...
@@ -0,0 +1,52 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import discord
+
+from .utils import LatencyStats
+from .utils import move_no_clobber
+
+
+class FileSystemIO:
+
+    def __init__(self, loop, max_workers=4):
+        self.loop = loop
+        self.max_workers = max_workers
+        self.stats = {}
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=type(self).__name__)
+
+    async def run(self, operation, func, *args):
+        stats = self.stats.get(operation)
+        if stats is None:
+            stats = self.stats[operation] = LatencyStats()
+        start = time.perf_counter()
+        try:
+            return await self.loop.run_in_executor(
+                self._executor, func, *args)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.add(time.perf_counter() - start)
+
+    async def remove(self, path):
+        await self.run('remove', os.remove, path)
+
+    async def rename(self, src, dst):
+        await self.run('rename', os.rename, src, dst)
+
+    async def replace(self, src, dst):
+        await self.run('replace', os.replace, src, dst)
+
+    async def move(self, src, dst):
+        return await self.run('move', move_no_clobber, src, dst)
+
+    async def open_file(self, path, filename=None):
+        return await self.run('open', discord.File, path, filename)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,82 @@
+from asyncio import AbstractEventLoop
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+from discord import File
+
+from .utils import LatencyStats
+
+
+class FileSystemIO:
+    """Executes blocking file system operations off the event loop.
+
+    All the operations are executed in a bounded thread pool,
+    so a slow or network-mounted volume does not block the loop.
+    The latency of every operation is accounted in ``stats``.
+
+    Attributes:
+        loop: The event loop used by the bot.
+        max_workers: The maximum number of worker threads.
+        stats: Latency counters by the operation name.
+
+    """
+
+    loop: AbstractEventLoop
+    max_workers: int
+    stats: Dict[str, LatencyStats]
+
+    def __init__(self, loop: AbstractEventLoop, max_workers: int = 4):
+        """
+        Args:
+            loop: The event loop used by the bot.
+            max_workers: The maximum number of worker threads.
+
+        """
+
+    async def run(self, operation: str, func: Callable, *args) -> Any:
+        """Executes the function in the thread pool.
+
+        Args:
+            operation: The name of the operation for the statistics.
+            func: The blocking function to be executed.
+            *args: Arguments for the function.
+
+        Returns:
+            The result of the function.
+
+        """
+
+    async def remove(self, path: str):
+        """Removes the file."""
+
+    async def rename(self, src: str, dst: str):
+        """Renames the file."""
+
+    async def replace(self, src: str, dst: str):
+        """Renames the file, overwriting the destination."""
+
+    async def move(self, src: str, dst: str) -> str:
+        """Moves the file without overwriting an existing one.
+
+        Returns:
+            The final path of the file.
+
+        """
+
+    async def open_file(self, path: str, filename: Optional[str] = None) -> File:
+        """Opens the file for uploading to discord.
+
+        Args:
+            path: The path to the file.
+            filename: The file name to display when uploading.
+
+        Returns:
+            The opened ``discord.File`` object.
+
+        """
+
+    def shutdown(self):
+        """Stops the thread pool without waiting for pending operations."""
+
@@ -0,0 +1,361 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from os import path
+
+from watchdog.events import FileClosedEvent
+from watchdog.events import FileCreatedEvent
+from watchdog.events import FileDeletedEvent
+from watchdog.events import FileModifiedEvent
+from watchdog.events import FileMovedEvent
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    _inotify_init1 = _libc.inotify_init1
+    _inotify_add_watch = _libc.inotify_add_watch
+    _inotify_rm_watch = _libc.inotify_rm_watch
+except (OSError, AttributeError):
+    #  Not Linux
+    _inotify_init1 = None
+else:
+    _inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p,
+                                   ctypes.c_uint32)
+    _inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+_IN_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO |
+            _IN_CREATE | _IN_DELETE | _IN_ONLYDIR)
+_IN_EVENT = struct.Struct('iIII')
+_IN_BUFFER_SIZE = 64 * 1024
+
+#  Kinds of the recorded events
+_ADDED = 0
+_REMOVED = 1
+_CREATED = 2
+_MODIFIED = 3
+
+
+class DirectoryWatcher:
+
+    def __init__(self, loop, debounce=0.5, max_delay=5.0):
+        self.loop = loop
+        self.debounce = debounce
+        self.max_delay = max_delay
+
+        try:
+            self._observer = _InotifyObserver(self._record)
+        except OSError:
+            #  Not Linux, or the inotify instances are exhausted
+            self._observer = _WatchdogObserver(self._record)
+        self.close_events = self._observer.close_events
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._changes = {}
+        self._first_event = None
+        self._last_event = None
+        self._flush_handle = None
+
+    def start(self):
+        self._observer.start()
+
+    def stop(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._observer.stop()
+
+    def subscribe(self, directory, callback):
+        #  The subscribers of the same directory share the watch
+        directory = path.normpath(directory)
+        subscription = self._subscriptions.get(directory)
+        if subscription is None:
+            watch = self._observer.schedule(directory)
+            subscription = self._subscriptions[directory] = (watch, [])
+        subscription[1].append(callback)
+
+    def unsubscribe(self, directory, callback):
+        directory = path.normpath(directory)
+        subscription = self._subscriptions.get(directory)
+        if subscription is None or callback not in subscription[1]:
+            return
+        subscription[1].remove(callback)
+        if not subscription[1]:
+            del self._subscriptions[directory]
+            self._observer.unschedule(subscription[0])
+            with self._lock:
+                self._changes.pop(directory, None)
+
+    def _record(self, events):
+        #  Called by the observer thread
+        now = time.monotonic()
+        with self._lock:
+            for directory, kind, file_path in events:
+                changes = self._changes.get(directory)
+                if changes is None:
+                    changes = self._changes[directory] = _Changes()
+                if kind == _ADDED:
+                    changes.add(file_path)
+                elif kind == _REMOVED:
+                    changes.remove(file_path)
+                else:
+                    changes.touch(file_path, now, kind == _MODIFIED)
+            is_idle = self._first_event is None
+            if is_idle:
+                self._first_event = now
+            self._last_event = now
+        if is_idle:
+            #  Once per burst of events
+            self.loop.call_soon_threadsafe(self._schedule_flush)
+
+    def _schedule_flush(self, delay=None):
+        if self._flush_handle is None:
+            self._flush_handle = self.loop.call_later(
+                self.debounce if delay is None else delay, self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        now = time.monotonic()
+        batches = []
+        with self._lock:
+            if self._first_event is None:
+                return
+            #  Waits for the burst to end, but not longer than max_delay
+            delay = min(self._last_event + self.debounce,
+                        self._first_event + self.max_delay) - now
+            if delay > 0:
+                self._schedule_flush(delay)
+                return
+            for directory, changes in self._changes.items():
+                added, removed = changes.take(
+                    now - self.debounce, self.close_events)
+                if added or removed:
+                    batches.append((directory, added, removed))
+            #  Files that are still being written
+            self._changes = {
+                k: v for k, v in self._changes.items() if v.pending}
+            self._first_event = self._last_event = None
+            if self._changes and not self.close_events:
+                self._first_event = self._last_event = now
+                self._schedule_flush()
+
+        for directory, added, removed in batches:
+            subscription = self._subscriptions.get(directory)
+            if subscription is None:
+                continue
+            for callback in tuple(subscription[1]):
+                callback(added, removed)
+
+
+class _Changes:
+
+    def __init__(self):
+        self.added = set()
+        self.removed = set()
+        #  Created or modified files by path: (time, is_written)
+        self.pending = {}
+
+    def add(self, file_path):
+        self.pending.pop(file_path, None)
+        self.removed.discard(file_path)
+        self.added.add(file_path)
+
+    def remove(self, file_path):
+        self.pending.pop(file_path, None)
+        self.added.discard(file_path)
+        self.removed.add(file_path)
+
+    def touch(self, file_path, now, is_written):
+        entry = self.pending.get(file_path)
+        self.pending[file_path] = (
+            now, is_written or (entry is not None and entry[1]))
+
+    def take(self, quiet_since, close_events):
+        for file_path, (last_time, is_written) in list(self.pending.items()):
+            if close_events and is_written:
+                continue  # Added by the close event
+            if last_time > quiet_since:
+                continue
+            self.add(file_path)
+        added, removed = self.added, self.removed
+        self.added, self.removed = set(), set()
+        return added, removed
+
+
+class _InotifyObserver:
+
+    #  Inotify reports that a written file is closed
+    close_events = True
+
+    def __init__(self, record):
+        if _inotify_init1 is None:
+            raise OSError('inotify is not supported')
+        fd = _inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._fd = fd
+        self._record = record
+        #  Directories by the watch descriptor, a directory reached
+        #  by several paths has a single descriptor
+        self._directories = {}
+        self._lock = threading.Lock()
+        self._stop_fds = None
+        self._thread = None
+
+    def start(self):
+        self._stop_fds = os.pipe()
+        self._thread = threading.Thread(
+            target=self._run, name='DirectoryWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            os.write(self._stop_fds[1], b'\0')
+            self._thread.join()
+            self._thread = None
+            for fd in self._stop_fds:
+                os.close(fd)
+            self._stop_fds = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def schedule(self, directory):
+        if self._fd is None:
+            return None  # Stopped
+        wd = _inotify_add_watch(self._fd, os.fsencode(directory), _IN_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), directory)
+        with self._lock:
+            self._directories.setdefault(wd, []).append(directory)
+        return wd, directory
+
+    def unschedule(self, watch):
+        if watch is None or self._fd is None:
+            return
+        wd, directory = watch
+        with self._lock:
+            directories = self._directories[wd]
+            directories.remove(directory)
+            if directories:
+                return
+            del self._directories[wd]
+        #  Fails if the directory is already removed
+        _inotify_rm_watch(self._fd, wd)
+
+    def _run(self):
+        stop_fd = self._stop_fds[0]
+        while True:
+            readable, _, _ = select.select((self._fd, stop_fd), (), ())
+            if stop_fd in readable:
+                return
+            try:
+                data = os.read(self._fd, _IN_BUFFER_SIZE)
+            except BlockingIOError:
+                continue
+            events = self._parse(data)
+            if events:
+                self._record(events)
+
+    def _parse(self, data):
+        events = []
+        with self._lock:
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _IN_EVENT.unpack_from(data, offset)
+                offset += _IN_EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                #  A lost event is caught up by the reconciliation
+                if mask & (_IN_Q_OVERFLOW | _IN_ISDIR) or not name:
+                    continue
+                if mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO):
+                    #  A rename is atomic, the file is complete
+                    kind = _ADDED
+                elif mask & (_IN_MOVED_FROM | _IN_DELETE):
+                    kind = _REMOVED
+                elif mask & _IN_CREATE:
+                    kind = _CREATED
+                elif mask & _IN_MODIFY:
+                    kind = _MODIFIED
+                else:
+                    continue
+                name = os.fsdecode(name)
+                for directory in self._directories.get(wd, ()):
+                    events.append(
+                        (directory, kind, path.join(directory, name)))
+        return events
+
+
+class _WatchdogObserver:
+
+    def __init__(self, record):
+        #  Only inotify reports that a written file is closed,
+        #  other observers rely on the files staying quiet
+        self.close_events = Observer.__name__ == 'InotifyObserver'
+        self._record = record
+        self._observer = Observer()
+
+    def start(self):
+        self._observer.start()
+
+    def stop(self):
+        if self._observer.is_alive():
+            self._observer.stop()
+            self._observer.join()
+
+    def schedule(self, directory):
+        return self._observer.schedule(
+            _EventHandler(self._record, directory), directory)
+
+    def unschedule(self, watch):
+        self._observer.unschedule(watch)
+
+
+class _EventHandler(FileSystemEventHandler):
+
+    def __init__(self, record, directory):
+        self.record = record
+        self.directory = directory
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        directory = self.directory
+        if isinstance(event, FileMovedEvent):
+            events = []
+            if path.dirname(event.src_path) == directory:
+                events.append((directory, _REMOVED, event.src_path))
+            if path.dirname(event.dest_path) == directory:
+                #  A rename is atomic, the file is complete
+                events.append((directory, _ADDED, event.dest_path))
+        elif isinstance(event, FileDeletedEvent):
+            events = [(directory, _REMOVED, event.src_path)]
+        elif isinstance(event, FileClosedEvent):
+            events = [(directory, _ADDED, event.src_path)]
+        elif isinstance(event, FileCreatedEvent):
+            events = [(directory, _CREATED, event.src_path)]
+        elif isinstance(event, FileModifiedEvent):
+            events = [(directory, _MODIFIED, event.src_path)]
+        else:
+            return
+        if events:
+            self.record(events)
@@ -0,0 +1,204 @@
+from asyncio import AbstractEventLoop
+from asyncio import TimerHandle
+from threading import Lock
+from threading import Thread
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+from watchdog.events import FileSystemEvent
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers.api import BaseObserver
+from watchdog.observers.api import ObservedWatch
+
+
+Callback = Callable[[Set[str], Set[str]], None]
+#  The directory, the kind of the change and the path of the file
+Event = Tuple[str, int, str]
+Record = Callable[[Iterable[Event]], None]
+
+
+class DirectoryWatcher:
+    """Watches directories for added and removed files.
+
+    A single observer thread serves all the directories, and every
+    directory is watched once however many subscribers it has.
+    On Linux the directories share one inotify instance read by
+    the thread, otherwise a watchdog observer is used, which may
+    start a thread per directory.
+    The events are collected in the observer thread, and a burst
+    of them is delivered to the subscribers in the event loop
+    as one batch of the added and removed paths per directory,
+    once the directory is quiet for ``debounce`` seconds,
+    but not later than ``max_delay`` seconds after the first event.
+
+    A created file is reported only when it is complete: on Linux
+    after inotify reports that the written file is closed,
+    otherwise once it is not modified for ``debounce`` seconds.
+    A file renamed into the directory is reported at once.
+
+    Attributes:
+        loop: The event loop the subscribers are called in.
+        debounce: The number of seconds without events
+            that ends a burst.
+        max_delay: The maximum number of seconds a change
+            is delayed by a burst.
+        close_events: Whether the observer reports
+            the closing of written files.
+
+    """
+
+    loop: AbstractEventLoop
+    debounce: float
+    max_delay: float
+    close_events: bool
+
+    _observer: Union[_InotifyObserver, _WatchdogObserver]
+    _subscriptions: Dict[str, Tuple[Any, List[Callback]]]
+    _lock: Lock
+    _changes: Dict[str, _Changes]
+    _first_event: Optional[float]
+    _last_event: Optional[float]
+    _flush_handle: Optional[TimerHandle]
+
+    def __init__(self, loop: AbstractEventLoop, debounce: float = 0.5, max_delay: float = 5.0):
+        """
+        Args:
+            loop: The event loop the subscribers are called in.
+            debounce: The number of seconds without events
+                that ends a burst.
+            max_delay: The maximum number of seconds a change
+                is delayed by a burst.
+
+        """
+
+    def start(self):
+        """Starts the observer thread."""
+
+    def stop(self):
+        """Stops the observer thread and waits for it."""
+
+    def subscribe(self, directory: str, callback: Callback):
+        """Calls ``callback(added, removed)`` on the changes of the files
+        in the directory, its sub-directories are not watched.
+
+        The directory is normalized, so the paths passed
+        to the callback are joined to the normalized directory.
+
+        Raises:
+            OSError: If the directory can not be watched.
+
+        """
+
+    def unsubscribe(self, directory: str, callback: Callback):
+        """Stops calling the callback, the directory is no longer watched
+        after its last subscriber is removed."""
+
+    def _record(self, events: Iterable[Event]):
+        """Collects the events, called by the observer thread."""
+
+    def _schedule_flush(self, delay: Optional[float] = None): ...
+
+    def _flush(self): ...
+
+
+class _Changes:
+    """Changes of a directory collected during a burst of events.
+
+    Attributes:
+        added: Paths of the complete added files.
+        removed: Paths of the removed files.
+        pending: The time of the last event and whether the file
+            was written, by the path of the created or modified file.
+
+    """
+
+    added: Set[str]
+    removed: Set[str]
+    pending: Dict[str, Tuple[float, bool]]
+
+    def __init__(self): ...
+
+    def add(self, file_path: str): ...
+
+    def remove(self, file_path: str): ...
+
+    def touch(self, file_path: str, now: float, is_written: bool): ...
+
+    def take(self, quiet_since: float, close_events: bool) -> Tuple[Set[str], Set[str]]:
+        """Returns the added and the removed files and clears them.
+
+        The pending files become added unless they are written
+        and the closing is reported, or they were changed
+        after ``quiet_since``.
+        """
+
+
+class _InotifyObserver:
+    """A single inotify instance with a watch per directory,
+    read by a single thread.
+
+    Raises:
+        OSError: If inotify is not supported or the instances
+            are exhausted.
+
+    """
+
+    close_events: bool
+
+    _fd: Optional[int]
+    _record: Record
+    _directories: Dict[int, List[str]]
+    _lock: Lock
+    _stop_fds: Optional[Tuple[int, int]]
+    _thread: Optional[Thread]
+
+    def __init__(self, record: Record): ...
+
+    def start(self): ...
+
+    def stop(self):
+        """Stops the thread and closes the inotify instance."""
+
+    def schedule(self, directory: str) -> Optional[Tuple[int, str]]: ...
+
+    def unschedule(self, watch: Optional[Tuple[int, str]]): ...
+
+    def _run(self): ...
+
+    def _parse(self, data: bytes) -> List[Event]: ...
+
+
+class _WatchdogObserver:
+    """The watchdog observer, used where inotify is not available."""
+
+    close_events: bool
+
+    _record: Record
+    _observer: BaseObserver
+
+    def __init__(self, record: Record): ...
+
+    def start(self): ...
+
+    def stop(self): ...
+
+    def schedule(self, directory: str) -> ObservedWatch: ...
+
+    def unschedule(self, watch: ObservedWatch): ...
+
+
+class _EventHandler(FileSystemEventHandler):
+
+    record: Record
+    directory: str
+
+    def __init__(self, record: Record, directory: str): ...
+
+    def on_any_event(self, event: FileSystemEvent): ...
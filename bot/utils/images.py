@@ -0,0 +1,123 @@
+import hashlib
+import io
+import os
+import time
+
+try:
+    from PIL import Image
+    from PIL import ImageOps
+except ModuleNotFoundError:
+    Image = None
+    ImageOps = None
+
+
+PREPARED_DIRECTORY = '.prepared'
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+_DHASH_SIZE = 8
+_QUALITY_STEPS = (90, 80, 70, 60, 50)
+_SCALE_STEP = 0.75
+_SCALE_STEPS = 4
+_PREPARED_EXTENSIONS = ('.jpg', '.webp')
+_PART_EXTENSION = '.part'
+#  Older partial files are left by a crash
+_PART_TTL = 60 * 60
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def dhash(path):
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as image:
+            #  Lets the JPEG decoder skip most of the pixels
+            image.draft('L', (_DHASH_SIZE * 8, _DHASH_SIZE * 8))
+            image = image.convert('L').resize(
+                (_DHASH_SIZE + 1, _DHASH_SIZE), Image.BILINEAR)
+            pixels = list(image.getdata())
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None  # Not a decodable picture
+    value = 0
+    for row in range(_DHASH_SIZE):
+        offset = row * (_DHASH_SIZE + 1)
+        for col in range(_DHASH_SIZE):
+            value <<= 1
+            if pixels[offset + col] > pixels[offset + col + 1]:
+                value |= 1
+    return value
+
+
+def hash_file(path):
+    return sha256_file(path), dhash(path)
+
+
+def prepare_image(pic_path, max_size):
+    stat = os.stat(pic_path)
+    if stat.st_size <= max_size:
+        return None
+    directory = os.path.join(os.path.dirname(pic_path), PREPARED_DIRECTORY)
+    base = os.path.join(directory, os.path.basename(pic_path))
+    for ext in _PREPARED_EXTENSIONS:
+        try:
+            if os.stat(base + ext).st_mtime >= stat.st_mtime:
+                return base + ext
+        except FileNotFoundError:
+            pass
+
+    with Image.open(pic_path) as image:
+        #  The orientation is lost with the metadata
+        image = ImageOps.exif_transpose(image)
+        has_alpha = (image.mode in ('RGBA', 'LA', 'PA') or
+                     'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    #  JPEG has no transparency
+    image_format, ext = ('WEBP', '.webp') if has_alpha else ('JPEG', '.jpg')
+
+    buffer = io.BytesIO()
+    for _ in range(_SCALE_STEPS):
+        for quality in _QUALITY_STEPS:
+            buffer.seek(0)
+            buffer.truncate()
+            image.save(buffer, image_format, quality=quality)
+            if buffer.tell() <= max_size:
+                os.makedirs(directory, exist_ok=True)
+                tmp_path = base + ext + _PART_EXTENSION
+                with open(tmp_path, 'wb') as f:
+                    f.write(buffer.getbuffer())
+                os.replace(tmp_path, base + ext)
+                return base + ext
+        width, height = image.size
+        image = image.resize(
+            (max(1, int(width * _SCALE_STEP)),
+             max(1, int(height * _SCALE_STEP))),
+            Image.LANCZOS)
+    return None
+
+
+def prune_prepared(directory, names):
+    directory = os.path.join(directory, PREPARED_DIRECTORY)
+    if not os.path.isdir(directory):
+        return 0
+    count = 0
+    expiration = time.time() - _PART_TTL
+    with os.scandir(directory) as it:
+        for entry in it:
+            name = entry.name
+            if name.endswith(_PART_EXTENSION):
+                try:
+                    if entry.stat().st_mtime > expiration:
+                        continue  # Being written by a preparation
+                except FileNotFoundError:
+                    continue  # Renamed by the preparation
+                name = name[:-len(_PART_EXTENSION)]
+            if os.path.splitext(name)[0] not in names:
+                os.remove(entry.path)
+                count += 1
+    return count
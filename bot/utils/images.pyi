@@ -0,0 +1,73 @@
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+
+PREPARED_DIRECTORY: str
+
+
+def sha256_file(path: str) -> bytes:
+    """Returns the SHA-256 digest of the file content."""
+
+
+def dhash(path: str) -> Optional[int]:
+    """Returns the 64-bit difference hash of the picture.
+
+    The picture is reduced to 9x8 grayscale pixels, and every bit
+    of the hash tells whether a pixel is brighter than its right
+    neighbour, so recompressed or resized copies of the picture
+    get the same or a close hash.
+
+    Note:
+        Requires the optional ``Pillow`` package.
+
+    Returns:
+        The hash, or ``None`` if ``Pillow`` is not installed
+        or the file can not be decoded.
+
+    """
+
+
+def hash_file(path: str) -> Tuple[bytes, Optional[int]]:
+    """Returns the SHA-256 digest and the difference hash of the picture."""
+
+
+def prepare_image(pic_path: str, max_size: int) -> Optional[str]:
+    """Recompresses the picture to fit into the size.
+
+    The quality of the picture is stepped down from 90 to 50,
+    and then the picture is downscaled by a quarter, up to 4 times,
+    until it fits. Pictures with transparency are converted
+    to WebP, the others to JPEG. The result is cached
+    in the ".prepared" directory beside the picture
+    and reused while it is newer than the picture.
+
+    Note:
+        Requires the optional ``Pillow`` package.
+        The function is meant to be executed in a separate process.
+
+    Args:
+        pic_path: The path to the picture.
+        max_size: The maximum size of the result in bytes.
+
+    Returns:
+        The path to the prepared picture, or ``None``
+        if the picture already fits or can not be made to fit.
+
+    """
+
+
+def prune_prepared(directory: str, names: Set[str]) -> int:
+    """Removes prepared pictures whose source is not in ``names``.
+
+    The partial files of the running preparations are skipped,
+    the ones older than an hour are left by a crash and removed.
+
+    Args:
+        directory: The directory of the source pictures.
+        names: File names of the source pictures.
+
+    Returns:
+        The number of removed files.
+
+    """
@@ -1,7 +1,15 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import time
 
 
+_listeners = {}
+
+
 def init_logger(name, formatter):
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
@@ -9,17 +17,114 @@ def init_logger(name, formatter):
 
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
-    file_handler = logging.FileHandler(name + '.log', delay=True)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    file_handler = _create_file_handler(name + '.log', formatter)
+
+    #  Handlers are executed by the listener thread
+    listener = logging.handlers.QueueListener(
+        queue.SimpleQueue(), stream_handler, file_handler,
+        respect_handler_level=True)
+    logger.addHandler(_QueueHandler(listener.queue))
+    listener.start()
+    atexit.register(listener.stop)
+    _listeners[name] = listener
 
     return logger
 
 
+def set_file_handler(logger, filename, formatter, max_bytes=10485760,
+                     when=None, backup_count=5, json_lines=False):
+    file_handler = _create_file_handler(
+        filename, formatter, max_bytes, when, backup_count, json_lines)
+
+    listener = _listeners.get(logger.name)
+    if listener is None:
+        for handler in logger.handlers:
+            if isinstance(handler, logging.FileHandler):
+                logger.removeHandler(handler)
+                handler.close()
+                break
+        logger.addHandler(file_handler)
+        return
+
+    #  Waiting for the queued records to be written
+    listener.stop()
+    for handler in listener.handlers:
+        if isinstance(handler, logging.FileHandler):
+            handler.close()
+    listener.handlers = tuple(
+        handler for handler in listener.handlers
+        if not isinstance(handler, logging.FileHandler)) + (file_handler,)
+    listener.start()
+
+
+def _create_file_handler(filename, formatter, max_bytes=10485760, when=None,
+                         backup_count=5, json_lines=False):
+    if when is None:
+        handler = logging.handlers.RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count,
+            delay=True)
+    else:
+        handler = logging.handlers.TimedRotatingFileHandler(
+            filename, when=when, backupCount=backup_count, delay=True)
+    handler.setFormatter(JsonFormatter() if json_lines else formatter)
+    return handler
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record):
+        data = {
+            'datetime': getattr(record, 'datetime', None),
+            'created': record.created,
+            'thread': record.threadName,
+            'name': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = self.formatException(record.exc_info)
+        if exc_text:
+            data['exc_info'] = exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self._exception_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        #  The traceback is kept apart from the message, so every
+        #  formatter of the listener places it on its own
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = self._exception_formatter.formatException(
+                record.exc_info)
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        #  Formatted in the logging thread, as the frames
+        #  of the traceback may change before the listener runs
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+
 class _DateTimeFilter(logging.Filter):
 
+    def __init__(self):
+        super().__init__()
+        self._cache = (None, None)
+
     def filter(self, record):
-        record.datetime = time.strftime('%Y-%m-%d-%H-%M-%S')
+        second = int(record.created)
+        cached_second, datetime = self._cache
+        if second != cached_second:
+            datetime = time.strftime(
+                '%Y-%m-%d-%H-%M-%S', time.localtime(second))
+            self._cache = (second, datetime)
+        record.datetime = datetime
         return True
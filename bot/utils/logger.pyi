@@ -1,5 +1,11 @@
+from logging import FileHandler
+from logging import Filter
 from logging import Formatter
 from logging import Logger
+from logging import LogRecord
+from logging.handlers import QueueHandler
+from queue import SimpleQueue
+from typing import Optional
 
 
 def init_logger(name: str, formatter: Formatter) -> Logger:
@@ -9,6 +15,10 @@ def init_logger(name: str, formatter: Formatter) -> Logger:
     The format "%Y-%m-%d-%H-%M-%S" is applied to the datetime part.
     File output handler writes to the file at path ``name + '.log'``.
 
+    The logger only puts records into a queue, and the output handlers
+    are executed by a background listener thread, so logging never
+    blocks on the console or the disk.
+
     Args:
         name: The name of the logger.
         formatter: Formatter's object.
@@ -17,3 +27,60 @@ def init_logger(name: str, formatter: Formatter) -> Logger:
         An initialized logger object.
 
     """
+
+
+def set_file_handler(logger: Logger, filename: str, formatter: Formatter, max_bytes: int = 10485760, when: Optional[str] = None, backup_count: int = 5, json_lines: bool = False):
+    """Replaces the file output handler of the logger.
+
+    The file is rotated by size, or by time if ``when`` is specified.
+
+    Args:
+        logger: The logger initialized by ``init_logger``
+            or any other logger with a ``FileHandler``.
+        filename: The path to the log file.
+        formatter: Formatter's object.
+        max_bytes: The size of the file in bytes to rotate it at.
+            Zero disables the rotation by size.
+        when: The interval type of the rotation by time, one of
+            the values accepted by ``TimedRotatingFileHandler``.
+        backup_count: The number of rotated files to keep.
+        json_lines: Whether to write records as JSON lines
+            instead of using the ``formatter``.
+
+    """
+
+
+def _create_file_handler(filename: str, formatter: Formatter, max_bytes: int = 10485760, when: Optional[str] = None, backup_count: int = 5, json_lines: bool = False) -> FileHandler: ...
+
+
+class JsonFormatter(Formatter):
+    """Formats records as JSON objects, one per line.
+
+    The objects contain the keys: "datetime", "created", "thread",
+    "name", "level", "message" and optionally "exc_info",
+    the formatted traceback of the logged exception.
+    """
+
+
+class _QueueHandler(QueueHandler):
+    """Puts records into the queue of the listener.
+
+    Unlike ``QueueHandler``, the traceback is not merged into
+    the message, it is kept formatted in ``exc_text``, so
+    ``JsonFormatter`` emits it as a separate key.
+    """
+
+    _exception_formatter: Formatter
+
+    def __init__(self, queue: SimpleQueue): ...
+
+    def prepare(self, record: LogRecord) -> LogRecord: ...
+
+
+class _DateTimeFilter(Filter):
+    """Adds the ``datetime`` attribute to the records.
+
+    The formatted time is cached for the current second.
+    """
+
+    def filter(self, record: LogRecord) -> bool: ...
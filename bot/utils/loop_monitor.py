@@ -0,0 +1,135 @@
+import asyncio
+import random
+import sys
+import threading
+import time
+import traceback
+
+from .metrics import Histogram
+
+
+_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+_STACK_LIMIT = 20
+
+
+class LoopLagMonitor:
+
+    def __init__(self, loop, logger, interval=0.1, threshold=0.0,
+                 sample_rate=1.0):
+        self._log_prefix = f'{type(self).__name__}: '
+
+        self.loop = loop
+        self.logger = logger
+        self.interval = interval
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.lag = Histogram(_LAG_BUCKETS)
+        self.last = 0.0
+        self.max = 0.0
+        self.stalls = 0
+        self.captured = 0
+
+        self._task = None
+        self._stopped = None
+        self._loop_thread_id = None
+        self._wake_at = None
+        self._sampled_wake_at = None
+        self._random = random.Random()
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._task = self.loop.create_task(self._run())
+        self._stopped = threading.Event()
+        threading.Thread(
+            target=self._watch, args=(self._stopped,),
+            name='LoopLagWatchdog', daemon=True).start()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._stopped.set()
+
+    async def _run(self):
+        try:
+            while True:
+                #  The same clock is read by the watchdog thread
+                self._wake_at = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(time.monotonic() - self._wake_at, 0)
+                self._wake_at = None
+                self.last = lag
+                if lag > self.max:
+                    self.max = lag
+                self.lag.observe(lag)
+                if self.threshold and lag >= self.threshold:
+                    self.stalls += 1
+        except asyncio.CancelledError:
+            self._wake_at = None
+
+    def _watch(self, stopped):
+        #  Runs in its own thread, so the stack is captured
+        #  while the loop is still blocked
+        while not stopped.wait(
+                self.threshold / 2 if self.threshold else self.interval):
+            wake_at = self._wake_at
+            if (not self.threshold or wake_at is None or
+                    wake_at == self._sampled_wake_at):
+                continue
+            lag = time.monotonic() - wake_at
+            if lag < self.threshold:
+                continue
+            #  Every stall is sampled once
+            self._sampled_wake_at = wake_at
+            if self._random.random() >= self.sample_rate:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self.captured += 1
+            try:
+                self._report(lag, frame)
+            except Exception as e:
+                self.logger.error(
+                    self._log_prefix +
+                    f'Caught an exception of type `{type(e).__name__}` '
+                    f'while capturing the stack of the event loop: {e}')
+            finally:
+                del frame
+
+    def _report(self, lag, frame):
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+
+        #  Skipping the frames of the event loop running the callback
+        start = 0
+        for i, f in enumerate(frames):
+            if _is_asyncio_frame(f) and f.f_code.co_name == '_run':
+                start = i + 1
+                break
+        while start < len(frames) and _is_asyncio_frame(frames[start]):
+            start += 1
+        frames = frames[start:] or frames
+
+        origin = frames[0]
+        #  The qualified name is available since Python 3.11
+        name = getattr(origin.f_code, 'co_qualname', origin.f_code.co_name)
+        msg = (f'The event loop is blocked for {lag:.3f} seconds '
+               f'by `{origin.f_globals.get("__name__")}.{name}`')
+        task = asyncio.current_task(self.loop)
+        if task is not None:
+            msg += f' of the task `{task.get_name()}`'
+        stack = traceback.StackSummary.extract(
+            ((f, f.f_lineno) for f in frames[-_STACK_LIMIT:]),
+            lookup_lines=True)
+        msg += ':\n' + ''.join(stack.format()).rstrip()
+        self.logger.warning(self._log_prefix + msg)
+
+
+def _is_asyncio_frame(frame):
+    return frame.f_globals.get('__name__', '').startswith('asyncio.')
@@ -0,0 +1,85 @@
+from asyncio import AbstractEventLoop
+from asyncio import Task
+from logging import Logger
+from random import Random
+from threading import Event
+from types import FrameType
+from typing import Optional
+
+from .metrics import Histogram
+
+
+class LoopLagMonitor:
+    """Measures the lag of the event loop continuously.
+
+    Sleeps for ``interval`` in a loop and records how much longer
+    than requested every sleep took, i.e. how long the loop was
+    blocked by synchronous code.
+
+    A watchdog thread checks whether the sleep is overdue
+    by ``threshold`` seconds. If so, the loop is still blocked,
+    and the stack of the loop thread is captured and logged
+    with the coroutine and the task that block it. Only the
+    ``sample_rate`` share of the stalls is captured, once per stall.
+
+    Attributes:
+        loop: The event loop to be measured.
+        logger: Logger's object.
+        interval: The interval between measurements in seconds.
+        threshold: The lag in seconds after which the stack is captured,
+            ``0`` disables capturing.
+        sample_rate: The share of the stalls whose stack is captured.
+        lag: The histogram of the measured lags in seconds.
+        last: The last measured lag in seconds.
+        max: The maximum measured lag in seconds.
+        stalls: The number of the lags not less than ``threshold``.
+        captured: The number of the captured stacks.
+
+    """
+
+    loop: AbstractEventLoop
+    logger: Logger
+    interval: float
+    threshold: float
+    sample_rate: float
+    lag: Histogram
+    last: float
+    max: float
+    stalls: int
+    captured: int
+
+    _task: Optional[Task]
+    _stopped: Optional[Event]
+    _loop_thread_id: Optional[int]
+    _wake_at: Optional[float]
+    _sampled_wake_at: Optional[float]
+    _random: Random
+
+    def __init__(self, loop: AbstractEventLoop, logger: Logger, interval: float = 0.1, threshold: float = 0.0, sample_rate: float = 1.0):
+        """
+        Args:
+            loop: The event loop to be measured.
+            logger: Logger's object.
+            interval: The interval between measurements in seconds.
+            threshold: The lag in seconds after which the stack
+                is captured, ``0`` disables capturing.
+            sample_rate: The share of the stalls whose stack is captured.
+
+        """
+
+    def start(self):
+        """Starts the measurements and the watchdog thread.
+
+        Must be called from the thread running the loop.
+        """
+
+    def stop(self): ...
+
+    async def _run(self): ...
+
+    def _watch(self, stopped: Event): ...
+
+    def _report(self, lag: float, frame: FrameType): ...
+
+
+def _is_asyncio_frame(frame: FrameType) -> bool: ...
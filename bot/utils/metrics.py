@@ -0,0 +1,168 @@
+import math
+from bisect import bisect_left
+
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self):
+        return [('', (), self.value)]
+
+
+class Gauge(Counter):
+
+    __slots__ = ()
+
+    def set(self, value):
+        self.value = value
+
+
+class Histogram:
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def samples(self):
+        result = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            result.append(('_bucket', (('le', bound),), cumulative))
+        result.append(('_bucket', (('le', math.inf),), self.count))
+        result.append(('_sum', (), self.sum))
+        result.append(('_count', (), self.count))
+        return result
+
+
+class MetricFamily:
+
+    _types = {'counter': Counter, 'gauge': Gauge, 'histogram': Histogram}
+
+    def __init__(self, name, type, help, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.type = type
+        self.help = help
+        self.buckets = buckets
+        self.children = {}
+
+    def labels(self, **labels):
+        key = tuple(sorted(labels.items()))
+        child = self.children.get(key)
+        if child is None:
+            if self.type == 'histogram':
+                child = Histogram(self.buckets)
+            else:
+                child = self._types[self.type]()
+            self.children[key] = child
+        return child
+
+    def remove(self, **labels):
+        self.children.pop(tuple(sorted(labels.items())), None)
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._families = {}
+        self._collectors = []
+
+    def counter(self, name, help):
+        return self._get_family(name, 'counter', help)
+
+    def gauge(self, name, help):
+        return self._get_family(name, 'gauge', help)
+
+    def histogram(self, name, help, buckets=DEFAULT_BUCKETS):
+        return self._get_family(name, 'histogram', help, buckets)
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self):
+        lines = []
+        for family in self._families.values():
+            samples = [
+                (suffix, key + labels, value)
+                for key, child in family.children.items()
+                for suffix, labels, value in child.samples()]
+            _render_family(
+                lines, family.name, family.type, family.help, samples)
+        #  Read from the in-process counters at the scrape time
+        for collector in self._collectors:
+            for name, type, help, samples in collector():
+                samples = [
+                    (suffix, tuple(sorted(labels.items())), value)
+                    for suffix, labels, value in samples]
+                _render_family(lines, name, type, help, samples)
+        return '\n'.join(lines) + '\n'
+
+    def _get_family(self, name, type, help, buckets=DEFAULT_BUCKETS):
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = MetricFamily(
+                name, type, help, buckets)
+        elif family.type != type:
+            raise ValueError(
+                f'The metric `{name}` is already registered '
+                f'as a {family.type}.')
+        return family
+
+
+def _render_family(lines, name, type, help, samples):
+    lines.append(f'# HELP {name} {_escape(help, False)}')
+    lines.append(f'# TYPE {name} {type}')
+    for suffix, labels, value in samples:
+        if labels:
+            labels_str = ','.join(
+                f'{k}="{_escape(_format_value(v), True)}"'
+                for k, v in labels)
+            lines.append(
+                f'{name}{suffix}{{{labels_str}}} {_format_value(value)}')
+        else:
+            lines.append(f'{name}{suffix} {_format_value(value)}')
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def _escape(value, quoted):
+    value = value.replace('\\', '\\\\').replace('\n', '\\n')
+    if quoted:
+        value = value.replace('"', '\\"')
+    return value
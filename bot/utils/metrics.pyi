@@ -0,0 +1,156 @@
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+
+Labels = Tuple[Tuple[str, Union[str, float]], ...]
+Sample = Tuple[str, Labels, float]
+#  name, type, help, samples of (suffix, labels, value)
+Collected = Tuple[str, str, str, Iterable[Tuple[str, Dict[str, str], float]]]
+
+DEFAULT_BUCKETS: Tuple[float, ...]
+
+
+class Counter:
+    """A monotonically increasing value.
+
+    Attributes:
+        value: The current value.
+
+    """
+
+    value: float
+
+    def __init__(self): ...
+
+    def inc(self, amount: float = 1):
+        """Increases the value by the amount."""
+
+    def samples(self) -> List[Sample]: ...
+
+
+class Gauge(Counter):
+    """A value that can go up and down."""
+
+    def set(self, value: float):
+        """Sets the value."""
+
+
+class Histogram:
+    """Counts observed values in cumulative buckets.
+
+    Attributes:
+        buckets: The upper bounds of the buckets in ascending order,
+            the ``+Inf`` bucket is implied.
+        counts: The number of values in every bucket, not cumulative.
+        count: The number of observed values.
+        sum: The sum of observed values.
+
+    """
+
+    buckets: Tuple[float, ...]
+    counts: List[int]
+    count: int
+    sum: float
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS): ...
+
+    def observe(self, value: float):
+        """Adds the value to its bucket."""
+
+    def samples(self) -> List[Sample]: ...
+
+
+class MetricFamily:
+    """Metrics of the same name with different labels.
+
+    Attributes:
+        name: The name of the metric.
+        type: ``"counter"``, ``"gauge"`` or ``"histogram"``.
+        help: The description of the metric.
+        buckets: The buckets of the histograms.
+        children: The metrics by their sorted labels.
+
+    """
+
+    name: str
+    type: str
+    help: str
+    buckets: Tuple[float, ...]
+    children: Dict[Labels, Union[Counter, Gauge, Histogram]]
+
+    def __init__(self, name: str, type: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS): ...
+
+    def labels(self, **labels: str) -> Union[Counter, Gauge, Histogram]:
+        """Returns the metric with the labels, creating it if necessary."""
+
+    def remove(self, **labels: str):
+        """Removes the metric with the labels if it exists."""
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text format.
+
+    Metrics are either updated by the code in place through
+    the families, or read from the existing in-process counters
+    by the collectors at the scrape time.
+
+    """
+
+    _families: Dict[str, MetricFamily]
+    _collectors: List[Callable[[], Iterable[Collected]]]
+
+    def __init__(self): ...
+
+    def counter(self, name: str, help: str) -> MetricFamily:
+        """Returns the counter family, registering it if necessary.
+
+        Raises:
+            ValueError: The name is registered with another type.
+
+        """
+
+    def gauge(self, name: str, help: str) -> MetricFamily:
+        """Returns the gauge family, registering it if necessary.
+
+        Raises:
+            ValueError: The name is registered with another type.
+
+        """
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> MetricFamily:
+        """Returns the histogram family, registering it if necessary.
+
+        Raises:
+            ValueError: The name is registered with another type.
+
+        """
+
+    def add_collector(self, collector: Callable[[], Iterable[Collected]]):
+        """Adds the function returning metrics at the scrape time.
+
+        The function returns tuples of the name, the type, the help
+        and the samples of the metric. Samples are tuples
+        of the name suffix, e.g. ``"_sum"``, the labels and the value.
+        """
+
+    def remove_collector(self, collector: Callable[[], Iterable[Collected]]):
+        """Removes the collector if it is added."""
+
+    def render(self) -> str:
+        """Returns all the metrics in the Prometheus text format."""
+
+    def _get_family(self, name: str, type: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> MetricFamily: ...
+
+
+def _render_family(lines: List[str], name: str, type: str, help: str, samples: Iterable[Sample]): ...
+
+
+def _format_value(value: Union[str, float]) -> str: ...
+
+
+def _escape(value: str, quoted: bool) -> str: ...
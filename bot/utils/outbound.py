@@ -0,0 +1,247 @@
+import asyncio
+import heapq
+import itertools
+import re
+import time
+
+from aiohttp import TraceConfig
+
+from .utils import LatencyStats
+
+
+_API_PREFIX = re.compile(r'^/api(/v\d+)?')
+_MAJOR_PARAMETERS = ('channels', 'guilds', 'webhooks')
+
+
+class OutboundQueue:
+
+    SCHEDULED = 0
+    SUGGESTION = 1
+    CLEANUP = 2
+    PRIORITIES = ('scheduled', 'suggestion', 'cleanup')
+
+    def __init__(self, loop, global_rate=50):
+        self.loop = loop
+        self.global_rate = global_rate
+        self.depth = {name: 0 for name in self.PRIORITIES}
+        self.wait_stats = {name: LatencyStats() for name in self.PRIORITIES}
+        self.responses = 0
+        self.rate_limited = 0
+
+        self.trace_config = TraceConfig()
+        self.trace_config.on_request_end.append(self._on_request_end)
+
+        self._queues = {}
+        self._buckets = {}
+        self._bucket_hashes = {}
+        self._counter = itertools.count()
+        self._global_tokens = float(global_rate)
+        self._global_updated = time.monotonic()
+        self._global_blocked_until = 0.0
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    async def send(self, priority, channel, *args, **kwargs):
+        return await self.submit(
+            priority, 'POST', f'/channels/{channel.id}/messages',
+            lambda: channel.send(*args, **kwargs))
+
+    async def add_reaction(self, priority, message, emoji):
+        return await self.submit(
+            priority, 'PUT',
+            f'/channels/{message.channel.id}/messages/{message.id}'
+            f'/reactions/{emoji}/@me',
+            lambda: message.add_reaction(emoji))
+
+    async def delete_message(self, priority, message):
+        return await self.submit(
+            priority, 'DELETE',
+            f'/channels/{message.channel.id}/messages/{message.id}',
+            message.delete)
+
+    async def submit(self, priority, method, path, coro_factory):
+        if self._task is None:
+            self._task = self.loop.create_task(self._run())
+        future = self.loop.create_future()
+        heap = self._queues.setdefault(_parse_route(method, path), [])
+        heapq.heappush(heap, (
+            priority, next(self._counter), time.monotonic(),
+            coro_factory, future))
+        self.depth[self.PRIORITIES[priority]] += 1
+        self._wakeup.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            delay = self._dispatch_ready(time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch_ready(self, now):
+        while True:
+            wake = None
+            best = None
+            for key, heap in list(self._queues.items()):
+                while heap and heap[0][4].done():
+                    self._pop(heap, now)  # Cancelled by the caller
+                if not heap:
+                    del self._queues[key]
+                    continue
+                delay = self._get_bucket(key).delay(now)
+                if delay is not None and delay <= 0:
+                    if best is None or heap[0] < self._queues[best][0]:
+                        best = key
+                elif delay is not None:
+                    wake = delay if wake is None else min(wake, delay)
+            if best is None:
+                return wake
+
+            #  Lower priorities only get the requests
+            #  left by higher ones in the global limit
+            global_delay = self._global_delay(now)
+            if global_delay > 0:
+                return global_delay
+            self._global_tokens -= 1
+
+            heap = self._queues[best]
+            _, _, _, coro_factory, future = self._pop(heap, now)
+            if not heap:
+                del self._queues[best]
+            bucket = self._get_bucket(best)
+            bucket.acquire(now)
+            self.loop.create_task(self._execute(bucket, coro_factory, future))
+
+    def _pop(self, heap, now):
+        item = heapq.heappop(heap)
+        priority, _, enqueued, _, future = item
+        name = self.PRIORITIES[priority]
+        self.depth[name] -= 1
+        if not future.done():
+            self.wait_stats[name].add(now - enqueued)
+        return item
+
+    async def _execute(self, bucket, coro_factory, future):
+        try:
+            result = await coro_factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            bucket.in_flight -= 1
+            self._wakeup.set()
+
+    def _global_delay(self, now):
+        if now < self._global_blocked_until:
+            return self._global_blocked_until - now
+        self._global_tokens = min(
+            float(self.global_rate),
+            self._global_tokens +
+            (now - self._global_updated) * self.global_rate)
+        self._global_updated = now
+        if self._global_tokens >= 1:
+            return 0.0
+        return (1 - self._global_tokens) / self.global_rate
+
+    def _get_bucket(self, route_key):
+        route, major = route_key
+        bucket_hash = self._bucket_hashes.get(route)
+        key = (route if bucket_hash is None else bucket_hash, major)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            #  Carries the state collected before the hash was known
+            bucket = self._buckets.pop((route, major), None) or _Bucket()
+            self._buckets[key] = bucket
+        return bucket
+
+    async def _on_request_end(self, session, context, params):
+        route_key = _parse_route(params.method, params.url.path)
+        headers = params.response.headers
+        now = time.monotonic()
+        self.responses += 1
+
+        bucket_hash = headers.get('X-RateLimit-Bucket')
+        if bucket_hash is not None:
+            self._bucket_hashes[route_key[0]] = bucket_hash
+        bucket = self._get_bucket(route_key)
+        try:
+            bucket.update(headers, now)
+        except ValueError:
+            pass  # Malformed headers keep the previous state
+
+        if params.response.status == 429:
+            self.rate_limited += 1
+            if headers.get('X-RateLimit-Global') == 'true':
+                try:
+                    retry_after = float(headers['Retry-After'])
+                except (KeyError, ValueError):
+                    retry_after = 1.0
+                self._global_blocked_until = now + retry_after
+        self._wakeup.set()
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for heap in self._queues.values():
+            for *_, future in heap:
+                future.cancel()
+        self._queues.clear()
+
+
+class _Bucket:
+
+    __slots__ = ('limit', 'remaining', 'reset_at', 'in_flight')
+
+    def __init__(self):
+        self.limit = 1
+        self.remaining = 0
+        self.reset_at = None
+        self.in_flight = 0
+
+    def delay(self, now):
+        if self.reset_at is None:
+            #  One request at a time until the limits are known
+            return 0.0 if not self.in_flight else None
+        if now >= self.reset_at:
+            return 0.0 if self.in_flight < self.limit else None
+        if self.remaining > 0:
+            return 0.0
+        return self.reset_at - now
+
+    def acquire(self, now):
+        self.in_flight += 1
+        if self.reset_at is not None and now < self.reset_at:
+            self.remaining -= 1
+
+    def update(self, headers, now):
+        if 'X-RateLimit-Limit' in headers:
+            self.limit = int(headers['X-RateLimit-Limit'])
+        if 'X-RateLimit-Remaining' in headers:
+            #  Other requests in flight may not be counted yet
+            self.remaining = (int(headers['X-RateLimit-Remaining']) -
+                              max(self.in_flight - 1, 0))
+        if 'X-RateLimit-Reset-After' in headers:
+            self.reset_at = now + float(headers['X-RateLimit-Reset-After'])
+
+
+def _parse_route(method, path):
+    parts = _API_PREFIX.sub('', path).strip('/').split('/')
+    if len(parts) < 2 or parts[0] not in _MAJOR_PARAMETERS:
+        return f'{method} /' + '/'.join(parts), ''
+    major = parts[1]
+    template = [parts[0], '{}']
+    for previous, part in zip(parts[1:], parts[2:]):
+        if part.isdigit() or previous == 'reactions':
+            template.append('{}')
+        else:
+            template.append(part)
+    return f'{method} /' + '/'.join(template), major
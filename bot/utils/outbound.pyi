@@ -0,0 +1,164 @@
+from asyncio import AbstractEventLoop
+from asyncio import Event
+from asyncio import Future
+from asyncio import Task
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+
+from aiohttp import ClientSession
+from aiohttp import TraceConfig
+from aiohttp import TraceRequestEndParams
+from discord import Message
+from discord import PartialMessage
+from discord.abc import Messageable
+
+from .utils import LatencyStats
+
+
+_RouteKey = Tuple[str, str]
+_Item = Tuple[int, int, float, Callable[[], Awaitable], Future]
+
+
+class OutboundQueue:
+    """The queue of the requests to discord made by modules.
+
+    Every request waits in the queue of its route until the rate
+    limit bucket of the route has a free request, and the request
+    of the highest priority among the available buckets is sent first.
+    The buckets are learned from the "X-RateLimit-*" headers
+    of all the responses received by the client, including
+    the requests made bypassing the queue, so routes that share
+    a bucket hash share the limit. Until the limit of a bucket is known,
+    its requests are sent one at a time. All the requests share
+    the global limit of ``global_rate`` requests per second.
+
+    discord.py still handles the rate limits itself, the queue
+    only decides which request goes first.
+
+    Attributes:
+        SCHEDULED: The priority of scheduled sends.
+        SUGGESTION: The priority of suggestion posts and reactions.
+        CLEANUP: The priority of deleting messages.
+        PRIORITIES: Names of the priorities by value.
+        loop: The event loop used by the bot.
+        global_rate: The global limit of requests per second.
+        depth: Numbers of the queued requests by priority name.
+        wait_stats: Time spent by requests in the queue
+            by priority name.
+        responses: The number of responses received by the client.
+        rate_limited: The number of responses with the status 429.
+        trace_config: The trace configuration to be passed
+            to the client to receive the headers of responses.
+
+    """
+
+    SCHEDULED: int
+    SUGGESTION: int
+    CLEANUP: int
+    PRIORITIES: Tuple[str, ...]
+
+    loop: AbstractEventLoop
+    global_rate: float
+    depth: Dict[str, int]
+    wait_stats: Dict[str, LatencyStats]
+    responses: int
+    rate_limited: int
+    trace_config: TraceConfig
+
+    _queues: Dict[_RouteKey, List[_Item]]
+    _buckets: Dict[Tuple[str, str], _Bucket]
+    _bucket_hashes: Dict[str, str]
+    _counter: Iterator[int]
+    _global_tokens: float
+    _global_updated: float
+    _global_blocked_until: float
+    _wakeup: Event
+    _task: Optional[Task]
+
+    def __init__(self, loop: AbstractEventLoop, global_rate: float = 50):
+        """
+        Args:
+            loop: The event loop used by the bot.
+            global_rate: The global limit of requests per second.
+
+        """
+
+    async def send(self, priority: int, channel: Messageable, *args, **kwargs) -> Message:
+        """Sends the message to the channel.
+
+        Args:
+            priority: The priority of the request.
+            channel: The channel to send the message to.
+            *args: Arguments for ``channel.send``.
+            **kwargs: Keyword arguments for ``channel.send``.
+
+        Returns:
+            The sent message.
+
+        """
+
+    async def add_reaction(self, priority: int, message: Message, emoji: str):
+        """Adds the reaction to the message."""
+
+    async def delete_message(self, priority: int, message: PartialMessage):
+        """Deletes the message."""
+
+    async def submit(self, priority: int, method: str, path: str, coro_factory: Callable[[], Awaitable]) -> Any:
+        """Queues the request and waits for its result.
+
+        Args:
+            priority: The priority of the request, the lower
+                the value, the earlier the request is sent.
+            method: The HTTP method of the request.
+            path: The path of the request in the discord API,
+                e.g. "/channels/{channel_id}/messages".
+            coro_factory: A function creating the coroutine
+                that makes the request.
+
+        Returns:
+            The result of the coroutine.
+
+        """
+
+    async def _run(self): ...
+
+    def _dispatch_ready(self, now: float) -> Optional[float]: ...
+
+    def _pop(self, heap: List[_Item], now: float) -> _Item: ...
+
+    async def _execute(self, bucket: _Bucket, coro_factory: Callable[[], Awaitable], future: Future): ...
+
+    def _global_delay(self, now: float) -> float: ...
+
+    def _get_bucket(self, route_key: _RouteKey) -> _Bucket: ...
+
+    async def _on_request_end(self, session: ClientSession, context, params: TraceRequestEndParams): ...
+
+    def close(self):
+        """Cancels all the queued requests."""
+
+
+class _Bucket:
+
+    limit: int
+    remaining: int
+    reset_at: Optional[float]
+    in_flight: int
+
+    def __init__(self): ...
+
+    def delay(self, now: float) -> Optional[float]: ...
+
+    def acquire(self, now: float): ...
+
+    def update(self, headers: Mapping[str, str], now: float): ...
+
+
+def _parse_route(method: str, path: str) -> _RouteKey: ...
@@ -0,0 +1,57 @@
+from bisect import bisect_left
+from bisect import insort
+from os import path
+
+from .utils import get_pics_path_list
+from .utils import is_pic_path
+
+
+class PicsQueue:
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._keys = []
+        self._paths = set()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, pic_path):
+        return pic_path in self._paths
+
+    @staticmethod
+    def _key(pic_path):
+        #  Sort by file name
+        return (path.splitext(path.basename(pic_path))[0], pic_path)
+
+    def add(self, pic_path):
+        if pic_path in self._paths or not is_pic_path(pic_path):
+            return False
+        self._paths.add(pic_path)
+        insort(self._keys, self._key(pic_path))
+        return True
+
+    def discard(self, pic_path):
+        if pic_path not in self._paths:
+            return False
+        self._paths.remove(pic_path)
+        del self._keys[bisect_left(self._keys, self._key(pic_path))]
+        return True
+
+    def first(self):
+        return self._keys[0][1] if self._keys else None
+
+    def head(self, n):
+        return [key[1] for key in self._keys[:n]]
+
+    def scan(self):
+        return get_pics_path_list(self.directory)
+
+    def reconcile(self, pics_path_list):
+        paths = set(pics_path_list)
+        added = paths - self._paths
+        removed = self._paths - paths
+        if added or removed:
+            self._paths = paths
+            self._keys = sorted(self._key(p) for p in paths)
+        return added, removed
@@ -0,0 +1,94 @@
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+
+class PicsQueue:
+    """In-memory index of the pictures queued in a directory.
+
+    The pictures are kept sorted by file name, so the next picture
+    is available in constant time, while insertions and removals
+    take logarithmic time to locate the position.
+
+    The index is not thread-safe and must only be mutated
+    from the event loop thread.
+
+    Attributes:
+        directory: The directory the index is built for.
+
+    """
+
+    directory: str
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: The directory the index is built for.
+
+        """
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, pic_path: str) -> bool: ...
+
+    def add(self, pic_path: str) -> bool:
+        """Adds the picture to the index.
+
+        Args:
+            pic_path: The path to the picture.
+
+        Returns:
+            ``True`` if the picture was added, ``False`` if it is
+            already indexed or is not a picture.
+
+        """
+
+    def discard(self, pic_path: str) -> bool:
+        """Removes the picture from the index if it is present.
+
+        Args:
+            pic_path: The path to the picture.
+
+        Returns:
+            ``True`` if the picture was removed, otherwise ``False``.
+
+        """
+
+    def first(self) -> Optional[str]:
+        """Returns the next picture to be sent.
+
+        Returns:
+            The path of the first picture by file name
+            or ``None`` if the queue is empty.
+
+        """
+
+    def head(self, n: int) -> List[str]:
+        """Returns up to ``n`` next pictures in the order of sending."""
+
+    def scan(self) -> List[str]:
+        """Lists the pictures in the directory.
+
+        Note:
+            This is a blocking call, run it in an executor.
+
+        Returns:
+            The list of image paths.
+
+        """
+
+    def reconcile(self, pics_path_list: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """Replaces the content of the index with the scan result.
+
+        Args:
+            pics_path_list: The result of the ``scan`` method.
+
+        Returns:
+            Sets of the added and removed paths.
+
+        """
+
+    @staticmethod
+    def _key(pic_path: str) -> Tuple[str, str]: ...
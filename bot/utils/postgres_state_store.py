@@ -0,0 +1,101 @@
+import weakref
+
+from .state_store import StateStore
+
+
+try:
+    import psycopg2
+    from psycopg2.pool import ThreadedConnectionPool
+except ModuleNotFoundError:
+    psycopg2 = None
+    ThreadedConnectionPool = None
+
+
+class PostgresStateStore(StateStore):
+
+    _migration = '''
+        CREATE TABLE IF NOT EXISTS pics_sending_module (
+            category_name varchar(255) PRIMARY KEY,
+            last_send_datetime bigint);
+        '''
+    _prepare_get = '''
+        PREPARE pics_sending_module_get (varchar) AS
+            SELECT last_send_datetime FROM pics_sending_module
+            WHERE category_name = $1;
+        '''
+    _prepare_set = '''
+        PREPARE pics_sending_module_set (varchar, bigint) AS
+            INSERT INTO pics_sending_module (category_name, last_send_datetime)
+            VALUES ($1, $2)
+            ON CONFLICT (category_name) DO
+                UPDATE
+                SET last_send_datetime = EXCLUDED.last_send_datetime;
+        '''
+
+    def __init__(self, db, loop, min_connections=2, max_connections=4,
+                 flush_interval=0):
+        super().__init__(loop, max_connections, flush_interval)
+
+        self.db = db
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+
+        self._pool = None
+        self._prepared = weakref.WeakSet()
+
+    def _connect(self):
+        pool = ThreadedConnectionPool(
+            self.min_connections, self.max_connections, **self.db)
+        conn = pool.getconn()
+        try:
+            #  The schema is migrated once per pool
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(self._migration)
+        finally:
+            pool.putconn(conn)
+        self._pool = pool
+
+    def _disconnect(self):
+        self._pool.closeall()
+        self._pool = None
+        self._prepared.clear()
+
+    def _execute(self, statement, args, fetch=False, many=False):
+        conn = self._pool.getconn()
+        broken = False
+        try:
+            if conn not in self._prepared:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(self._prepare_get)
+                        cur.execute(self._prepare_set)
+                self._prepared.add(conn)
+            with conn:
+                with conn.cursor() as cur:
+                    if many:
+                        cur.executemany(statement, args)
+                        return None
+                    cur.execute(statement, args)
+                    return cur.fetchone() if fetch else None
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            if broken or conn.closed:
+                self._prepared.discard(conn)
+            self._pool.putconn(conn, close=broken or bool(conn.closed))
+
+    def _get(self, category_name):
+        data = self._execute(
+            'EXECUTE pics_sending_module_get (%s);',
+            (category_name,),
+            fetch=True)
+        return None if data is None else data[0]
+
+    def _set_many(self, items):
+        #  A single transaction for all the categories
+        self._execute(
+            'EXECUTE pics_sending_module_set (%s, %s);',
+            items,
+            many=True)
@@ -0,0 +1,52 @@
+from asyncio import AbstractEventLoop
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from .state_store import StateStore
+
+
+class PostgresStateStore(StateStore):
+    """Persistent storage of the scheduler state in PostgreSQL.
+
+    Connections are taken from a pool. The table is created once
+    when the pool is opened, and the hot read / upsert statements
+    are prepared once per connection.
+
+    Attributes:
+        db: Database connection parameters.
+        min_connections: The number of pooled connections kept open.
+        max_connections: The maximum number of pooled connections
+            and worker threads.
+
+    """
+
+    db: Dict
+    min_connections: int
+    max_connections: int
+
+    def __init__(self, db: Dict, loop: AbstractEventLoop, min_connections: int = 2, max_connections: int = 4, flush_interval: float = 0):
+        """
+        Args:
+            db: Database connection parameters.
+            loop: The event loop used by the bot.
+            min_connections: The number of pooled connections kept open.
+            max_connections: The maximum number of pooled connections
+                and worker threads.
+            flush_interval: The maximum number of seconds
+                the changes are kept in memory.
+
+        """
+
+    def _connect(self): ...
+
+    def _disconnect(self): ...
+
+    def _execute(self, statement: str, args: Sequence, fetch: bool = False, many: bool = False) -> Optional[Sequence[Any]]: ...
+
+    def _get(self, category_name: str) -> Optional[int]: ...
+
+    def _set_many(self, items: List[Tuple[str, Optional[int]]]): ...
@@ -0,0 +1,59 @@
+import os
+
+
+class ReadAheadCache:
+
+    def __init__(self, fs_io, budget):
+        self.fs_io = fs_io
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+        self._buffers = {}
+
+    async def load(self, key, path):
+        if key in self._buffers:
+            return True
+        size = await self.fs_io.run('stat', os.path.getsize, path)
+        if size > self.budget - self.used:
+            self.rejected += 1
+            return False
+
+        #  Reserved before reading, so concurrent loads
+        #  can not exceed the budget together
+        self.used += size
+        try:
+            data = await self.fs_io.run('read', _read_file, path)
+        except BaseException:
+            self.used -= size
+            raise
+        #  The file may have changed since it was measured
+        self.used += len(data) - size
+        self._buffers[key] = (path, data)
+        return True
+
+    def take(self, key):
+        item = self._buffers.pop(key, None)
+        if item is None:
+            self.misses += 1
+            return None
+        self.used -= len(item[1])
+        self.hits += 1
+        return item
+
+    def discard(self, key):
+        item = self._buffers.pop(key, None)
+        if item is not None:
+            self.used -= len(item[1])
+
+    def clear(self):
+        for _, data in self._buffers.values():
+            self.used -= len(data)
+        self._buffers.clear()
+
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
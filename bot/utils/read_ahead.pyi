@@ -0,0 +1,73 @@
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from .fs_io import FileSystemIO
+
+
+class ReadAheadCache:
+    """In-memory buffers of files read ahead of their use.
+
+    All the buffers share the memory budget of ``budget`` bytes,
+    a file that does not fit into the rest of the budget
+    is not read and has to be read from the disk when it is used.
+
+    Attributes:
+        fs_io: Executor of blocking file system operations.
+        budget: The maximum total size of the buffers in bytes.
+        used: The total size of the buffers in bytes, including
+            the files being read.
+        hits: The number of the buffers taken.
+        misses: The number of the buffers requested but not loaded.
+        rejected: The number of the files not read due to the budget.
+
+    """
+
+    fs_io: FileSystemIO
+    budget: int
+    used: int
+    hits: int
+    misses: int
+    rejected: int
+
+    _buffers: Dict[str, Tuple[str, bytes]]
+
+    def __init__(self, fs_io: FileSystemIO, budget: int):
+        """
+        Args:
+            fs_io: Executor of blocking file system operations.
+            budget: The maximum total size of the buffers in bytes.
+
+        """
+
+    async def load(self, key: str, path: str) -> bool:
+        """Reads the file into a buffer.
+
+        Args:
+            key: The key of the buffer, e.g. the path of the picture
+                the file was prepared from.
+            path: The path to the file.
+
+        Returns:
+            ``True`` if the buffer is loaded, ``False`` if the file
+            does not fit into the budget.
+
+        """
+
+    def take(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """Removes the buffer from the cache.
+
+        Returns:
+            The path to the file and its content,
+            or ``None`` if the buffer is not loaded.
+
+        """
+
+    def discard(self, key: str):
+        """Removes the buffer from the cache if it is loaded."""
+
+    def clear(self):
+        """Removes all the buffers."""
+
+
+def _read_file(path: str) -> bytes: ...
@@ -0,0 +1,82 @@
+import os
+import struct
+
+
+_RECORD = struct.Struct('<32sQQdH')
+
+
+class SendHistory:
+
+    def __init__(self, path):
+        self.path = path
+
+        self._sent = {}
+        self._totals = {}
+        self._file = None
+
+    def __len__(self):
+        return len(self._sent)
+
+    @property
+    def loaded(self):
+        return self._file is not None
+
+    def load(self):
+        valid_size = 0
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+        offset = 0
+        while offset + _RECORD.size <= len(data):
+            digest, channel_id, message_id, timestamp, name_size = (
+                _RECORD.unpack_from(data, offset))
+            end = offset + _RECORD.size + name_size
+            if end > len(data):
+                break
+            category_name = data[offset + _RECORD.size:end].decode(
+                'utf-8', 'replace')
+            self._add(category_name, digest, channel_id, message_id,
+                      timestamp)
+            offset = valid_size = end
+
+        self._file = open(self.path, 'ab')
+        if valid_size != self._file.tell():
+            #  Drop the record torn by a crash
+            self._file.truncate(valid_size)
+            self._file.seek(valid_size)
+
+    def find(self, category_name, digest):
+        #  Returns: (channel_id, message_id, timestamp) of the first send
+        return self._sent.get((category_name, digest))
+
+    def stats(self, category_name):
+        #  Returns: the number of sends and the timestamp of the last one
+        return self._totals.get(category_name, (0, None))
+
+    def add(self, category_name, digest, channel_id, message_id, timestamp):
+        self._add(category_name, digest, channel_id, message_id, timestamp)
+        encoded = category_name.encode('utf-8')
+        self._file.write(_RECORD.pack(
+            digest, channel_id, message_id, timestamp, len(encoded)))
+        self._file.write(encoded)
+
+    def _add(self, category_name, digest, channel_id, message_id, timestamp):
+        #  The first send is kept, the later ones are only counted
+        self._sent.setdefault(
+            (category_name, digest), (channel_id, message_id, timestamp))
+        count, last = self.stats(category_name)
+        self._totals[category_name] = (
+            count + 1, timestamp if last is None else max(last, timestamp))
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
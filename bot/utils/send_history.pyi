@@ -0,0 +1,83 @@
+from typing import Dict
+from typing import IO
+from typing import Optional
+from typing import Tuple
+
+
+class SendHistory:
+    """Persistent history of the sent pictures.
+
+    The history is stored in an append-only file of records
+    (digest, channel id, message id, timestamp, category name)
+    and is kept in memory by the category and the SHA-256 digest,
+    so checking whether a picture was already sent to the category
+    takes constant time.
+
+    Attributes:
+        path: The path to the history file.
+
+    """
+
+    path: str
+
+    _sent: Dict[Tuple[str, bytes], Tuple[int, int, float]]
+    _totals: Dict[str, Tuple[int, Optional[float]]]
+    _file: Optional[IO[bytes]]
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: The path to the history file.
+
+        """
+
+    def __len__(self) -> int: ...
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the history file is loaded."""
+
+    def load(self):
+        """Loads the history file and opens it for appending.
+
+        A record torn by a crash at the end of the file is dropped.
+        Blocks, so it should be executed outside the event loop.
+        """
+
+    def find(self, category_name: str, digest: bytes) -> Optional[Tuple[int, int, float]]:
+        """Finds the first send of the picture to the category.
+
+        Args:
+            category_name: The name of the category.
+            digest: The SHA-256 digest of the picture.
+
+        Returns:
+            The channel id, the message id and the timestamp
+            of the send if found, otherwise ``None``.
+
+        """
+
+    def stats(self, category_name: str) -> Tuple[int, Optional[float]]:
+        """Returns the number of sends to the category
+        and the timestamp of the last one."""
+
+    def add(self, category_name: str, digest: bytes, channel_id: int, message_id: int, timestamp: float):
+        """Adds the send to the history.
+
+        The record is buffered until ``flush`` is called.
+
+        Args:
+            category_name: The name of the category.
+            digest: The SHA-256 digest of the picture.
+            channel_id: The id of the channel.
+            message_id: The id of the sent message.
+            timestamp: The POSIX timestamp of the send.
+
+        """
+
+    def _add(self, category_name: str, digest: bytes, channel_id: int, message_id: int, timestamp: float): ...
+
+    def flush(self):
+        """Writes the buffered records to the disk."""
+
+    def close(self): ...
@@ -0,0 +1,62 @@
+import sqlite3
+
+from .state_store import StateStore
+
+
+class SqliteStateStore(StateStore):
+
+    _migration = '''
+        CREATE TABLE IF NOT EXISTS pics_sending_module (
+            category_name varchar(255) PRIMARY KEY,
+            last_send_datetime bigint);
+        '''
+    #  Compiled once and kept in the statement cache of the connection
+    _get_statement = '''
+        SELECT last_send_datetime FROM pics_sending_module
+        WHERE category_name = ?;
+        '''
+    _set_statement = '''
+        INSERT INTO pics_sending_module (category_name, last_send_datetime)
+        VALUES (?, ?)
+        ON CONFLICT (category_name) DO
+            UPDATE
+            SET last_send_datetime = excluded.last_send_datetime;
+        '''
+
+    def __init__(self, path, loop, timeout=5.0, flush_interval=0):
+        #  A single thread owns the connection
+        super().__init__(loop, 1, flush_interval)
+
+        self.path = path
+        self.timeout = timeout
+
+        self._conn = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            #  Readers of other processes do not block the writer
+            conn.execute('PRAGMA journal_mode=WAL;')
+            #  The last commits may be lost on a power failure,
+            #  which is acceptable for the schedule
+            conn.execute('PRAGMA synchronous=NORMAL;')
+            with conn:
+                conn.execute(self._migration)
+        except BaseException:
+            conn.close()
+            raise
+        self._conn = conn
+
+    def _disconnect(self):
+        self._conn.close()
+        self._conn = None
+
+    def _get(self, category_name):
+        data = self._conn.execute(
+            self._get_statement, (category_name,)).fetchone()
+        return None if data is None else data[0]
+
+    def _set_many(self, items):
+        #  A single transaction for all the categories
+        with self._conn:
+            self._conn.executemany(self._set_statement, items)
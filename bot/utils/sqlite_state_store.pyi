@@ -0,0 +1,48 @@
+from asyncio import AbstractEventLoop
+from sqlite3 import Connection
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from .state_store import StateStore
+
+
+class SqliteStateStore(StateStore):
+    """Persistent storage of the scheduler state in an SQLite file.
+
+    The connection is owned by a single worker thread and uses
+    the write-ahead log, so the workers of the supervisor can share
+    the file. The statements are compiled once and reused
+    from the statement cache of the connection.
+
+    Attributes:
+        path: The path to the database file.
+        timeout: The number of seconds to wait for the lock
+            held by another process.
+
+    """
+
+    path: str
+    timeout: float
+
+    _conn: Optional[Connection]
+
+    def __init__(self, path: str, loop: AbstractEventLoop, timeout: float = 5.0, flush_interval: float = 0):
+        """
+        Args:
+            path: The path to the database file.
+            loop: The event loop used by the bot.
+            timeout: The number of seconds to wait for the lock
+                held by another process.
+            flush_interval: The maximum number of seconds
+                the changes are kept in memory.
+
+        """
+
+    def _connect(self): ...
+
+    def _disconnect(self): ...
+
+    def _get(self, category_name: str) -> Optional[int]: ...
+
+    def _set_many(self, items: List[Tuple[str, Optional[int]]]): ...
@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+
+    def __init__(self, required=(), on_complete=None):
+        self.origin = time.perf_counter()
+        self.required = tuple(required)
+        self.on_complete = on_complete
+        self.phases = {}
+        self.complete = False
+
+    def start(self, name):
+        if self.complete or name in self.phases:
+            return
+        self.phases[name] = [time.perf_counter(), None]
+
+    def finish(self, name):
+        phase = self.phases.get(name)
+        if phase is None or phase[1] is not None:
+            return
+        phase[1] = time.perf_counter()
+        if self.complete:
+            return
+        if any(k not in self.phases for k in self.required):
+            return
+        if any(end is None for _, end in self.phases.values()):
+            return
+        self.complete = True
+        if self.on_complete is not None:
+            self.on_complete(self)
+
+    @contextmanager
+    def measure(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.finish(name)
+
+    def summary(self):
+        result = {}
+        for name, (start, end) in self.phases.items():
+            result[name] = {
+                'start': start - self.origin,
+                'seconds': None if end is None else end - start,
+            }
+        ends = [end for _, end in self.phases.values() if end is not None]
+        result['total'] = {
+            'start': 0.0,
+            'seconds': max(ends) - self.origin if ends else None,
+        }
+        return result
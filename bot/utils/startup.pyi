@@ -0,0 +1,65 @@
+from typing import Callable
+from typing import ContextManager
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+
+class StartupTimer:
+    """Measures the phases of the bot's startup.
+
+    Phases may overlap, every phase is measured from its start
+    to its finish. The startup is complete once the ``required``
+    phases are started and every started phase is finished,
+    the phases started after that are ignored.
+
+    Attributes:
+        origin: The ``time.perf_counter`` value at the startup.
+        required: The phases without which the startup
+            is not complete.
+        on_complete: The function called with the timer
+            once the startup is complete.
+        phases: The start and finish times of the phases by their names,
+            the finish time is ``None`` while the phase is running.
+        complete: A flag that the startup is complete.
+
+    """
+
+    origin: float
+    required: Tuple[str, ...]
+    on_complete: Optional[Callable[['StartupTimer'], None]]
+    phases: Dict[str, List[Optional[float]]]
+    complete: bool
+
+    def __init__(self, required: Iterable[str] = (), on_complete: Optional[Callable[['StartupTimer'], None]] = None):
+        """
+        Args:
+            required: The phases without which the startup
+                is not complete.
+            on_complete: The function called with the timer
+                once the startup is complete.
+
+        """
+
+    def start(self, name: str):
+        """Marks the start of the phase.
+
+        Ignored if the phase is already started
+        or the startup is complete.
+        """
+
+    def finish(self, name: str):
+        """Marks the finish of the phase.
+
+        Ignored if the phase is not running.
+        """
+
+    def measure(self, name: str) -> ContextManager[None]:
+        """Measures the phase run inside the ``with`` block."""
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Returns the start offsets and the durations of the phases
+        in seconds, including the ``total`` time since the origin
+        to the last finished phase."""
@@ -0,0 +1,100 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class StateStore:
+
+    def __init__(self, loop, max_workers, flush_interval=0):
+        self._log_prefix = f'{type(self).__name__}: '
+
+        self.loop = loop
+        self.flush_interval = flush_interval
+
+        self._connected = False
+        self._pending = {}
+        self._lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=type(self).__name__)
+
+    async def start(self):
+        async with self._lock:
+            if not self._connected:
+                await self._run(self._connect)
+                self._connected = True
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    async def get_last_send_datetime(self, category_name):
+        if category_name in self._pending:
+            microseconds = self._pending[category_name]
+        else:
+            await self.start()
+            microseconds = await self._run(self._get, category_name)
+        if microseconds is None:
+            return None
+        return datetime.fromtimestamp(microseconds / 1e6)
+
+    async def set_last_send_datetime(self, category_name, datetime):
+        timestamp = (None if datetime is None
+                     else round(datetime.timestamp() * 1e6))
+        #  Only the latest value of the category is written
+        self._pending[category_name] = timestamp
+        if not self.flush_interval:
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                await self.start()
+                await self._run(self._set_many, list(batch.items()))
+            except BaseException:
+                #  Written by the next flush, unless changed meanwhile
+                for category_name, timestamp in batch.items():
+                    self._pending.setdefault(category_name, timestamp)
+                raise
+
+    async def close(self):
+        try:
+            await self.flush()
+        finally:
+            async with self._lock:
+                if self._connected:
+                    await self._run(self._disconnect)
+                    self._connected = False
+            self._executor.shutdown(wait=False)
+
+    def _run(self, func, *args):
+        return self.loop.run_in_executor(self._executor, func, *args)
+
+    def _connect(self):
+        raise NotImplementedError
+
+    def _disconnect(self):
+        raise NotImplementedError
+
+    def _get(self, category_name):
+        raise NotImplementedError
+
+    def _set_many(self, items):
+        raise NotImplementedError
+
+
+def create_state_store(db, loop):
+    #  The backends and their drivers are imported only when used
+    if db['backend'] == 'sqlite':
+        from .sqlite_state_store import SqliteStateStore
+        return SqliteStateStore(
+            db['path'], loop, flush_interval=db['flush_interval'])
+    from .postgres_state_store import PostgresStateStore
+    return PostgresStateStore(
+        {k: v for k, v in db.items()
+         if k not in ('backend', 'flush_interval')},
+        loop, flush_interval=db['flush_interval'])
@@ -0,0 +1,112 @@
+from asyncio import AbstractEventLoop
+from asyncio import Future
+from datetime import datetime
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+
+class StateStore:
+    """Base class of the persistent storages of the scheduler state.
+
+    All the blocking calls of a backend are executed in a dedicated
+    thread pool, so the event loop is never blocked by the database.
+    The time is stored as the number of microseconds since the epoch.
+
+    The changes are buffered in memory and written by ``flush``
+    in a single transaction, only the latest change of a category
+    is kept. With ``flush_interval`` set to 0 every change
+    is written at once.
+
+    Attributes:
+        loop: The event loop used by the bot.
+        flush_interval: The maximum number of seconds the changes
+            are kept in memory, ``flush`` is expected to be called
+            by the owner at this interval.
+
+    """
+
+    loop: AbstractEventLoop
+    flush_interval: float
+
+    _pending: Dict[str, Optional[int]]
+
+    def __init__(self, loop: AbstractEventLoop, max_workers: int, flush_interval: float = 0):
+        """
+        Args:
+            loop: The event loop used by the bot.
+            max_workers: The number of worker threads.
+            flush_interval: The maximum number of seconds
+                the changes are kept in memory.
+
+        """
+
+    async def start(self):
+        """Connects to the database and migrates the schema.
+
+        Does nothing if it is already connected. It is called
+        implicitly by the other coroutines, so the connection
+        is retried after a failed attempt.
+
+        """
+
+    @property
+    def pending(self) -> int:
+        """The number of categories with the changes not written yet."""
+
+    async def get_last_send_datetime(self, category_name: str) -> Optional[datetime]:
+        """Reads the time of the last sending of the category.
+
+        Args:
+            category_name: The name of the category.
+
+        Returns:
+            The stored or the pending time,
+            ``None`` if it is not stored.
+
+        """
+
+    async def set_last_send_datetime(self, category_name: str, datetime: Optional[datetime]):
+        """Stores the time of the last sending of the category.
+
+        The time is written by the next ``flush``.
+
+        Args:
+            category_name: The name of the category.
+            datetime: The time to be stored.
+
+        """
+
+    async def flush(self):
+        """Writes the pending changes in a single transaction.
+
+        The changes are kept pending if the writing fails.
+        """
+
+    async def close(self):
+        """Writes the pending changes, closes the connection
+        and stops the thread pool."""
+
+    def _run(self, func: Callable, *args) -> Future: ...
+
+    def _connect(self):
+        """Connects to the database, executed in a worker thread."""
+
+    def _disconnect(self): ...
+
+    def _get(self, category_name: str) -> Optional[int]: ...
+
+    def _set_many(self, items: List[Tuple[str, Optional[int]]]):
+        """Writes the times of the categories in a single transaction."""
+
+
+def create_state_store(db: Dict, loop: AbstractEventLoop) -> StateStore:
+    """Creates the storage of the backend selected by ``db/backend``.
+
+    Args:
+        db: The checked ``db`` section of the configuration.
+        loop: The event loop used by the bot.
+
+    """
@@ -1,18 +1,48 @@
 import os
 
 
+PICS_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def is_pic_path(path):
+    return os.path.splitext(path)[1].lower() in PICS_EXTENSIONS
+
+
 def get_pics_path_list(directory):
     if not os.path.exists(directory):
         return list()
-    pics_path_list = [
-        os.path.join(directory, path) for path
-        in os.listdir(directory)
-        if (os.path.isfile(os.path.join(directory, path)) and
-            (os.path.splitext(path)[1].lower() in ('.png', '.jpg', '.jpeg')))
-    ]
+    with os.scandir(directory) as it:
+        pics_path_list = [
+            os.path.join(directory, entry.name) for entry in it
+            if is_pic_path(entry.name) and entry.is_file()
+        ]
     return pics_path_list
 
 
+def move_no_clobber(src, dst):
+    root, ext = os.path.splitext(dst)
+    candidate = dst
+    i = 0
+    while True:
+        try:
+            #  Fails instead of overwriting an existing file
+            os.link(src, candidate)
+        except FileExistsError:
+            i += 1
+            candidate = f'{root}-{i}{ext}'
+            continue
+        except OSError:
+            #  Hard links are not supported by the file system
+            if os.path.exists(candidate):
+                i += 1
+                candidate = f'{root}-{i}{ext}'
+                continue
+            os.rename(src, candidate)
+            return candidate
+        os.remove(src)
+        return candidate
+
+
 def codepoint_to_str(cp):
     return chr(int(cp.lstrip("U+").zfill(8), 16))
 
@@ -24,3 +54,32 @@ def time_in_range(start, end, x):
         return start <= x or x < end
     else:
         return True
+
+
+def diff_categories(old_categories, new_categories, module_name):
+    old = {k for k, v in old_categories.items() if module_name in v['modules']}
+    new = {k for k, v in new_categories.items() if module_name in v['modules']}
+    changed = {k for k in old & new
+               if old_categories[k] != new_categories[k]}
+    return new - old, old - new, changed
+
+
+class LatencyStats:
+
+    __slots__ = ('count', 'errors', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency):
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
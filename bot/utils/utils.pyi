@@ -1,5 +1,24 @@
 from datetime import time
+from typing import Dict
 from typing import List
+from typing import Set
+from typing import Tuple
+
+
+PICS_EXTENSIONS: Tuple[str, ...]
+
+
+def is_pic_path(path: str) -> bool:
+    """Checks if the path has one of the picture extensions.
+
+    Note:
+        Only the following extensions are taken into account:
+        ['.png', '.jpg', '.jpeg'].
+
+    Returns:
+        Result of the check.
+
+    """
 
 
 def get_pics_path_list(directory: str) -> List[str]:
@@ -15,6 +34,18 @@ def get_pics_path_list(directory: str) -> List[str]:
     """
 
 
+def move_no_clobber(src: str, dst: str) -> str:
+    """Moves the file without overwriting an existing one.
+
+    If the destination is taken, a suffix "-1", "-2", etc.
+    is appended to the file name until a free name is found.
+
+    Returns:
+        The final path of the file.
+
+    """
+
+
 def codepoint_to_str(cp: str) -> str:
     """Converts a string of the 'U+XXXX' format
     into a corresponding Unicode character.
@@ -35,3 +66,43 @@ def time_in_range(start: time, end: time, x: time) -> bool:
         Result of the check.
 
     """
+
+
+def diff_categories(old_categories: Dict[str, Dict], new_categories: Dict[str, Dict], module_name: str) -> Tuple[Set[str], Set[str], Set[str]]:
+    """Compares the categories used by the module.
+
+    Args:
+        old_categories: The categories before the change.
+        new_categories: The categories after the change.
+        module_name: The name of the module class.
+
+    Returns:
+        Names of the added, removed and changed categories.
+
+    """
+
+
+class LatencyStats:
+    """Latency counters of a single operation or event.
+
+    Attributes:
+        count: The number of completed calls.
+        errors: The number of calls that raised an exception.
+        total: The total latency in seconds.
+        max: The maximum latency in seconds.
+
+    """
+
+    count: int
+    errors: int
+    total: float
+    max: float
+
+    def __init__(self): ...
+
+    def add(self, latency: float):
+        """Accounts a completed call."""
+
+    @property
+    def mean(self) -> float:
+        """The mean latency in seconds."""
@@ -2,11 +2,15 @@ import argparse
 import os
 
 from bot import DiscordBot
+from bot import Supervisor
 
 
-def run(config_path, no_chdir=False):
+def run(config_path, no_chdir=False, workers=1):
     if not no_chdir:
         os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if workers > 1:
+        Supervisor(config_path, workers).run()
+        return
     bot = DiscordBot(config_path)
     bot.run()
 
@@ -24,6 +28,13 @@ if __name__ == '__main__':
         action='store_true',
         help='do not change the current working directory '
              'to one containing launch.py')
+    parser.add_argument(
+        '-w', '--workers',
+        default=1,
+        type=int,
+        help='run a supervisor with the bot split into this number '
+             'of gateway shards served by worker processes',
+        metavar='N')
     args = parser.parse_args()
 
-    run(args.config, args.no_chdir)
+    run(args.config, args.no_chdir, args.workers)
@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+
+from bot.simulation import SendingScenario
+from bot.simulation import SuggestionScenario
+from bot.simulation import run_scenario
+
+
+def run(scenario, client_options, as_json=False):
+    report = run_scenario(scenario, client_options)
+    if as_json:
+        print(json.dumps(report, indent=4))
+        return
+    _print_report(report)
+
+
+def _print_report(data, indent=0):
+    for k, v in data.items():
+        if isinstance(v, dict):
+            print(' ' * indent + f'{k}:')
+            _print_report(v, indent + 2)
+        elif isinstance(v, float):
+            print(' ' * indent + f'{k}: {v:.6f}')
+        else:
+            print(' ' * indent + f'{k}: {v}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='runs the bot against a local fake discord client',
+        allow_abbrev=False)
+    parser.add_argument(
+        '--latency',
+        default=0.05,
+        type=float,
+        help='latency of every simulated request in seconds')
+    parser.add_argument(
+        '--jitter',
+        default=0.0,
+        type=float,
+        help='maximum random addition to the latency in seconds')
+    parser.add_argument(
+        '--rate-limit-probability',
+        default=0.0,
+        type=float,
+        help='probability of a request to receive a 429 response')
+    parser.add_argument(
+        '--rate-limit-retry-after',
+        default=1.0,
+        type=float,
+        help='waiting time after a 429 response in seconds')
+    parser.add_argument(
+        '--bucket-limit',
+        default=None,
+        type=int,
+        help='requests per route and channel in a rate limit window, '
+             'no rate limit headers are sent by default')
+    parser.add_argument(
+        '--bucket-reset-after',
+        default=1.0,
+        type=float,
+        help='duration of a rate limit window in seconds')
+    parser.add_argument(
+        '--seed',
+        default=None,
+        type=int,
+        help='seed of the random generator of the fake client')
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='print the report in JSON format')
+    subparsers = parser.add_subparsers(dest='scenario', required=True)
+
+    sending = subparsers.add_parser(
+        'sending',
+        help='N categories with M queued files each')
+    sending.add_argument('-n', '--categories', default=10, type=int)
+    sending.add_argument('-m', '--files', default=100, type=int)
+    sending.add_argument('--file-size', default=65536, type=int)
+    sending.add_argument(
+        '-d', '--duration',
+        default=10.0,
+        type=float,
+        help='duration of sending in seconds, the files are spread '
+             'over a send window of the whole minutes covering it')
+
+    suggestions = subparsers.add_parser(
+        'suggestions',
+        help='K suggestions per second')
+    suggestions.add_argument('-n', '--categories', default=1, type=int)
+    suggestions.add_argument('-k', '--rate', default=10.0, type=float)
+    suggestions.add_argument(
+        '-d', '--duration',
+        default=10.0,
+        type=float,
+        help='duration of submitting in seconds')
+    suggestions.add_argument('--file-size', default=65536, type=int)
+    suggestions.add_argument(
+        '--moderation-delay',
+        default=0.5,
+        type=float,
+        help='time before a suggestion is approved in seconds')
+    suggestions.add_argument(
+        '-b', '--batch-size',
+        default=1,
+        type=int,
+        help='number of links submitted by a single request')
+
+    args = parser.parse_args()
+
+    if args.scenario == 'sending':
+        scenario = SendingScenario(
+            args.categories, args.files, args.file_size, args.duration)
+    else:
+        scenario = SuggestionScenario(
+            args.categories, args.rate, args.duration,
+            args.file_size, args.moderation_delay,
+            batch_size=args.batch_size)
+    client_options = {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'rate_limit_probability': args.rate_limit_probability,
+        'rate_limit_retry_after': args.rate_limit_retry_after,
+        'seed': args.seed,
+        'bucket_limit': args.bucket_limit,
+        'bucket_reset_after': args.bucket_reset_after,
+    }
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    run(scenario, client_options, args.json)